@@ -16,11 +16,16 @@ import bpy
 # Robust hot-reload pattern
 if "bpy" in locals():
     import importlib
-    from . import operators, ui
+    from . import operators, ui, autosync
+    from .helpers import sync, plan, undo, library_index
+    importlib.reload(sync)
+    importlib.reload(undo)
     importlib.reload(operators)
+    importlib.reload(autosync)
     importlib.reload(ui)
 else:
-    from . import operators, ui
+    from . import operators, ui, autosync
+    from .helpers import sync, plan, undo, library_index
 
 __all__ = ("register", "unregister")
 
@@ -28,14 +33,25 @@ __all__ = ("register", "unregister")
 classes = (
     *ui.REGISTER_CLASSES,
     operators.OUTLINER_OT_all_objects_into_assets,
+    operators.AOIA_OT_refresh_previews,
+    operators.AOIA_OT_revert_last_run,
+    operators.AOIA_OT_cleanup,
 )
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     ui.register_menus()
+    sync.register()
+    undo.register()
+    autosync.register()
 
 def unregister():
+    autosync.unregister()
+    undo.unregister()
+    sync.unregister()
+    plan.shutdown()
+    library_index.shutdown()
     ui.unregister_menus()
     for cls in reversed(classes):
         try:
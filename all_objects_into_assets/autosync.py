@@ -0,0 +1,219 @@
+"""
+Opt-in auto-sync: keep assets and catalogs up to date while the file is edited.
+
+Depsgraph updates already queue dirty Objects/Collections for incremental sync
+(helpers/sync.py, which drops moves and the runs' own changes); with 'auto_sync' on, every
+update sync kept also (re)arms a debounced bpy.app.timers callback. Updates a flush
+causes while it runs are ignored. A flush is an incremental run of the operator's pipeline
+on the queued items only: when only objects changed since the last run, the snapshot holds
+just their parent hierarchies (Snapshot.capture(objects=...)), otherwise the whole scene.
+The timer plans it in one go, then applies it for at most 'auto_sync_budget_ms' per tick;
+undo, redo or a file load in between drops it.
+
+Saving costs at most one budget whatever the scene size: save_pre never captures or plans,
+it only applies rows of a flush the timer already planned, and leaves finishing it
+(catalog write, sync bookkeeping) to the timer. So a saved file holds partial state when
+edits arrived less than 'auto_sync_delay' before the save (not planned yet) or the flush
+in progress did not fit in the budget; the timer completes both after the save and the
+next save includes them.
+"""
+import logging
+import time
+
+import bpy
+from bpy.app.handlers import persistent
+
+from . import operators
+from .helpers import sync, undo
+from .helpers.plan import build_plan, PlanApply
+from .helpers.undo import ChangeLog
+from .helpers.utils import resolve_library_path
+
+# Preferences a flush always overrides: incremental, and nothing that renders/scans/writes files
+_OVERRIDES = {"incremental_sync": True, "preview_refresh_mode": 'NONE', "export_library_files": False,
+              "library_index": False, "stats_profile": False}
+
+_pending = False        # changes reported since the last flush was planned
+_due = 0.0              # time.monotonic() the debounced flush may start
+_active = None          # flush planned but not fully applied: (prefs, run, summary, applier, stats)
+_flushing = False       # inside flush(): updates now are its own
+_stamp = None           # sync.change_stamp() as last seen
+_unpushed = False       # a flush was applied since the last undo push
+
+log = logging.getLogger(__name__)
+
+
+class _FlushPrefs:
+    """The add-on preferences as a flush sees them (see _OVERRIDES)."""
+
+    def __init__(self, prefs):
+        self._prefs = prefs
+
+    def __getattr__(self, name):
+        if name in _OVERRIDES:
+            return _OVERRIDES[name]
+        return getattr(self._prefs, name)
+
+
+def _addon_prefs():
+    addon = bpy.context.preferences.addons.get(__package__)
+    return addon.preferences if addon is not None else None
+
+def _enabled(prefs) -> bool:
+    return prefs is not None and prefs.auto_sync and not bpy.app.background
+
+_LEVELS = {'ERROR': logging.ERROR, 'WARNING': logging.WARNING}
+
+def _report(levels, message):
+    # No operator to report through: the add-on's logger
+    log.log(max((_LEVELS.get(lv, logging.INFO) for lv in levels), default=logging.INFO),
+            "auto-sync: %s", message)
+
+
+def _plan(prefs, lib_path):
+    fprefs = _FlushPrefs(prefs)
+    stats = operators._stats_for(fprefs, "auto_sync")
+    # Only objects changed since the last run: snapshot just their hierarchies
+    objects = sync.dirty_state()[0] if sync.objects_only() and not fprefs.dedup_shared_data else None
+    run = operators._begin_run(bpy.context, fprefs, lib_path, stats, _report, objects=objects)
+    plan = build_plan(run["snapshot"], fprefs, run["cdf_entries"], None, str(run["cdf_path"]), stats=stats)
+    if plan.partial:
+        run = operators._begin_run(bpy.context, fprefs, lib_path, stats, _report)
+        plan = build_plan(run["snapshot"], fprefs, run["cdf_entries"], None, str(run["cdf_path"]), stats=stats)
+    summary = operators._plan_summary(plan, run, stats)
+    change_log = ChangeLog() if prefs.undo_mode == 'LIGHT' else None
+    return fprefs, run, summary, PlanApply(plan, batch_size=64, scene=bpy.context.scene, log=change_log), stats
+
+
+def flush(budget: float, planned_only: bool = False) -> bool:
+    """
+    Plan the queued changes if nothing is in progress, then apply for up to 'budget'
+    seconds (at least one batch). True when nothing is left to apply.
+    With 'planned_only' nothing is planned or finished: only rows of the flush in
+    progress are applied (save_pre).
+    """
+    global _flushing, _stamp
+    _flushing = True
+    try:
+        return _flush(budget, planned_only)
+    finally:
+        _flushing = False
+        _stamp = sync.change_stamp()
+
+def _flush(budget: float, planned_only: bool = False) -> bool:
+    global _pending, _active, _unpushed
+    prefs = _addon_prefs()
+    if not _enabled(prefs):
+        _active = None
+        return True
+    deadline = time.perf_counter() + budget
+    if _active is not None and sync.id_epoch() != _active[1]["id_epoch"]:
+        # Undo/redo freed the IDs the flush refers to (and took its changes so far with them)
+        _active = None
+        sync.clear_own()
+        sync.reset()
+        _report({'WARNING'}, "undone while being applied, stopped")
+        return True
+    if _active is None:
+        if not _pending:
+            return True
+        if planned_only:
+            return False
+        _pending = False
+        lib_path = resolve_library_path(prefs.asset_library)
+        if lib_path is None:
+            return True     # LOCAL library of an unsaved file: nothing to sync into yet
+        _active = _plan(prefs, lib_path)
+
+    fprefs, run, summary, applier, stats = _active
+    if not applier.step(max(0.0, deadline - time.perf_counter())) or planned_only:
+        return False
+    _active = None
+    stats.lap("apply")
+    summary = operators._apply_run(bpy.context, fprefs, run, summary, _report, applier=applier)
+    _unpushed = True
+    if applier.log:
+        undo.store(applier.log)
+    operators._save_stats(prefs, stats, _report)
+    return summary is not None
+
+
+def _tick():
+    global _unpushed
+    prefs = _addon_prefs()
+    if not _enabled(prefs):
+        return None
+    wait = _due - time.monotonic()
+    if _active is None and wait > 0:
+        return wait     # more edits arrived: keep waiting
+    if not flush(prefs.auto_sync_budget_ms / 1000.0):
+        return 0.1      # let the UI breathe, then continue applying
+    if _pending:
+        return max(0.1, _due - time.monotonic())
+    if _unpushed and prefs.undo_mode == 'FULL':
+        bpy.ops.ed.undo_push(message="All Objects into Assets (auto-sync)")
+    _unpushed = False
+    return None
+
+
+def _schedule(prefs):
+    global _due
+    _due = time.monotonic() + prefs.auto_sync_delay
+    if not bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.register(_tick, first_interval=prefs.auto_sync_delay)
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    # Runs after sync's handler (registered first): whatever it kept is an edit to sync
+    global _pending, _stamp
+    prefs = _addon_prefs()
+    if not _enabled(prefs) or _flushing:
+        return
+    stamp = sync.change_stamp()
+    if stamp != _stamp:
+        _stamp = stamp
+        _pending = True
+        _schedule(prefs)
+
+@persistent
+def _on_save_pre(*_args):
+    # One budget of an already planned flush, nothing O(scene): the timer does the rest
+    prefs = _addon_prefs()
+    if _enabled(prefs) and (_pending or _active is not None):
+        done = flush(prefs.auto_sync_budget_ms / 1000.0, planned_only=True)
+        if not done and not bpy.app.timers.is_registered(_tick):
+            bpy.app.timers.register(_tick, first_interval=0.1)
+
+@persistent
+def _on_load_post(*_args):
+    # A flush in progress refers to IDs of the previous file
+    # (sync's load_post handler, registered first, has already reset its state)
+    global _pending, _active, _unpushed, _stamp
+    _pending = False
+    _active = None
+    _unpushed = False
+    _stamp = sync.change_stamp()
+
+
+def _handlers():
+    h = bpy.app.handlers
+    return ((h.depsgraph_update_post, _on_depsgraph_update), (h.save_pre, _on_save_pre),
+            (h.load_post, _on_load_post))
+
+def register():
+    for lst, fn in _handlers():
+        if fn not in lst:
+            lst.append(fn)
+
+def unregister():
+    global _pending, _active
+    for lst, fn in _handlers():
+        try:
+            lst.remove(fn)
+        except ValueError:
+            pass
+    if bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.unregister(_tick)
+    _pending = False
+    _active = None
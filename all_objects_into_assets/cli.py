@@ -0,0 +1,312 @@
+"""
+Headless batch processing of many .blend files with the same pipeline as the Outliner operator.
+
+Driver (system Python, or inside Blender):
+
+    python all_objects_into_assets/cli.py --blender /opt/blender/blender \\
+        --library /mnt/assets --jobs 8 --summary summary.json scenes/*.blend
+
+Every file is opened by its own 'blender -b <file> --python cli.py -- --worker ...' process,
+processed with the add-on preferences given on the command line, and saved in place.
+Workers only read the library's blender_assets.cats.txt; the driver merges their new
+catalogs into it once every worker is done, and records the catalogs they mirrored in the
+library's catalog history (what cleanup may prune). New catalogs get path-derived UUIDs, so
+files processed in parallel agree on the UUID of a shared path. With '--no-save' neither
+the files nor the library's catalogs are written.
+'--library LOCAL' uses each file's own folder as its library.
+"""
+import argparse
+import glob
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+_PKG_DIR = Path(__file__).resolve().parent
+CDF_NAME = "blender_assets.cats.txt"
+
+
+def _helper(name):
+    """Import helpers/<name>.py standalone (the package __init__ needs bpy)."""
+    spec = importlib.util.spec_from_file_location(f"_aoia_cli_{name}", _PKG_DIR / "helpers" / f"{name}.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _parse_value(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+# ---------- worker (inside 'blender -b <file>') ----------
+def _prefs_from_overrides(ui, overrides: dict):
+    """AddonPrefs defaults (read from its property annotations) updated with 'overrides'."""
+    values = {}
+    for name, prop in ui.AddonPrefs.__annotations__.items():
+        kw = getattr(prop, "keywords", {})
+        if "default" in kw:
+            values[name] = kw["default"]
+    values.update(overrides)
+    values["excluded_roots"] = [SimpleNamespace(name=p) for p in overrides.get("excluded_roots", [])]
+    values["preview_async"] = False  # no event loop in background mode
+    values["incremental_sync"] = False
+    return SimpleNamespace(**values)
+
+
+def _refresh_index(argv):
+    """Inside 'blender -b': bring a library's index up to date once, before the file workers start."""
+    ap = argparse.ArgumentParser(prog="cli.py --refresh-index")
+    ap.add_argument("--refresh-index", dest="library", required=True)
+    ap.add_argument("--index-workers", type=int, default=1)
+    ap.add_argument("--result", required=True)
+    args = ap.parse_args(argv)
+    sys.path.insert(0, str(_PKG_DIR.parent))
+    library_index = importlib.import_module(f"{_PKG_DIR.name}.helpers.library_index")
+    counts = library_index.LibraryIndex(args.library).refresh(args.index_workers)
+    Path(args.result).write_text(json.dumps(counts), encoding="utf-8")
+
+
+def _worker(argv):
+    import bpy
+
+    ap = argparse.ArgumentParser(prog="cli.py --worker")
+    ap.add_argument("--worker", action="store_true")
+    ap.add_argument("--settings", required=True)
+    ap.add_argument("--result", required=True)
+    args = ap.parse_args(argv)
+
+    with open(args.settings, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+
+    sys.path.insert(0, str(_PKG_DIR.parent))
+    pkg = _PKG_DIR.name
+    operators = importlib.import_module(f"{pkg}.operators")
+    catalogs = importlib.import_module(f"{pkg}.helpers.catalogs")
+    ui = importlib.import_module(f"{pkg}.ui")
+
+    result = {"file": bpy.data.filepath, "ok": False, "messages": [], "timings": {}}
+    prefs = _prefs_from_overrides(ui, settings["overrides"])
+
+    report = lambda levels, msg: result["messages"].append(msg)  # noqa: E731
+    stats = operators._stats_for(prefs, Path(bpy.data.filepath).stem or "batch")
+    t0 = time.perf_counter()
+    with stats.profiling():
+        summary = operators.run_all_objects_into_assets(
+            bpy.context, prefs, settings["library"], None, report,
+            write_catalogs=False, new_catalog_uid=catalogs.path_uuid, stats=stats,
+            dry_run=settings.get("dry_run", False),
+        )
+    result["timings"]["pipeline"] = time.perf_counter() - t0
+    result["stats"] = stats.as_dict()
+    operators._save_stats(prefs, stats, report)
+
+    if summary is not None:
+        if settings.get("plan"):
+            result["plan"] = str(summary["plan"].write(settings["plan"]))
+        result["counts"] = summary["plan"].counts
+        if settings.get("save", True) and not settings.get("dry_run", False):
+            t0 = time.perf_counter()
+            bpy.ops.wm.save_mainfile()
+            result["timings"]["save"] = time.perf_counter() - t0
+        result["ok"] = True
+        result.update({
+            "objects": summary["objects"],
+            "collections": summary["collections"],
+            "catalogs_added": {p: list(v) for p, v in summary["catalogs_added"].items()},
+            "catalogs_moved": [list(m) for m in summary["catalogs_moved"]],
+            "catalog_uids": sorted({cat[0] for cat in summary["plan"].coll_to_catalog.values()}),
+            "folded": summary["plan"].folded,
+            "exported": summary["exported"],
+        })
+
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ---------- driver ----------
+def _merge_catalogs(catalogs, lib_dir: Path, added: dict, moved=(), mirrored=()):
+    """
+    Move renamed catalogs ((old path, new path, uid, simple) rows) and add new entries to
+    the library CDF, then record the 'mirrored' UUIDs that made it into the CDF in its
+    history; returns (added + moved count, conflicting paths).
+    """
+    cdf_path = lib_dir / CDF_NAME
+    lib_dir.mkdir(parents=True, exist_ok=True)
+    # Locked: artists or other batch runs may be writing the same library
+    with catalogs.cdf_lock(cdf_path):
+        entries = catalogs.read_cdf(cdf_path)
+        new, conflicts = 0, []
+        by_uid = catalogs.uid_index(entries)
+        for old, cat_path, uid, simple in moved:
+            if by_uid.get(uid) == old and catalogs.move_catalog(entries, by_uid, uid, cat_path, simple):
+                new += 1
+            elif by_uid.get(uid) != cat_path:
+                conflicts.append(cat_path)
+        for cat_path, (uid, simple) in sorted(added.items()):
+            if cat_path not in entries:
+                entries[cat_path] = (uid, simple)
+                new += 1
+            elif entries[cat_path][0] != uid:
+                conflicts.append(cat_path)
+        if new:
+            catalogs.write_cdf(cdf_path, entries)
+        # Workers run with write_catalogs=False: the history is recorded once, here
+        catalogs.record_history(cdf_path, set(mirrored) & catalogs.uid_index(entries).keys())
+    return new, conflicts
+
+
+def _driver(argv):
+    ap = argparse.ArgumentParser(
+        prog="cli.py", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="+", help=".blend files or glob patterns")
+    ap.add_argument("--blender", default=os.environ.get("BLENDER"), help="Blender executable (or $BLENDER)")
+    ap.add_argument("--library", required=True, help="asset library folder, or LOCAL")
+    ap.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--timeout", type=float, default=None, help="seconds per file")
+    ap.add_argument("--summary", help="write the per-file JSON summary here")
+    ap.add_argument("--no-save", action="store_true",
+                    help="process without saving the files or writing the library catalogs")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="only plan: files and the library catalogs are left untouched")
+    ap.add_argument("--plan-dir", help="write each file's change plan (<file stem>.plan.json) here")
+    ap.add_argument("--master", dest="master_collection_name")
+    ap.add_argument("--catalog-root", dest="catalog_root")
+    ap.add_argument("--suffix", dest="asset_suffix")
+    ap.add_argument("--previews", dest="preview_refresh_mode", choices=("NONE", "MISSING", "ALL"))
+    ap.add_argument("--exclude", dest="excluded_roots", action="append", default=[],
+                    help="excluded root collection name/pattern (repeatable)")
+    ap.add_argument("--set", dest="extra", action="append", default=[], metavar="PREF=VALUE",
+                    help="any other add-on preference, VALUE parsed as JSON when possible")
+    args = ap.parse_args(argv)
+
+    blender = args.blender
+    if not blender:
+        try:
+            import bpy
+            blender = bpy.app.binary_path
+        except ImportError:
+            ap.error("--blender (or $BLENDER) is required outside Blender")
+
+    files = []
+    for pattern in args.files:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for m in matches:
+            p = Path(m).resolve()
+            if p.suffix == ".blend" and p not in files:
+                files.append(p)
+    if not files:
+        ap.error("no .blend files given")
+
+    overrides = {k: v for k, v in (
+        ("master_collection_name", args.master_collection_name),
+        ("catalog_root", args.catalog_root),
+        ("asset_suffix", args.asset_suffix),
+        ("preview_refresh_mode", args.preview_refresh_mode),
+    ) if v is not None}
+    overrides["excluded_roots"] = args.excluded_roots
+    for item in args.extra:
+        key, _, raw = item.partition("=")
+        overrides[key.strip()] = _parse_value(raw)
+
+    workers = _helper("workers")
+    catalogs = _helper("catalogs")
+
+    tmp = Path(tempfile.mkdtemp(prefix="aoia_batch_"))
+    index_counts = None
+    if overrides.get("library_index") and args.library != "LOCAL":
+        # Scan the library once here; the file workers then find the index up to date
+        index_result = tmp / "index.json"
+        cmd = workers.background_command(
+            Path(__file__).resolve(), None,
+            ["--refresh-index", Path(args.library).resolve(), "--index-workers", args.jobs,
+             "--result", index_result], binary=blender)
+        workers.ProcessPool([cmd], 1, tmp / "logs_index", args.timeout).wait()
+        try:
+            index_counts = json.loads(index_result.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            print(f"library index refresh failed (log: {tmp / 'logs_index' / '0.log'})")
+    commands, libs, results = [], [], []
+    for i, blend in enumerate(files):
+        lib = blend.parent if args.library == "LOCAL" else Path(args.library).resolve()
+        settings_path = tmp / f"{i}.settings.json"
+        plan = str(Path(args.plan_dir).resolve() / f"{blend.stem}.plan.json") if args.plan_dir else None
+        settings_path.write_text(json.dumps({
+            "library": str(lib), "overrides": overrides, "save": not args.no_save,
+            "dry_run": args.dry_run, "plan": plan,
+        }), encoding="utf-8")
+        result_path = tmp / f"{i}.result.json"
+        libs.append(lib)
+        results.append(result_path)
+        commands.append(workers.background_command(
+            Path(__file__).resolve(), blend,
+            ["--worker", "--settings", settings_path, "--result", result_path], binary=blender,
+        ))
+
+    t0 = time.perf_counter()
+    pool = workers.ProcessPool(commands, args.jobs, tmp / "logs", args.timeout)
+    codes = pool.wait()
+
+    per_file, added_by_lib, moved_by_lib, mirrored_by_lib = [], {}, {}, {}
+    for i, blend in enumerate(files):
+        try:
+            rec = json.loads(results[i].read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            rec = {"file": str(blend), "ok": False, "messages": ["worker produced no result"], "timings": {}}
+        rec["file"] = str(blend)
+        rec["returncode"] = codes.get(i)
+        rec["log"] = str(tmp / "logs" / f"{i}.log")
+        rec["timings"]["wall"] = pool.durations.get(i)
+        rec["ok"] = bool(rec.get("ok")) and codes.get(i) == 0
+        if rec["ok"] and not (args.dry_run or args.no_save):
+            added_by_lib.setdefault(libs[i], {}).update(
+                {p: tuple(v) for p, v in rec.get("catalogs_added", {}).items()})
+            moved_by_lib.setdefault(libs[i], []).extend(rec.get("catalogs_moved", []))
+            mirrored_by_lib.setdefault(libs[i], set()).update(rec.get("catalog_uids", ()))
+        per_file.append(rec)
+
+    merged = []
+    for lib, added in added_by_lib.items():
+        new, conflicts = _merge_catalogs(catalogs, lib, added, moved_by_lib.get(lib, ()),
+                                         mirrored_by_lib.get(lib, ()))
+        merged.append({"library": str(lib), "catalogs_added": new, "conflicts": conflicts})
+
+    report = {
+        "files": per_file,
+        "libraries": merged,
+        "library_index": index_counts,
+        "ok": sum(1 for r in per_file if r["ok"]),
+        "failed": sum(1 for r in per_file if not r["ok"]),
+        "seconds": time.perf_counter() - t0,
+    }
+    for rec in per_file:
+        state = "ok  " if rec["ok"] else "FAIL"
+        wall = rec["timings"].get("wall") or 0.0
+        print(f"[{state}] {wall:7.2f}s  {rec['file']}  "
+              f"objects={rec.get('objects', 0)} collections={rec.get('collections', 0)}")
+    print(f"{report['ok']} ok, {report['failed']} failed in {report['seconds']:.1f}s")
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if not report["failed"] else 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--" in argv:
+        argv = argv[argv.index("--") + 1:]
+    if "--worker" in argv:
+        return _worker(argv)
+    if "--refresh-index" in argv:
+        return _refresh_index(argv)
+    return _driver(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,282 @@
+from contextlib import contextmanager
 from pathlib import Path
+import json
+import os
+import random
+import shutil
+import socket
+import time
 import uuid
 
+# ID property on a collection holding the UUID of the catalog mirrored from it
+CATALOG_PROP = "aoia_catalog_id"
+# Next to the CDF: UUIDs of every catalog runs mirrored into the library (see record_history)
+HISTORY_NAME = ".aoia_catalog_history.json"
+
 HEADER = [
     "# Blender Asset Catalog Definition File",
     "# UUID:catalog/path:Simple Name",
     "VERSION 1",
 ]
 
+def _parse_entry(raw: str):
+    """(uid, path, simple) for a catalog line; None for comments, VERSION and unknown lines."""
+    ln = raw.strip()
+    if not ln or ln.startswith("#") or ln.startswith("VERSION"):
+        return None
+    parts = ln.split(":", 2)
+    return tuple(parts) if len(parts) == 3 else None
+
 def read_cdf(cdf_path: Path):
     entries = {}
     if not cdf_path.exists():
         return entries
     with cdf_path.open("r", encoding="utf-8") as f:
         for raw in f:
-            ln = raw.strip()
-            if not ln or ln.startswith("#") or ln.startswith("VERSION"):
-                continue
-            parts = ln.split(":", 2)
-            if len(parts) == 3:
-                uid, path, simple = parts
+            parsed = _parse_entry(raw)
+            if parsed:
+                uid, path, simple = parsed
                 entries[path] = (uid, simple)
     return entries
 
-def write_cdf(cdf_path: Path, entries: dict):
-    if cdf_path.exists():
+def render_cdf(entries: dict, existing_text: str | None = None) -> str:
+    """
+    CDF text for 'entries'. With 'existing_text', comments/unknown lines and the order of
+    existing entries are kept (entries missing from 'entries' are dropped); new entries are
+    appended sorted by path.
+    """
+    if existing_text is None:
+        lines = HEADER[:]
+        for cat_path in sorted(entries.keys()):
+            uid, simple = entries[cat_path]
+            lines.append(f"{uid}:{cat_path}:{simple}")
+        return "\n".join(lines)
+
+    lines, emitted = [], set()
+    for raw in existing_text.splitlines():
+        parsed = _parse_entry(raw)
+        if parsed is None:
+            lines.append(raw)
+            continue
+        cat_path = parsed[1]
+        if cat_path in emitted or cat_path not in entries:
+            continue
+        emitted.add(cat_path)
+        uid, simple = entries[cat_path]
+        lines.append(raw if (uid, simple) == (parsed[0], parsed[2]) else f"{uid}:{cat_path}:{simple}")
+    for cat_path in sorted(p for p in entries if p not in emitted):
+        uid, simple = entries[cat_path]
+        lines.append(f"{uid}:{cat_path}:{simple}")
+    text = "\n".join(lines)
+    return text + "\n" if existing_text.endswith("\n") else text
+
+def write_cdf(cdf_path: Path, entries: dict) -> bool:
+    """
+    Write 'entries' to the CDF only when the content changes (returns False otherwise).
+    The file is replaced atomically (temp file + os.replace) after a '~' backup copy, so
+    watchers never see a missing or half-written CDF.
+    """
+    try:
+        existing = cdf_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        existing = None
+    text = render_cdf(entries, existing)
+    if text == existing:
+        return False
+    if existing is not None:
         try:
-            backup = cdf_path.with_suffix(cdf_path.suffix + "~")
-            cdf_path.replace(backup)
+            shutil.copy2(cdf_path, cdf_path.with_suffix(cdf_path.suffix + "~"))
         except Exception:
             pass
-    lines = HEADER[:]
-    for cat_path in sorted(entries.keys()):
-        uid, simple = entries[cat_path]
-        lines.append(f"{uid}:{cat_path}:{simple}")
-    cdf_path.write_text("\n".join(lines), encoding="utf-8")
+    tmp = cdf_path.with_name(f".{cdf_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, cdf_path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return True
+
+def read_history(cdf_path: Path) -> set:
+    """UUIDs of the catalogs runs mirrored into the library of 'cdf_path'."""
+    try:
+        data = json.loads(cdf_path.with_name(HISTORY_NAME).read_text(encoding="utf-8"))
+        return set(data["uids"]) if data.get("version") == 1 else set()
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+def record_history(cdf_path: Path, uids) -> bool:
+    """
+    Add 'uids' to the history next to 'cdf_path' (call under cdf_lock(cdf_path)). Cleanup
+    only prunes catalogs found there, so catalogs made by hand or by other tools are never
+    touched. Returns False when nothing was new.
+    """
+    known = read_history(cdf_path)
+    new = set(uids) - known
+    if not new:
+        return False
+    path = cdf_path.with_name(HISTORY_NAME)
+    tmp = path.with_name(f"{HISTORY_NAME}.tmp{os.getpid()}")
+    tmp.write_text(json.dumps({"version": 1, "uids": sorted(known | new)}), encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+# Namespace for path-derived catalog UUIDs (batch runs mint identical UUIDs for a path)
+_CATALOG_NS = uuid.UUID("6f1c8d9e-3b2a-4c5d-9e8f-a1b2c3d4e5f6")
+
+def path_uuid(cat_path: str) -> str:
+    return str(uuid.uuid5(_CATALOG_NS, cat_path))
+
+# ---------- concurrent writers (shared / network libraries) ----------
+@contextmanager
+def cdf_lock(cdf_path: Path, timeout: float = 30.0, stale: float = 120.0):
+    """
+    Exclusive lock file '<cdf>.lock' (O_CREAT|O_EXCL, works on SMB/NFS shares) held around
+    read-merge-write. Contention is retried with jittered exponential backoff; a lock older
+    than 'stale' seconds is treated as left behind by a crashed writer and broken (see
+    _break_stale_lock()). Raises TimeoutError after 'timeout' seconds.
+    """
+    lock = cdf_path.with_name(cdf_path.name + ".lock")
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - lock.stat().st_mtime > stale:
+                _break_stale_lock(lock, stale)
+                continue
+        except OSError:
+            continue  # released meanwhile
+        if time.monotonic() >= deadline:
+            try:
+                holder = lock.read_text(encoding="utf-8").strip()
+            except OSError:
+                holder = "?"
+            raise TimeoutError(f"{cdf_path.name} is locked by {holder}")
+        time.sleep(delay * random.uniform(0.5, 1.0))
+        delay = min(delay * 2, 0.5)
+    try:
+        os.write(fd, owner.encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            lock.unlink()
+        except OSError:
+            pass
+
+def _break_stale_lock(lock: Path, stale: float):
+    """
+    Remove a stale lock without racing a writer that replaces it meanwhile: rename it
+    aside (atomic), then check the mtime of what was moved. Still stale: delete it. Fresh
+    (another process took the lock between our stat and rename): put it back.
+    """
+    aside = lock.with_name(f"{lock.name}.stale{os.getpid()}-{random.getrandbits(32):08x}")
+    try:
+        os.rename(lock, aside)
+    except OSError:
+        return  # released or broken by someone else meanwhile
+    try:
+        if time.time() - aside.stat().st_mtime > stale:
+            return
+        try:
+            os.link(aside, lock)    # never overwrites a lock taken since
+        except FileExistsError:
+            pass
+        except OSError:
+            if not lock.exists():   # no hard links on this share
+                os.rename(aside, lock)
+    finally:
+        try:
+            aside.unlink()
+        except OSError:
+            pass
+
+def merge_entries(base: dict, ours: dict, theirs: dict):
+    """
+    Three-way merge of catalog entries by UUID, then path: 'base' is what this run read,
+    'ours' what it wants to write, 'theirs' the file as it is now. Per UUID the side that
+    changed it wins; when both moved or renamed it differently, the smaller (path, simple
+    name) wins, so every writer order ends the same. A path left with several UUIDs keeps
+    the one already there on disk (else the smallest); the others go back to their path on
+    disk, or, when only we have them, are dropped for the winner.
+    Returns (merged, remap) with remap = {our uid: their uid} for those dropped.
+    """
+    def by_uid(entries):
+        return {uid: (path, simple) for path, (uid, simple) in entries.items()}
+    b_uid, o_uid, t_uid = by_uid(base), by_uid(ours), by_uid(theirs)
+    placed = {}     # uid -> (path, simple)
+    for uid in b_uid.keys() | o_uid.keys() | t_uid.keys():
+        b, o, t = b_uid.get(uid), o_uid.get(uid), t_uid.get(uid)
+        if o == b or o == t:
+            val = t
+        elif t == b:
+            val = o
+        elif o is None or t is None:
+            val = o or t  # removed on one side, changed on the other: keep the change
+        else:
+            val = min(o, t)
+        if val is not None:
+            placed[uid] = val
+
+    remap = {}
+    while True:
+        at = {}
+        for uid, (path, _simple) in placed.items():
+            at.setdefault(path, []).append(uid)
+        clashes = {path: uids for path, uids in at.items() if len(uids) > 1}
+        if not clashes:
+            break
+        for path, uids in clashes.items():
+            on_disk = theirs.get(path, (None,))[0]
+            winner = on_disk if on_disk in uids else min(uids)
+            for uid in uids:
+                if uid == winner:
+                    continue
+                if uid in t_uid:
+                    placed[uid] = t_uid[uid]    # wins there: it is on disk at that path
+                else:
+                    del placed[uid]
+                    remap[uid] = winner
+    return {path: (uid, simple) for uid, (path, simple) in placed.items()}, remap
+
+def merge_cdf(cdf_path: Path, base: dict, ours: dict):
+    """
+    Re-read the CDF, three-way merge 'ours' into it and write the result if it changed.
+    Call under cdf_lock(). Returns (merged entries, uid remap, written).
+    """
+    merged, remap = merge_entries(base, ours, read_cdf(cdf_path))
+    return merged, remap, write_cdf(cdf_path, merged)
+
+def uid_index(entries: dict) -> dict:
+    """{uid: path} for 'entries' (path -> (uid, simple)); the second half of the CDF index."""
+    return {uid: path for path, (uid, _simple) in entries.items()}
+
+def move_catalog(entries: dict, by_uid: dict, uid: str, cat_path: str, simple_name: str) -> str | None:
+    """
+    Move catalog 'uid' to 'cat_path' in place (same UUID, so assigned assets stay valid).
+    Returns the old path, or None when 'uid' is unknown or 'cat_path' is already taken.
+    """
+    old = by_uid.get(uid)
+    if old is None or old == cat_path or cat_path in entries:
+        return None
+    del entries[old]
+    entries[cat_path] = (uid, simple_name)
+    by_uid[uid] = cat_path
+    return old
 
-def ensure_catalog(entries: dict, cat_path: str, simple_name: str) -> str:
-    """Return catalog UUID; create if missing."""
+def ensure_catalog(entries: dict, cat_path: str, simple_name: str, new_uid=None) -> str:
+    """Return catalog UUID; create if missing ('new_uid(path)' mints it, default random)."""
     if cat_path in entries:
         return entries[cat_path][0]
-    uid = str(uuid.uuid4())
+    uid = new_uid(cat_path) if new_uid else str(uuid.uuid4())
     entries[cat_path] = (uid, simple_name)
     return uid
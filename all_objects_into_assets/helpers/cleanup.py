@@ -0,0 +1,231 @@
+import bpy
+
+from .graph import SceneGraph, analyze
+from .catalogs import read_cdf, write_cdf, cdf_lock, uid_index, move_catalog
+from .plan import write_rows
+from .utils import build_child_map, gather_descendants_map
+
+# Archived catalogs keep their UUID under this path (assets elsewhere still resolve)
+ARCHIVE_ROOT = "Archive"
+
+
+class CleanupPlan:
+    """
+    What a cleanup (garbage collection) pass would change, computed from a Snapshot:
+      catalogs_dead     [path, uid, archive path | null (removed)]
+      collections_dead  [name, parent object name, action, reason]  action: remove / archive /
+                        keep (removing would orphan its contents)
+      links_stale       [collection name, object name_full]  links to objects that are no
+                        longer descendants of the collection's parent object
+    A catalog is live when a mirrored collection maps to it, an asset (of any ID type) of
+    this file or (per the library index) of another library file uses it, or a live catalog
+    is below it. Only catalogs this add-on made are candidates: below the catalog root,
+    recorded on a collection (CATALOG_PROP) or in the library's catalog history. Without
+    library information or a catalog root no catalog is touched ('catalogs_checked' false,
+    'catalogs_skipped' says why).
+    """
+
+    def __init__(self):
+        self.header = {}
+        self.catalogs_checked = False
+        self.catalogs_skipped = None
+        self.catalogs_dead = []
+        self.collections_dead = []
+        self.links_stale = []
+        self.links_kept = 0         # stale links left: the object is linked nowhere else
+        self.counts = {}
+        self.snapshot = None
+
+    def to_dict(self) -> dict:
+        return {
+            **self.header,
+            "counts": self.counts,
+            "catalogs_checked": self.catalogs_checked,
+            "catalogs_skipped": self.catalogs_skipped,
+            "catalogs_dead": self.catalogs_dead,
+            "collections_dead": self.collections_dead,
+            "links_stale": self.links_stale,
+        }
+
+    def write(self, path):
+        return write_rows(path, self.to_dict())
+
+
+def _live_catalog_paths(cdf_entries, live_paths, used_uids):
+    live = set(live_paths)
+    live.update(p for p, (uid, _simple) in cdf_entries.items() if uid in used_uids)
+    # Parents of live catalogs stay (they hold the tree together in the Asset Browser)
+    out = set()
+    for p in live:
+        parts = p.split("/")
+        out.update("/".join(parts[:k]) for k in range(1, len(parts) + 1))
+    return out
+
+
+def build_cleanup_plan(snap, prefs, cdf_entries, used_elsewhere=None, archive: bool = True,
+                       used_here=(), history=()) -> CleanupPlan:
+    """
+    Dead catalogs, dead *_asset collections and stale links of the whole file (scope does
+    not apply). 'used_elsewhere' is the set of catalog UUIDs assets in the library's other
+    files use (LibraryIndex), None when unknown; 'used_here' those of this file's assets of
+    ID types the snapshot does not hold (utils.asset_catalog_ids()); 'history' the UUIDs of
+    catalogs.read_history(). 'archive' moves dead catalogs under ARCHIVE_ROOT and dead
+    collections into the master's archive collection instead of removing them.
+    """
+    plan = CleanupPlan()
+    plan.snapshot = snap
+    master_name = prefs.master_collection_name.strip() or "Assets"
+    catalog_root = prefs.catalog_root.strip()
+    suffix = prefs.asset_suffix
+    patterns = tuple((item.name or "").strip() for item in getattr(prefs, "excluded_roots", []))
+    master = snap.collection_by_name.get(master_name)
+
+    # -------------------------
+    # Catalogs
+    # -------------------------
+    root = catalog_root.strip("/")
+    if used_elsewhere is None:
+        plan.catalogs_skipped = "library not indexed"
+    elif not root:
+        # Every catalog of the library would be a candidate, hand-made ones included
+        plan.catalogs_skipped = "no catalog root"
+    else:
+        plan.catalogs_checked = True
+        graph = SceneGraph.from_snapshot(snap)
+        an = analyze(graph, master.index if master is not None else -1, patterns, None,
+                     catalog_root, suffix)
+        used = set(used_elsewhere) | set(used_here)
+        used.update(n.asset_catalog for n in snap.objects if n.is_asset)
+        used.update(n.asset_catalog for n in snap.collections if n.is_asset)
+        live = _live_catalog_paths(cdf_entries, (an.paths[i][1] for i in an.mirrored), used)
+        ours = set(history)
+        ours.update(n.catalog_prop for n in snap.collections if n.catalog_prop)
+        for path in sorted(cdf_entries):
+            if path in live or path == ARCHIVE_ROOT or path.startswith(ARCHIVE_ROOT + "/"):
+                continue
+            uid = cdf_entries[path][0]
+            if path != root and not path.startswith(root + "/") and uid not in ours:
+                continue    # not made by this add-on
+            plan.catalogs_dead.append([path, uid, f"{ARCHIVE_ROOT}/{path}" if archive else None])
+
+    # -------------------------
+    # *_asset collections directly under the master collection
+    # -------------------------
+    if master is not None:
+        child_map = build_child_map(snap.objects)
+        by_name = {}
+        for o in snap.objects:
+            by_name.setdefault(o.name, o)
+        in_scene_root = {o for sc in snap.scenes for o in getattr(sc.collection, "objects", ())}
+
+        def linked_elsewhere(obj, col):
+            return obj in in_scene_root or any(c is not col for c in obj.users_collection)
+
+        live = []
+        for col in master.children:
+            if not col.name.endswith(suffix) or len(col.name) == len(suffix):
+                continue
+            par = by_name.get(col.name[:-len(suffix)])
+            if par is not None and par in child_map:
+                live.append((col, par))
+                continue
+            reason = "parent object missing" if par is None else "parent object has no children"
+            if archive:
+                action = "archive"
+            elif col.children or not all(linked_elsewhere(o, col) for o in col.objects):
+                action, reason = "keep", reason + "; holds data linked nowhere else"
+            else:
+                action = "remove"
+            plan.collections_dead.append([col.name, col.name[:-len(suffix)], action, reason])
+
+        subtrees = gather_descendants_map([par for _col, par in live], child_map)
+        for col, par in live:
+            members = set(subtrees[par])
+            for o in col.objects:
+                if o in members:
+                    continue
+                if linked_elsewhere(o, col):
+                    plan.links_stale.append([col.name, o.key])
+                else:
+                    plan.links_kept += 1
+
+    plan.counts = {
+        "catalogs_dead": len(plan.catalogs_dead),
+        "catalogs_total": len(cdf_entries),
+        "collections_dead": sum(1 for r in plan.collections_dead if r[2] != "keep"),
+        "collections_kept": sum(1 for r in plan.collections_dead if r[2] == "keep"),
+        "links_stale": len(plan.links_stale),
+        "links_kept": plan.links_kept,
+    }
+    plan.header = {
+        "file": snap.filepath,
+        "action": "archive" if archive else "remove",
+        "settings": {
+            "master_collection_name": master_name,
+            "catalog_root": catalog_root,
+            "asset_suffix": suffix,
+            "excluded_roots": list(patterns),
+        },
+    }
+    return plan
+
+
+def apply_cleanup(plan: CleanupPlan, master_name: str, cdf_path=None) -> dict:
+    """
+    Apply a CleanupPlan: unlink stale links, remove or archive dead collections and, with
+    'cdf_path', remove or archive dead catalogs in the library CDF (locked, re-read first;
+    entries changed by someone else since planning are left alone).
+    """
+    done = {"links_unlinked": 0, "collections_removed": 0, "collections_archived": 0,
+            "catalogs_removed": 0, "catalogs_archived": 0}
+    snap = plan.snapshot
+    objects = {n.key: snap.rna[n] for n in snap.objects}
+    collections = bpy.data.collections
+
+    for col_name, key in plan.links_stale:
+        col, obj = collections.get(col_name), objects.get(key)
+        if col is not None and obj is not None:
+            try:
+                col.objects.unlink(obj)
+                done["links_unlinked"] += 1
+            except RuntimeError:
+                pass
+
+    master = collections.get(master_name)
+    in_master = {c.name for c in master.children} if master is not None else set()
+    archive = None
+    for name, _parent, action, _reason in plan.collections_dead:
+        col = collections.get(name)
+        if col is None or action == "keep":
+            continue
+        if action == "remove":
+            collections.remove(col)
+            done["collections_removed"] += 1
+            continue
+        if archive is None:
+            archive_name = f"{master_name} {ARCHIVE_ROOT}"
+            archive = collections.get(archive_name) or collections.new(archive_name)
+            if master is not None and archive.name not in in_master:
+                master.children.link(archive)
+        if col.name in in_master:
+            master.children.unlink(col)
+        archive.children.link(col)
+        if col.asset_data:
+            col.asset_clear()
+        done["collections_archived"] += 1
+
+    if cdf_path is not None and plan.catalogs_dead:
+        with cdf_lock(cdf_path):
+            entries = read_cdf(cdf_path)
+            by_uid = uid_index(entries)
+            for path, uid, archived in plan.catalogs_dead:
+                if entries.get(path, (None,))[0] != uid:
+                    continue
+                if archived:
+                    if move_catalog(entries, by_uid, uid, archived, entries[path][1]) is not None:
+                        done["catalogs_archived"] += 1
+                else:
+                    del entries[path]
+                    done["catalogs_removed"] += 1
+            write_cdf(cdf_path, entries)
+    return done
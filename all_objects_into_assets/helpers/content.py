@@ -0,0 +1,255 @@
+from array import array
+from hashlib import blake2b
+
+import bpy
+
+# RNA property types folded into content hashes (collections are not followed)
+_SIMPLE = {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}
+_SKIP = {"rna_type", "name", "name_full", "session_uid", "is_evaluated", "is_runtime_data",
+         "use_fake_user", "use_extra_user", "is_missing", "users", "tag", "is_library_indirect",
+         # Pointers that are bookkeeping, not content (a rendered preview must not change the key)
+         "preview", "original", "library", "library_weak_reference", "override_library",
+         "asset_data", "id_data", "parent"}
+# Nesting of non-ID pointer structs followed (IDs are hashed by their own digest)
+_MAX_DEPTH = 2
+# Digest of an ID whose digest is being computed (reference cycles, e.g. two Boolean targets)
+_CYCLE = b"<cycle>"
+
+
+def _ref(idb, memo) -> str:
+    # IDs by content digest, or by identity (session_uid) when 'memo' is None
+    return f"#{idb.session_uid}" if memo is None else id_digest(idb, memo).hex()
+
+def _value(v, memo) -> str:
+    """Stable repr() of a property/socket value; IDs through _ref()."""
+    if isinstance(v, bpy.types.ID):
+        return _ref(v, memo)
+    if isinstance(v, str):
+        return repr(v)
+    if hasattr(v, "to_dict"):       # ID property group
+        return repr(sorted(v.to_dict().items()))
+    try:
+        return repr(tuple(_value(x, memo) if isinstance(x, bpy.types.ID) else x for x in v))
+    except TypeError:
+        return repr(v)
+
+def _rna_values(struct, memo, depth: int = 0) -> str:
+    """
+    repr() of every simple RNA property value of 'struct' (stable across sessions).
+    Pointers are followed: IDs by id_digest() (by session_uid when 'memo' is None), other
+    structs (modifier/node settings) by their own values, up to _MAX_DEPTH levels.
+    """
+    rna = getattr(struct, "bl_rna", None)
+    if rna is None:
+        return ""
+    out = []
+    for prop in rna.properties:
+        ident = prop.identifier
+        if ident in _SKIP or (prop.type not in _SIMPLE and prop.type != 'POINTER'):
+            continue
+        try:
+            v = getattr(struct, ident)
+        except Exception:
+            continue
+        if prop.type == 'POINTER':
+            if v is None:
+                pass
+            elif isinstance(v, bpy.types.ID):
+                v = _ref(v, memo)
+            elif depth < _MAX_DEPTH:
+                v = _rna_values(v, memo, depth + 1)
+            else:
+                continue
+        elif prop.type == 'ENUM' and getattr(prop, "is_enum_flag", False):
+            v = sorted(v)
+        elif getattr(prop, "array_length", 0):
+            v = tuple(v)
+        out.append((ident, v))
+    return repr(out)
+
+def _id_props(struct, memo) -> str:
+    """ID properties of 'struct': the input values of a Geometry Nodes modifier live there."""
+    try:
+        keys = sorted(struct.keys())
+    except (AttributeError, TypeError):
+        return ""
+    return repr([(k, _value(struct[k], memo)) for k in keys])
+
+def _mesh_digest(mesh, h):
+    n = len(mesh.vertices)
+    co = array('f', bytes(4 * 3 * n))
+    mesh.vertices.foreach_get("co", co)
+    h.update(co.tobytes())
+    loops = array('i', bytes(4 * len(mesh.loops)))
+    mesh.loops.foreach_get("vertex_index", loops)
+    h.update(loops.tobytes())
+    sizes = array('i', bytes(4 * len(mesh.polygons)))
+    mesh.polygons.foreach_get("loop_total", sizes)
+    h.update(sizes.tobytes())
+
+def _node_tree_digest(tree, memo) -> bytes:
+    """Nodes (settings, input values, nested groups and images), links and group interface."""
+    key = ("NT", tree.session_uid)
+    if key not in memo:
+        memo[key] = _CYCLE
+        h = blake2b(digest_size=16)
+        for node in tree.nodes:
+            h.update(node.bl_idname.encode())
+            h.update(_rna_values(node, memo).encode())
+            for sock in node.inputs:
+                if hasattr(sock, "default_value"):
+                    h.update(_value(sock.default_value, memo).encode())
+        for link in tree.links:
+            h.update(f"{link.from_node.name}.{link.from_socket.identifier}>"
+                     f"{link.to_node.name}.{link.to_socket.identifier}".encode())
+        interface = getattr(tree, "interface", None)
+        for item in getattr(interface, "items_tree", ()):
+            h.update(_rna_values(item, memo).encode())
+        memo[key] = h.digest()
+    return memo[key]
+
+def _image_digest(img, memo) -> bytes:
+    """Source, file and size of an image (pixels are not read)."""
+    key = ("IM", img.session_uid)
+    if key not in memo:
+        h = blake2b(digest_size=16)
+        h.update(repr((img.source, img.filepath, tuple(img.size),
+                       getattr(img, "generated_type", None))).encode())
+        memo[key] = h.digest()
+    return memo[key]
+
+def _material_digest(mat, memo) -> bytes:
+    if mat is None:
+        return b"-"
+    key = ("MA", mat.session_uid)
+    if key not in memo:
+        memo[key] = _CYCLE
+        h = blake2b(digest_size=16)
+        h.update(_rna_values(mat, memo).encode())
+        tree = getattr(mat, "node_tree", None)
+        if tree is not None:
+            h.update(_node_tree_digest(tree, memo))
+        memo[key] = h.digest()
+    return memo[key]
+
+def id_digest(idb, memo) -> bytes:
+    """
+    Content digest of any ID a hashed property points to: objects, collections,
+    materials, node groups and images by their dedicated digests, other IDs (textures,
+    curves used as bevel objects' data, ...) by their RNA values.
+    """
+    if isinstance(idb, bpy.types.Object):
+        return object_content_key(idb, memo).encode()
+    if isinstance(idb, bpy.types.Collection):
+        return collection_content_key(idb, memo).encode()
+    if isinstance(idb, bpy.types.Material):
+        return _material_digest(idb, memo)
+    if isinstance(idb, bpy.types.NodeTree):
+        return _node_tree_digest(idb, memo)
+    if isinstance(idb, bpy.types.Image):
+        return _image_digest(idb, memo)
+    key = ("ID", idb.session_uid)
+    if key not in memo:
+        memo[key] = _CYCLE
+        h = blake2b(digest_size=16)
+        h.update(type(idb).__name__.encode())
+        h.update(_rna_values(idb, memo).encode())
+        memo[key] = h.digest()
+    return memo[key]
+
+def _data_digest(data, memo) -> bytes:
+    key = ("DA", data.session_uid)
+    if key not in memo:
+        memo[key] = _CYCLE
+        h = blake2b(digest_size=16)
+        h.update(type(data).__name__.encode())
+        if isinstance(data, bpy.types.Mesh):
+            _mesh_digest(data, h)
+        else:
+            # Non-mesh data: settings only (geometry of curves/volumes/etc. is not read)
+            h.update(data.name.encode())
+            h.update(_rna_values(data, memo).encode())
+        for mat in getattr(data, "materials", ()):
+            h.update(_material_digest(mat, memo))
+        memo[key] = h.digest()
+    return memo[key]
+
+def _orientation(obj) -> str:
+    """Rotation + scale (not location): they change what a preview shows."""
+    try:
+        m = obj.matrix_world.to_3x3()
+        return repr(tuple(round(v, 5) for row in m for v in row))
+    except Exception:
+        return ""
+
+
+def object_content_key(obj, memo: dict) -> str:
+    """
+    Hash of what an object's preview shows: object type, data-block content, material slots,
+    modifier stack (with what its pointers reference: Geometry Nodes groups and their input
+    values, Boolean/Array/Curve targets, textures) and orientation. Linked duplicates share
+    the result. 'memo' caches per-ID digests for the run.
+    """
+    key = ("OB", obj.session_uid)
+    if key not in memo:
+        memo[key] = _CYCLE.decode()
+        h = blake2b(digest_size=16)
+        h.update(obj.type.encode())
+        if obj.data is not None:
+            h.update(_data_digest(obj.data, memo))
+        for slot in obj.material_slots:
+            h.update(_material_digest(slot.material, memo))
+        for mod in obj.modifiers:
+            h.update(mod.type.encode())
+            h.update(_rna_values(mod, memo).encode())
+            h.update(_id_props(mod, memo).encode())
+        h.update(_orientation(obj).encode())
+        memo[key] = h.hexdigest()
+    return memo[key]
+
+def collection_content_key(coll, memo: dict) -> str:
+    """Hash of a collection asset: its objects' content keys plus their placement."""
+    key = ("GR", coll.session_uid)
+    if key not in memo:
+        memo[key] = _CYCLE.decode()
+        parts = []
+        for o in coll.all_objects:
+            try:
+                placement = repr(tuple(round(v, 5) for row in o.matrix_world for v in row))
+            except Exception:
+                placement = ""
+            parts.append(object_content_key(o, memo) + placement)
+        h = blake2b(digest_size=16)
+        for p in sorted(parts):
+            h.update(p.encode())
+        memo[key] = h.hexdigest()
+    return memo[key]
+
+def content_key(idb, memo: dict) -> str | None:
+    if isinstance(idb, bpy.types.Object):
+        return object_content_key(idb, memo)
+    if isinstance(idb, bpy.types.Collection):
+        return collection_content_key(idb, memo)
+    return None
+
+def shared_data_key(obj) -> str | None:
+    """
+    Key of what an object instances, placement aside: its data-block (by identity, not
+    content), material slots and modifier stack, including what the modifiers point to
+    (node groups, Geometry Nodes inputs, targets; also by identity). Linked duplicates
+    (Alt+D) share it. None for objects without data (empties). Session-local: built from
+    session_uids.
+    """
+    data = obj.data
+    if data is None:
+        return None
+    h = blake2b(digest_size=16)
+    h.update(f"{obj.type}:{data.session_uid}".encode())
+    for slot in obj.material_slots:
+        mat = slot.material
+        h.update(f"|{slot.link}:{mat.session_uid if mat is not None else 0}".encode())
+    for mod in obj.modifiers:
+        h.update(mod.type.encode())
+        h.update(_rna_values(mod, None).encode())
+        h.update(_id_props(mod, None).encode())
+    return h.hexdigest()
@@ -0,0 +1,44 @@
+import re
+from fnmatch import translate
+from functools import lru_cache
+
+
+class PatternMatcher:
+    """
+    'excluded_roots' patterns compiled once (case-insensitive):
+      - plain names → one set lookup
+      - patterns with '*' or '?' → a single combined glob regex
+    Results are memoized per collection name, so repeated runs skip casefold + regex.
+    No 'bpy': graph.analyze() applies it to name arrays, possibly off the main thread.
+    """
+
+    def __init__(self, patterns):
+        exact, globs = set(), []
+        for pat in patterns:
+            pat = (pat or "").strip()
+            if not pat:
+                continue
+            if ("*" in pat) or ("?" in pat):
+                globs.append(f"(?:{translate(pat.casefold())})")
+            else:
+                exact.add(pat.casefold())
+        self.exact = frozenset(exact)
+        self.regex = re.compile("|".join(globs)) if globs else None
+        self._memo = {}
+
+    def __bool__(self):
+        return bool(self.exact) or self.regex is not None
+
+    def __call__(self, name: str) -> bool:
+        hit = self._memo.get(name)
+        if hit is None:
+            nm = name.casefold()
+            hit = nm in self.exact or (self.regex is not None and self.regex.match(nm) is not None)
+            self._memo[name] = hit
+        return hit
+
+
+@lru_cache(maxsize=8)
+def compile_patterns(patterns: tuple) -> PatternMatcher:
+    return PatternMatcher(patterns)
+
@@ -0,0 +1,256 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import bpy
+
+from .catalogs import cdf_lock
+from .workers import ProcessPool, background_command
+
+_WORKER_SCRIPT = Path(__file__).with_name("export_worker.py")
+_UNSAFE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+UNASSIGNED = "Unassigned"
+# Shard files every source file exported, next to the CDF (see ExportJob)
+MANIFEST_NAME = ".aoia_export_manifest.json"
+
+
+def _safe_name(part: str) -> str:
+    return _UNSAFE.sub("_", part).strip(" .") or "_"
+
+def catalog_dir(root, cat_path: str) -> Path:
+    """Folder of a catalog's library files: its path components under 'root'."""
+    return Path(root).joinpath(*(_safe_name(p) for p in cat_path.split("/") if p))
+
+def source_stem() -> str:
+    """Shard files are named after the exporting .blend, so several files can share a library."""
+    return _safe_name(Path(bpy.data.filepath).stem) if bpy.data.filepath else "untitled"
+
+def _shard_name(stem: str, k: int, n: int) -> str:
+    return f"{stem}.blend" if n == 1 else f"{stem}_{k + 1:03d}.blend"
+
+def _is_shard_file(path: Path, stem: str) -> bool:
+    return re.fullmatch(re.escape(stem) + r"(_\d{3})?\.blend", path.name) is not None
+
+
+def catalog_shards(root, cdf_entries: dict, shard_size: int = 0, catalog_ids=None):
+    """
+    Every asset (objects and collections) of the file grouped by catalog, split into
+    shards of at most 'shard_size' assets (0 = one file per catalog), sorted by name.
+    'catalog_ids' limits the export to those catalogs (None = all). Returns
+    [(catalog path, [(out .blend, [(data attr, name)])])]; files are
+    <root>/<catalog folders>/<source_stem()>[_NNN].blend, assets in no known catalog go
+    to UNASSIGNED.
+    """
+    stem = source_stem()
+    by_uid = {uid: path for path, (uid, _simple) in cdf_entries.items()}
+    groups = {}
+    for attr in ("objects", "collections"):
+        for idb in getattr(bpy.data, attr):
+            ad = idb.asset_data
+            if not ad or getattr(idb, "library", None) is not None:
+                continue
+            uid = ad.catalog_id
+            if catalog_ids is not None and uid not in catalog_ids:
+                continue
+            groups.setdefault(by_uid.get(uid, UNASSIGNED), []).append((attr, getattr(idb, "name_full", idb.name)))
+    out = []
+    for cat_path in sorted(groups):
+        keys = sorted(groups[cat_path])
+        size = shard_size if shard_size > 0 else len(keys)
+        chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        folder = catalog_dir(root, cat_path)
+        out.append((cat_path, [(folder / _shard_name(stem, k, len(chunks)), chunk)
+                               for k, chunk in enumerate(chunks)]))
+    return out
+
+def live_folders(root, cdf_entries) -> set:
+    """Folders the file's assets export to now (all catalogs, not only the exported ones)."""
+    return {shards[0][0].parent for _cat, shards in catalog_shards(root, cdf_entries) if shards}
+
+def _stale_files(catalogs):
+    """Shard files left from an earlier export with more shards (same catalogs)."""
+    stale = []
+    stem = source_stem()
+    for _cat_path, shards in catalogs:
+        if not shards:
+            continue
+        folder = shards[0][0].parent
+        keep = {p for p, _ in shards}
+        if folder.is_dir():
+            stale += [p for p in folder.glob("*.blend") if p not in keep and _is_shard_file(p, stem)]
+    return stale
+
+
+def _source_key() -> str:
+    return str(Path(bpy.data.filepath).resolve()) if bpy.data.filepath else "untitled"
+
+def own_shards(root) -> set:
+    """Shard files (relative posix paths) the manifest lists for this source file."""
+    try:
+        data = json.loads((Path(root) / MANIFEST_NAME).read_text(encoding="utf-8"))
+        sources = data["sources"] if data.get("version") == 1 else {}
+        return set(sources.get(_source_key(), ()))
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        return set()
+
+def _update_manifest(root, written, live) -> int:
+    """
+    Record the shard files this source file wrote ('written', absolute paths) and remove
+    the ones it wrote earlier into folders its assets no longer go to ('live'): catalogs
+    moved, renamed or emptied since. Only files in the manifest are ever removed.
+    Returns how many were removed.
+    """
+    root = Path(root)
+    path = root / MANIFEST_NAME
+    removed = 0
+    with cdf_lock(path):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            sources = data["sources"] if data.get("version") == 1 else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            sources = {}
+        key = _source_key()
+        keep = {p.relative_to(root).as_posix() for p in written}
+        for rel in sources.get(key, ()):
+            p = root / rel
+            if rel in keep or not p.exists():
+                continue
+            if p.parent in live:
+                keep.add(rel)
+                continue
+            try:
+                p.unlink()
+                removed += 1
+            except OSError:
+                keep.add(rel)   # retried next time
+        sources[key] = sorted(keep)
+        tmp = path.with_name(f"{MANIFEST_NAME}.tmp{os.getpid()}")
+        tmp.write_text(json.dumps({"version": 1, "sources": sources}, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+    return removed
+
+
+class ExportJob:
+    """
+    Writes catalog shards (see catalog_shards()) to .blend files: the file is saved to a
+    snapshot and 'workers' headless Blender processes write the shards from it, so the
+    open session is never modified (writing a shard clears the asset marks of foreign
+    dependencies). step() never blocks on workers. Once every shard is written, stale
+    shard files of exported catalogs are removed and, with 'root' and 'live' (see
+    live_folders()), shards this file wrote earlier into folders none of its assets go to
+    any more (tracked in <root>/.aoia_export_manifest.json).
+    """
+
+    def __init__(self, catalogs, workers: int = 1, timeout: float | None = None, root=None, live=None):
+        self.catalogs = catalogs
+        self.shards = [s for _cat, shards in catalogs for s in shards]
+        self.total = len(self.shards)
+        self.workers = max(1, min(int(workers), self.total or 1))
+        self.timeout = timeout
+        self.root = root
+        self.live = live
+        self.done = 0
+        self.failed = 0
+        self.assets = 0
+        self.errors = []
+        self.cancelled = False
+        self.started = time.time()
+        self._pool = None
+        self._tmp = None
+        self._results = []
+        self._closed = False
+        self._counters = {"workers": 0, "worker_errors": 0, "stale_removed": 0, "orphans_removed": 0}
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or self._closed or not self.total
+
+    def _start(self):
+        self._tmp = Path(tempfile.mkdtemp(prefix="aoia_export_"))
+        snapshot = self._tmp / "snapshot.blend"
+        bpy.ops.wm.save_as_mainfile(filepath=str(snapshot), copy=True, check_existing=False)
+        self._counters["workers"] = self.workers
+        commands = []
+        for i in range(self.workers):
+            results = self._tmp / f"job_{i}.jsonl"
+            job_path = self._tmp / f"job_{i}.json"
+            job_path.write_text(json.dumps({
+                "shards": [[str(p), [list(k) for k in keys]] for p, keys in self.shards[i::self.workers]],
+                "results": str(results),
+            }), encoding="utf-8")
+            self._results.append([results, 0])
+            commands.append(background_command(_WORKER_SCRIPT, snapshot, [job_path]))
+        self._pool = ProcessPool(commands, self.workers, self._tmp / "logs", self.timeout)
+
+    def _record(self, rec):
+        if "error" in rec:
+            self.failed += 1
+            self.errors.append(f"{rec['path']}: {rec['error']}")
+        else:
+            self.done += 1
+            self.assets += rec.get("assets", 0)
+
+    def _drain(self):
+        for entry in self._results:
+            path, offset = entry
+            if not path.exists():
+                continue
+            with path.open("rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+            end = chunk.rfind(b"\n") + 1
+            entry[1] = offset + end
+            for line in chunk[:end].splitlines():
+                self._record(json.loads(line))
+
+    def step(self) -> bool:
+        if self.finished:
+            return True
+        if self._pool is None:
+            self._start()
+        self._pool.poll()
+        self._drain()
+        if not self._pool.finished:
+            return False
+        self._drain()
+        self._counters["worker_errors"] = sum(1 for c in self._pool.returncodes.values() if c != 0)
+        # Shards a crashed/timed-out worker never reported
+        self.failed += self.total - self.done - self.failed
+        if not self.failed:
+            for p in _stale_files(self.catalogs):
+                try:
+                    p.unlink()
+                    self._counters["stale_removed"] += 1
+                except OSError:
+                    pass
+            if self.root is not None and self.live is not None:
+                try:
+                    self._counters["orphans_removed"] = _update_manifest(
+                        self.root, [p for p, _keys in self.shards], self.live)
+                except (OSError, TimeoutError) as e:
+                    self.errors.append(f"{MANIFEST_NAME}: {e}")
+        self._close()
+        return True
+
+    def run(self, step: float = 0.1):
+        while not self.step():
+            time.sleep(step)
+
+    def cancel(self):
+        if self._pool is not None:
+            self._pool.terminate()
+        self.cancelled = True
+        self._close()
+
+    def _close(self):
+        self._closed = True
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+
+    def counters(self) -> dict:
+        return {"files": self.done, "failed": self.failed, "assets": self.assets, **self._counters}
@@ -0,0 +1,93 @@
+"""
+Headless library exporter, run by 'helpers/export.py' as:
+
+    blender -b --factory-startup snapshot.blend --python export_worker.py -- job.json
+
+job.json: {"shards": [[out_blend, [[data_attr, name], ...]], ...], "results": "job_N.jsonl"}
+
+Every shard's IDs (with their dependencies) are written to 'out_blend' with
+bpy.data.libraries.write; one JSON line per shard is appended to 'results' as soon as it
+is written. Standalone on purpose: it must not import the add-on package.
+"""
+import json
+import os
+import sys
+
+import bpy
+
+_ASSET_FIELDS = ("catalog_id", "catalog_simple_name", "description", "author", "copyright", "license")
+
+
+def _foreign_assets(ids, members):
+    """Assets written along with 'ids' as dependencies (collection contents, parents)."""
+    out = []
+    seen = set(members)
+    for idb in ids:
+        deps = list(getattr(idb, "all_objects", ()))
+        par = getattr(idb, "parent", None)
+        while par is not None:
+            deps.append(par)
+            par = par.parent
+        for dep in deps:
+            if dep not in seen and dep.asset_data:
+                seen.add(dep)
+                out.append(dep)
+    return out
+
+
+def _asset_state(idb):
+    ad = idb.asset_data
+    state = {f: getattr(ad, f, None) for f in _ASSET_FIELDS}
+    state["tags"] = [t.name for t in getattr(ad, "tags", ())]
+    return state
+
+
+def _restore_asset(idb, state):
+    idb.asset_mark()
+    ad = idb.asset_data
+    for f in _ASSET_FIELDS:
+        if state[f] is not None:
+            setattr(ad, f, state[f])
+    for tag in state["tags"]:
+        ad.tags.new(tag, skip_if_exists=True)
+
+
+def write_shard(path, ids) -> int:
+    """
+    Write 'ids' and their dependencies to the .blend 'path' (replaced atomically).
+    Assets among the dependencies that belong to other shards are unmarked in the written
+    copy only, so the asset browser lists every asset once. Returns the IDs written.
+    """
+    foreign = _foreign_assets(ids, ids)
+    states = [(idb, _asset_state(idb)) for idb in foreign]
+    tmp = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        for idb, _ in states:
+            idb.asset_clear()
+        bpy.data.libraries.write(tmp, set(ids), path_remap='RELATIVE_ALL', compress=True)
+    finally:
+        for idb, state in states:
+            _restore_asset(idb, state)
+    os.replace(tmp, path)
+    return len(ids)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    with open(argv[0], "r", encoding="utf-8") as f:
+        job = json.load(f)
+    with open(job["results"], "a", encoding="utf-8") as out:
+        for path, keys in job["shards"]:
+            rec = {"path": path}
+            try:
+                ids = [getattr(bpy.data, attr)[name] for attr, name in keys]
+                rec["assets"] = write_shard(path, ids)
+            except Exception as e:
+                rec["error"] = str(e)
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from array import array
+
+from .exclusions import compile_patterns
+
+# No 'bpy' here: graphs are plain arrays, analysed on a worker thread (or in another process).
+
+TOP_LEVEL = -1      # coll_parent: child of a scene collection, or of no collection at all
+
+
+class SceneGraph:
+    """
+    The collection/object graph of a plan Snapshot as flat integer arrays (picklable, no RNA),
+    across every scene and every Collection.children relation of the file.
+      collection i:  coll_names[i], coll_parent[i] (primary parent, see below), children
+                     coll_child[coll_child_start[i]:coll_child_start[i + 1]]
+      object j:      obj_parent[j] (-1 = none), collections
+                     obj_coll[obj_coll_start[j]:obj_coll_start[j + 1]] (ascending = bpy.data order)
+      top:           top-level collections in walk order
+    Top level: children of the scene collections (active scene first, then bpy.data.scenes
+    order), then collections no other collection links, in bpy.data order. The primary
+    parent of a collection linked in several places is the one it is first reached from in a
+    breadth-first walk from the top level: shallowest first, ties by that order.
+    Indices follow Snapshot.collections / Snapshot.objects.
+    """
+
+    def __init__(self):
+        self.coll_names = []
+        self.coll_parent = array("l")
+        self.coll_child_start = array("l", [0])
+        self.coll_child = array("l")
+        self.top = array("l")
+        self.obj_parent = array("l")
+        self.obj_coll_start = array("l", [0])
+        self.obj_coll = array("l")
+
+    @property
+    def n_collections(self) -> int:
+        return len(self.coll_names)
+
+    @property
+    def n_objects(self) -> int:
+        return len(self.obj_parent)
+
+    def children(self, i: int):
+        return self.coll_child[self.coll_child_start[i]:self.coll_child_start[i + 1]]
+
+    def object_collections(self, j: int):
+        return self.obj_coll[self.obj_coll_start[j]:self.obj_coll_start[j + 1]]
+
+    @classmethod
+    def from_snapshot(cls, snap):
+        g = cls()
+        colls, objs = snap.collections, snap.objects
+        g.coll_names = [c.name for c in colls]
+        for c in colls:
+            g.coll_child.extend(ch.index for ch in c.children)
+            g.coll_child_start.append(len(g.coll_child))
+        per_obj = [[] for _ in objs]
+        for c in colls:
+            for o in c.objects:
+                per_obj[o.index].append(c.index)
+        for o, members in zip(objs, per_obj):
+            g.obj_parent.append(o.parent.index if o.parent is not None else -1)
+            g.obj_coll.extend(members)
+            g.obj_coll_start.append(len(g.obj_coll))
+
+        n = len(colls)
+        is_child = bytearray(n)
+        for ch in g.coll_child:
+            is_child[ch] = 1
+        roots = [ch.index for sc in snap.scenes for ch in sc.collection.children]
+        roots += [i for i in range(n) if not is_child[i]]
+        g.coll_parent = array("l", [TOP_LEVEL]) * n
+        seen = bytearray(n)
+        top, queue = [], []
+        for i in roots:
+            if not seen[i]:
+                seen[i] = 1
+                top.append(i)
+                queue.append(i)
+        g.top = array("l", top)
+        head = 0
+        while head < len(queue):
+            i = queue[head]
+            head += 1
+            for ch in g.children(i):
+                if not seen[ch]:
+                    seen[ch] = 1
+                    g.coll_parent[ch] = i
+                    queue.append(ch)
+        return g
+
+
+class GraphAnalysis:
+    """
+    Result of analyze(), indexed like the graph:
+      excluded       bytearray per collection (master subtree + excluded_roots subtrees)
+      in_scope       bytearray per collection, or None without a scope
+      paths          per collection (path parts, catalog path, depth), see catalog_paths()
+      mirrored       collections Pass 1 turns into catalogs (in scope, not excluded, no suffix)
+      deepest        per object: mirrored collection with the deepest catalog (-1 = none)
+      obj_excluded   bytearray per object (linked in an excluded collection)
+      obj_selected   bytearray per object (processed by passes 2-3)
+    """
+
+    __slots__ = ("excluded", "in_scope", "paths", "mirrored", "deepest", "obj_excluded", "obj_selected")
+
+
+def _mark_subtrees(graph, roots, mask: bytearray):
+    stack = [i for i in roots if not mask[i]]
+    while stack:
+        i = stack.pop()
+        if mask[i]:
+            continue
+        mask[i] = 1
+        stack.extend(ch for ch in graph.children(i) if not mask[ch])
+
+
+def catalog_paths(graph, catalog_root: str):
+    """
+    (path parts, catalog path, depth) per collection along its primary parents: parts are
+    collection names from the top level down, the catalog path joins them (slashes
+    stripped, empty names dropped) under 'catalog_root', depth counts its components.
+    """
+    root = (catalog_root or "").strip("/")
+    names = graph.coll_names
+    paths = [None] * graph.n_collections
+    # Parents before children, following the primary-parent links
+    stack = [(i, (), (root,) if root else ()) for i in reversed(graph.top)]
+    while stack:
+        i, parts, cat_parts = stack.pop()
+        name = names[i]
+        parts = parts + (name,)
+        clean = name.strip("/")
+        if clean:
+            cat_parts = cat_parts + (clean,)
+        paths[i] = (parts, "/".join(cat_parts), len(cat_parts))
+        stack.extend((ch, parts, cat_parts) for ch in reversed(graph.children(i)) if graph.coll_parent[ch] == i)
+    return paths
+
+
+def excluded_mask(graph, master: int, patterns) -> bytearray:
+    """
+    Per collection: 1 inside the master collection's subtree ('master' index, -1 = none)
+    or the subtree of a collection matching 'patterns' (excluded_roots, see
+    exclusions.compile_patterns()), else 0.
+    """
+    excluded = bytearray(graph.n_collections)
+    if master >= 0:
+        _mark_subtrees(graph, (master,), excluded)
+    matcher = compile_patterns(tuple((p or "").strip() for p in patterns))
+    if matcher:
+        _mark_subtrees(graph, [i for i, nm in enumerate(graph.coll_names) if matcher(nm)], excluded)
+    return excluded
+
+
+def analyze(graph, master: int, patterns, scope, catalog_root: str, asset_suffix: str) -> GraphAnalysis:
+    """
+    Scope resolution, exclusion propagation, catalog paths and deepest-catalog selection on
+    'graph' alone. 'master' is the master collection's index (-1 = none), 'patterns' the
+    excluded_roots, 'scope' collection indices (their subtrees are included) or None.
+    """
+    n = graph.n_collections
+    an = GraphAnalysis()
+
+    an.excluded = excluded = excluded_mask(graph, master, patterns)
+
+    in_scope = None
+    if scope is not None:
+        in_scope = bytearray(n)
+        _mark_subtrees(graph, scope, in_scope)
+    an.in_scope = in_scope
+
+    an.paths = paths = catalog_paths(graph, catalog_root)
+    names = graph.coll_names
+    an.mirrored = array("l", (
+        i for i in range(n)
+        if (in_scope is None or in_scope[i]) and not excluded[i] and not names[i].endswith(asset_suffix)
+    ))
+
+    # Deepest mirrored collection per object; strict '>' keeps the first on ties
+    depth = array("l", [0]) * n
+    for i in an.mirrored:
+        depth[i] = paths[i][2]
+    m = graph.n_objects
+    deepest = array("l", [-1]) * m
+    obj_excluded = bytearray(m)
+    obj_selected = bytearray(m)
+    start, members = graph.obj_coll_start, graph.obj_coll
+    for j in range(m):
+        best, best_depth, scoped, hidden = -1, 0, in_scope is None, False
+        for k in range(start[j], start[j + 1]):
+            i = members[k]
+            if excluded[i]:
+                hidden = True
+            if not scoped and in_scope[i]:
+                scoped = True
+            if depth[i] > best_depth:
+                best, best_depth = i, depth[i]
+        deepest[j] = best
+        obj_excluded[j] = hidden
+        obj_selected[j] = scoped and not hidden
+    an.deepest = deepest
+    an.obj_excluded = obj_excluded
+    an.obj_selected = obj_selected
+    return an
@@ -0,0 +1,66 @@
+"""
+Headless library scanner, run by 'helpers/library_index.py' as:
+
+    blender -b --factory-startup --python index_worker.py -- job.json
+
+job.json: {"files": [[relative path, absolute path], ...], "results": "job_N.jsonl"}
+
+Each file's assets (of every ID type) are linked with bpy.data.libraries.load(...,
+assets_only=True), and one JSON line per file is appended to 'results':
+    {"file": relative path, "assets": [[data_attr, name, catalog uid, content key], ...]}
+or {"file": ..., "error": message}. Standalone on purpose: it must not import the add-on
+package (content.py, which only needs bpy, is loaded by path).
+"""
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import bpy
+
+
+def _load_content():
+    spec = importlib.util.spec_from_file_location("_aoia_content", Path(__file__).with_name("content.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _scan(path, content):
+    with bpy.data.libraries.load(path, link=True, assets_only=True) as (data_from, data_to):
+        attrs = [attr for attr in dir(data_from) if getattr(data_from, attr)]
+        for attr in attrs:
+            setattr(data_to, attr, list(getattr(data_from, attr)))
+    memo = {}
+    assets = []
+    try:
+        for attr in attrs:
+            for idb in getattr(data_to, attr):
+                if idb is None or not idb.asset_data:
+                    continue
+                assets.append([attr, idb.name, idb.asset_data.catalog_id, content.content_key(idb, memo)])
+    finally:
+        # Drop the linked data before the next file (names would clash across files)
+        for lib in list(bpy.data.libraries):
+            bpy.data.libraries.remove(lib)
+    return assets
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    with open(argv[0], "r", encoding="utf-8") as f:
+        job = json.load(f)
+    content = _load_content()
+    with open(job["results"], "a", encoding="utf-8") as out:
+        for rel, path in job["files"]:
+            rec = {"file": rel}
+            try:
+                rec["assets"] = _scan(path, content)
+            except Exception as e:
+                rec["error"] = str(e)
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .workers import ProcessPool, background_command
+
+# No module-level 'bpy' import: only headless workers open the library's files.
+
+INDEX_NAME = ".aoia_library_index.json"
+INDEX_VERSION = 2
+_WORKER_SCRIPT = Path(__file__).with_name("index_worker.py")
+_executor = None
+_refreshes = {}     # resolved library path -> Future of its latest refresh_async()
+
+
+class LibraryIndex:
+    """
+    What every .blend file of an asset library contains, stored next to its CDF as
+    <library>/.aoia_library_index.json:
+      {"version": 2, "files": {path relative to the library:
+          {"mtime": float, "size": int, "assets": [[data attr, name, catalog uid, content key]]}}}
+    Assets of every ID type are listed (data attr: "objects", "materials", ...).
+    refresh() rescans only files whose mtime or size changed, in headless Blender workers;
+    content_keys() answers "is this content already an asset somewhere" in O(1).
+    Content keys are content.content_key() (the same hash as the preview cache; null for
+    ID types it does not hash).
+    """
+
+    def __init__(self, lib_path):
+        self.root = Path(lib_path)
+        self.path = self.root / INDEX_NAME
+        self.files = {}
+        self._dirty = False
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.files = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            self.files = {}
+
+    def _library_files(self):
+        """relative path -> os.stat_result of every .blend in the library (hidden folders skipped)."""
+        out = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for fn in filenames:
+                if fn.endswith(".blend"):
+                    p = Path(dirpath, fn)
+                    try:
+                        out[p.relative_to(self.root).as_posix()] = p.stat()
+                    except OSError:
+                        pass
+        return out
+
+    def changed_files(self):
+        """(files to (re)scan as {relative path: stat}, relative paths no longer on disk)."""
+        current = self._library_files()
+        stale = {}
+        for rel, st in current.items():
+            ent = self.files.get(rel)
+            if ent is None or ent.get("mtime") != st.st_mtime or ent.get("size") != st.st_size:
+                stale[rel] = st
+        removed = [rel for rel in self.files if rel not in current]
+        return stale, removed
+
+    def refresh(self, workers: int = 1, timeout: float | None = None, binary=None) -> dict:
+        """
+        Bring the index up to date with the library folder (blocking) and save it.
+        Files that fail to scan are left out, so the next refresh retries them.
+        'binary' is the Blender executable (default: this one).
+        """
+        stale, removed = self.changed_files()
+        for rel in removed:
+            del self.files[rel]
+            self._dirty = True
+        failed = 0
+        if stale:
+            results = self._scan(sorted(stale), workers, timeout, binary)
+            for rel, st in stale.items():
+                assets = results.get(rel)
+                if assets is None:
+                    failed += 1
+                    self.files.pop(rel, None)
+                    continue
+                self.files[rel] = {"mtime": st.st_mtime, "size": st.st_size, "assets": assets}
+            self._dirty = True
+        self.save()
+        return {"files": len(self.files), "scanned": len(stale) - failed, "failed": failed,
+                "removed": len(removed)}
+
+    def _scan(self, rels, workers: int, timeout, binary=None):
+        """relative path -> asset rows, from up to 'workers' headless Blender processes."""
+        n = max(1, min(int(workers), len(rels)))
+        tmp = Path(tempfile.mkdtemp(prefix="aoia_index_"))
+        try:
+            commands, result_files = [], []
+            for i in range(n):
+                results = tmp / f"job_{i}.jsonl"
+                job_path = tmp / f"job_{i}.json"
+                job_path.write_text(json.dumps({
+                    "files": [[rel, str(self.root / rel)] for rel in rels[i::n]],
+                    "results": str(results),
+                }), encoding="utf-8")
+                result_files.append(results)
+                commands.append(background_command(_WORKER_SCRIPT, None, [job_path], binary))
+            ProcessPool(commands, n, tmp / "logs", timeout).wait()
+            out = {}
+            for results in result_files:
+                try:
+                    lines = results.read_text(encoding="utf-8").splitlines()
+                except OSError:
+                    continue
+                for line in lines:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue    # a worker killed mid-line
+                    if "assets" in rec:
+                        out[rec["file"]] = rec["assets"]
+            return out
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def content_keys(self, exclude=()) -> dict:
+        """Content key -> relative path of the first file holding it (files in 'exclude' skipped)."""
+        skip = set(exclude)
+        out = {}
+        for rel in sorted(self.files):
+            if rel in skip:
+                continue
+            for _attr, _name, _uid, key in self.files[rel]["assets"]:
+                if key:
+                    out.setdefault(key, rel)
+        return out
+
+    def relative(self, path) -> str | None:
+        """'path' relative to the library (posix), or None when it is outside it."""
+        try:
+            return Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+        except (OSError, ValueError):
+            return None
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{INDEX_NAME}.tmp{os.getpid()}"
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "files": self.files}), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def refresh_async(lib_path, workers: int = 1, timeout: float | None = None):
+    """
+    LibraryIndex(lib_path).refresh() on a worker thread; returns its
+    concurrent.futures.Future. While a refresh of that library is still running, that one
+    is returned instead of starting another. Callers read the saved index meanwhile (it is
+    replaced atomically), one refresh behind. Call on the main thread.
+    """
+    global _executor
+    key = str(Path(lib_path).resolve())
+    future = _refreshes.get(key)
+    if future is not None and not future.done():
+        return future
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aoia_index")
+    import bpy
+    binary = bpy.app.binary_path   # RNA is not read off the main thread
+    future = _executor.submit(lambda: LibraryIndex(key).refresh(workers, timeout, binary))
+    _refreshes[key] = future
+    return future
+
+def last_refresh(lib_path):
+    """Future of the latest refresh_async() of that library, None when there was none."""
+    return _refreshes.get(str(Path(lib_path).resolve()))
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+    _refreshes.clear()
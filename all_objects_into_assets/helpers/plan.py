@@ -0,0 +1,828 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import bpy
+
+from .utils import build_child_map, gather_descendants_map, id_alive
+from .graph import SceneGraph, analyze, TOP_LEVEL
+from .catalogs import CATALOG_PROP, ensure_catalog, uid_index, move_catalog
+from .previews import _has_preview
+from .content import shared_data_key, object_content_key
+from .stats import RunStats
+from . import sync
+
+PLAN_VERSION = 1
+
+
+def write_rows(path, data: dict) -> Path:
+    """JSON with one row per line for list values, so two reports diff cleanly."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    items = list(data.items())
+    lines = ["{"]
+    for i, (k, v) in enumerate(items):
+        sep = "," if i < len(items) - 1 else ""
+        if isinstance(v, list) and v:
+            rows = ",\n".join("  " + json.dumps(r, ensure_ascii=False) for r in v)
+            lines.append(f" {json.dumps(k)}: [\n{rows}\n ]{sep}")
+        else:
+            lines.append(f" {json.dumps(k)}: {json.dumps(v, ensure_ascii=False)}{sep}")
+    lines.append("}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+# ---------- snapshot: the scene graph as plain Python data ----------
+class SnapCollection:
+    __slots__ = ("name", "index", "session_uid", "children", "objects", "is_asset", "has_preview",
+                 "asset_catalog", "catalog_prop")
+
+    def __init__(self, name, session_uid, is_asset=False, has_preview=False, index=-1):
+        self.name = name
+        self.index = index          # position in Snapshot.collections (SceneGraph index)
+        self.session_uid = session_uid
+        self.children = []
+        self.objects = []
+        self.is_asset = is_asset
+        self.has_preview = has_preview
+        self.asset_catalog = None   # asset_data.catalog_id when it is an asset
+        self.catalog_prop = None    # CATALOG_PROP: catalog mirrored from this collection
+
+
+class SnapObject:
+    __slots__ = ("name", "index", "key", "session_uid", "parent", "users_collection", "is_asset", "has_preview",
+                 "asset_catalog", "shared_key", "content_key")
+
+    def __init__(self, name, key, session_uid, is_asset=False, has_preview=False, index=-1):
+        self.name = name
+        self.index = index          # position in Snapshot.objects (SceneGraph index)
+        self.key = key              # name_full: unique even with linked library objects
+        self.session_uid = session_uid
+        self.parent = None
+        self.users_collection = []  # collections of bpy.data.collections that link it
+        self.is_asset = is_asset
+        self.has_preview = has_preview
+        self.asset_catalog = None   # asset_data.catalog_id when it is an asset
+        self.shared_key = None      # content.shared_data_key() when captured with dedup
+        self.content_key = None     # content.object_content_key() when captured with content
+
+
+class Snapshot:
+    """
+    Everything planning reads, copied from RNA in one pass: names, session_uids, hierarchy,
+    collection membership and asset/preview state. Nodes expose the same attribute names as
+    the RNA types they mirror, so the helpers in utils/sync run on them unchanged.
+    """
+
+    def __init__(self):
+        self.scene = None           # .collection -> SnapCollection of the scene root
+        self.scenes = []            # every scene (the active one first), same form
+        self.filepath = ""
+        self.collections = []       # bpy.data.collections order
+        self.objects = []           # bpy.data.objects order
+        self.collection_by_name = {}
+        self.by_uid = {}            # session_uid -> SnapCollection
+        self.rna = {}               # SnapObject/SnapCollection -> ID (this session only)
+        self.dirty = frozenset()    # session_uids incremental sync reported (sync.dirty_state())
+        self.dirty_seq = 0
+        self.partial = False        # only some objects captured (see capture())
+
+    @classmethod
+    def capture(cls, scene, previews: bool = False, dedup: bool = False, content: bool = False,
+                objects=None):
+        """
+        'previews' also records whether each ID already has a preview (for MISSING mode),
+        'dedup' each object's shared-data key (for dedup_shared_data), 'content' each
+        object's content hash (for library index lookups).
+        'objects' (session_uids) captures only those objects with their whole parent
+        hierarchies (what an incremental run revisits for them); collections are always
+        captured whole. Such a snapshot is 'partial': collections list only the captured
+        objects, and build_plan() asks for a full one when it would need more.
+        """
+        snap = cls()
+        snap.filepath = bpy.data.filepath
+        snap.dirty, snap.dirty_seq = sync.dirty_state()
+        if objects is None:
+            source = bpy.data.objects
+        else:
+            snap.partial = True
+            source = _hierarchies(objects)
+        rna = snap.rna
+        coll_nodes = {}
+        for c in bpy.data.collections:
+            node = SnapCollection(c.name, c.session_uid, bool(c.asset_data), previews and _has_preview(c),
+                                  len(snap.collections))
+            if node.is_asset:
+                node.asset_catalog = c.asset_data.catalog_id
+            prop = c.get(CATALOG_PROP)
+            node.catalog_prop = prop if isinstance(prop, str) else None
+            coll_nodes[c] = node
+            snap.collections.append(node)
+            snap.collection_by_name.setdefault(node.name, node)
+            snap.by_uid[node.session_uid] = node
+            rna[node] = c
+        obj_nodes = {}
+        memo = {}
+        for o in source:
+            node = SnapObject(o.name, getattr(o, "name_full", o.name), o.session_uid,
+                              bool(o.asset_data), previews and _has_preview(o), len(snap.objects))
+            if node.is_asset:
+                node.asset_catalog = o.asset_data.catalog_id
+            if dedup:
+                node.shared_key = shared_data_key(o)
+            if content:
+                node.content_key = object_content_key(o, memo)
+            obj_nodes[o] = node
+            snap.objects.append(node)
+            rna[node] = o
+        for o, node in obj_nodes.items():
+            par = o.parent
+            if par is not None:
+                node.parent = obj_nodes.get(par)
+        for c, node in coll_nodes.items():
+            node.children = [coll_nodes[ch] for ch in c.children if ch in coll_nodes]
+            if snap.partial:
+                continue
+            for o in c.objects:
+                on = obj_nodes.get(o)
+                if on is not None:
+                    node.objects.append(on)
+                    on.users_collection.append(node)
+        scenes = [scene] + [s for s in bpy.data.scenes if s != scene]
+        if snap.partial:
+            # Membership from the captured objects' side (their collections are few)
+            scene_roots = {sc.collection: [] for sc in scenes}
+            for o, on in obj_nodes.items():
+                for c in o.users_collection:
+                    node = coll_nodes.get(c)
+                    if node is not None:
+                        node.objects.append(on)
+                        on.users_collection.append(node)
+                    elif c in scene_roots:
+                        scene_roots[c].append(on)
+        # Collections may live in other scenes too: their trees resolve the same way
+        for sc in scenes:
+            root = SnapCollection(sc.collection.name, getattr(sc.collection, "session_uid", 0))
+            root.children = [coll_nodes[ch] for ch in sc.collection.children if ch in coll_nodes]
+            if snap.partial:
+                root.objects = scene_roots[sc.collection]
+            else:
+                root.objects = [obj_nodes[o] for o in sc.collection.objects if o in obj_nodes]
+            snap.scenes.append(_SnapScene(root))
+        snap.scene = snap.scenes[0]
+        return snap
+
+
+def _hierarchies(uids):
+    """
+    The objects with these session_uids plus every object of their parent hierarchies
+    (topmost ancestor and all its descendants), in bpy.data.objects order. One pass reads
+    only session_uid and parent of each object.
+    """
+    uids = set(uids)
+    order, children, picked = [], {}, []
+    for o in bpy.data.objects:
+        order.append(o)
+        par = o.parent
+        if par is not None:
+            children.setdefault(par, []).append(o)
+        if o.session_uid in uids:
+            picked.append(o)
+    keep = set()
+    stack = []
+    for o in picked:
+        while o.parent is not None:
+            o = o.parent
+        stack.append(o)
+    while stack:
+        o = stack.pop()
+        if o not in keep:
+            keep.add(o)
+            stack.extend(children.get(o, ()))
+    return [o for o in order if o in keep]
+
+
+class _SnapScene:
+    __slots__ = ("collection",)
+
+    def __init__(self, collection):
+        self.collection = collection
+
+
+# ---------- plan ----------
+class Plan:
+    """
+    What a run would change, computed from a Snapshot without touching RNA.
+    to_dict()/write() give the reviewable JSON form; rows (one line each when written):
+      catalogs_added     [path, uid, simple name]
+      catalogs_moved     [old path, new path, uid, simple name]  (renamed/moved collections)
+      collection_ids     [collection name, uid]  (CATALOG_PROP to store on the collection)
+      objects            [name_full, mark, catalog uid | null, catalog simple name | null]
+      asset_collections  [name, parent object, create, [objects to link], mark, catalog uid | null,
+                          catalog simple name | null]
+    A null catalog uid leaves the asset's catalog as it is (unassigned, or already right).
+      folded             [representative name_full, [name_full of objects folded into it]]
+                         (dedup_shared_data: duplicates left unmarked)
+      in_library         [name_full, library file already holding the same content]
+                         (library index: left unmarked)
+      previews           [bpy.data attribute, name]
+    """
+
+    def __init__(self):
+        self.header = {}
+        self.master = {"name": "", "create": False}
+        self.catalogs_added = []
+        self.catalogs_moved = []
+        self.collection_ids = []
+        self.objects = []
+        self.asset_collections = []
+        self.folded = []
+        self.in_library = []
+        self.preview_mode = 'NONE'
+        self.previews = []
+        self.counts = {}
+        # Planning state reused after apply (not serialized)
+        self.snapshot = None
+        self.run_key = None
+        self.incremental = False
+        self.partial = False        # a partial snapshot did not hold enough: plan on a full one
+        self.coll_to_catalog = {}
+        self.parent_map = {}
+        self.child_map = {}
+        self.seen_objects = []
+        self.graph = None
+        self.analysis = None
+
+    def to_dict(self) -> dict:
+        return {
+            **self.header,
+            "master": self.master,
+            "counts": self.counts,
+            "preview_mode": self.preview_mode,
+            "catalogs_added": self.catalogs_added,
+            "catalogs_moved": self.catalogs_moved,
+            "collection_ids": self.collection_ids,
+            "objects": self.objects,
+            "asset_collections": self.asset_collections,
+            "folded": self.folded,
+            "in_library": self.in_library,
+            "previews": self.previews,
+        }
+
+    def write(self, path) -> Path:
+        """JSON with one row per line, so plans of two runs diff cleanly."""
+        return write_rows(path, self.to_dict())
+
+    def reflect(self, created: dict):
+        """
+        Mirror an applied plan into the snapshot (object marks and catalogs, new asset
+        collections and their object links), so fingerprints recorded from it match the
+        next run's snapshot. 'created' maps new collection names to their session_uid.
+        """
+        snap = self.snapshot
+        objs = {o.key: o for o in self.seen_objects}
+        for key, _mark, uid, _simple in self.objects:
+            on = objs.get(key)
+            if on is not None:
+                on.is_asset = True
+                if uid:
+                    on.asset_catalog = uid
+        for name, _par, create, links, *_ in self.asset_collections:
+            node = snap.collection_by_name.get(name)
+            if node is None:
+                if name not in created:
+                    continue
+                node = SnapCollection(name, created[name], True, index=len(snap.collections))
+                snap.collections.append(node)
+                snap.collection_by_name[name] = node
+                snap.by_uid[node.session_uid] = node
+            for key in links:
+                on = objs.get(key)
+                if on is not None and node not in on.users_collection:
+                    on.users_collection.append(node)
+                    node.objects.append(on)
+
+
+def build_plan(snap, prefs, cdf_entries, scope_colls=None, cdf_key="", new_catalog_uid=None, stats=None,
+               known_assets=None):
+    """
+    Passes 1–3 on a Snapshot: catalogs to create (added to 'cdf_entries'), objects to mark
+    and assign, *_asset collections to create/link/mark/assign, and preview targets.
+    'prefs' is the add-on preferences or any object with the same attributes.
+    'known_assets' maps content keys to the library file already holding them
+    (LibraryIndex.content_keys(); needs a Snapshot captured with content=True).
+    A partial Snapshot is only planned incrementally, with no changed collection and
+    dedup_shared_data off; otherwise the Plan comes back empty with 'partial' set.
+    """
+    if stats is None:
+        stats = RunStats("plan")
+    plan = Plan()
+    plan.snapshot = snap
+    master_name = prefs.master_collection_name.strip() or "Assets"
+    catalog_root = prefs.catalog_root.strip()
+    asset_suffix = prefs.asset_suffix
+    patterns = tuple((item.name or "").strip() for item in getattr(prefs, "excluded_roots", []))
+    # IDs or their session_uids (plan_async passes uids: RNA is not read off the main thread)
+    scope_uids = None
+    if scope_colls is not None:
+        scope_uids = frozenset(getattr(c, "session_uid", c) for c in scope_colls)
+    colls = snap.collections
+
+    # Scene graph -> integer arrays, analysed without touching the Snapshot nodes
+    graph = SceneGraph.from_snapshot(snap)
+    stats.lap("graph")
+    master = snap.collection_by_name.get(master_name)
+    plan.master = {"name": master_name, "create": master is None}
+    scope_idx = None if scope_uids is None else [snap.by_uid[u].index for u in scope_uids if u in snap.by_uid]
+    # Scope subtrees, master + excluded_roots subtrees (names/wildcards, case-insensitive),
+    # every catalog path from one DFS and each object's deepest mirrored collection
+    an = analyze(graph, master.index if master is not None else -1, patterns, scope_idx,
+                 catalog_root, asset_suffix)
+    stats.count("collections_excluded", sum(an.excluded))
+    # Primary-parent map (only needed to fingerprint collections; top level => None)
+    parent_map = {}
+    if prefs.incremental_sync:
+        for i, par in enumerate(graph.coll_parent):
+            parent_map[colls[i]] = None if par == TOP_LEVEL else colls[par]
+    stats.lap("analysis")
+
+    base_paths = set(cdf_entries)
+    coll_to_catalog = {}
+    # Incremental sync: reuse the previous run's fingerprints when settings + scope match
+    run_key = (cdf_key, master_name, catalog_root, asset_suffix, patterns, scope_uids)
+    incremental = prefs.incremental_sync and sync.has_previous_run(run_key)
+
+    # -------------------------
+    # Pass 1: mirror Collections -> Catalogs (respect scope)
+    # -------------------------
+    # In scope, not excluded (master + user-defined roots), not a *_asset bucket
+    iter_colls = [colls[i] for i in an.mirrored]
+    if incremental:
+        # Clean collections keep the catalog recorded by the previous run
+        iter_colls, coll_to_catalog = sync.dirty_collections(iter_colls, parent_map, cdf_entries, snap.dirty)
+    if snap.partial and (iter_colls or not incremental or prefs.dedup_shared_data):
+        # Changed collections revisit all their objects, a full run and folding every object
+        plan.partial = True
+        plan.run_key = run_key
+        return plan
+    paths = an.paths
+    # Catalogs by path and by UUID: a collection carrying the UUID of a catalog whose path
+    # no longer matches was renamed or moved, and its catalog follows it in place
+    by_uid = uid_index(cdf_entries)
+    # A UUID stays with the collection already at its path (duplicated collections copy
+    # their ID properties) and with collections reused from the previous run
+    taken = {cat[0] for cat in coll_to_catalog.values()}
+    taken.update(c.catalog_prop for c in iter_colls
+                 if c.catalog_prop and by_uid.get(c.catalog_prop) == paths[c.index][1])
+    moved_to = set()
+    for coll in iter_colls:
+        path_parts, cat_path, depth = paths[coll.index]
+        simple = path_parts[-1] if path_parts else coll.name
+        stored = coll.catalog_prop
+        old = None
+        if stored and (stored not in taken or by_uid.get(stored) == cat_path):
+            old = move_catalog(cdf_entries, by_uid, stored, cat_path, simple)
+        if old is not None:
+            uid = stored
+            plan.catalogs_moved.append([old, cat_path, uid, simple])
+            moved_to.add(cat_path)
+        else:
+            uid = ensure_catalog(cdf_entries, cat_path, simple, new_catalog_uid)
+            by_uid.setdefault(uid, cat_path)
+        taken.add(uid)
+        if uid != stored:
+            plan.collection_ids.append([coll.name, uid])
+        coll_to_catalog[coll] = (uid, simple, cat_path, depth)
+    plan.catalogs_added = [[p, *cdf_entries[p]] for p in cdf_entries
+                           if p not in base_paths and p not in moved_to]
+    stats.count("collections_mirrored", len(iter_colls))
+    stats.count("collections_cached", len(coll_to_catalog) - len(iter_colls))
+    stats.count("catalogs_created", len(plan.catalogs_added))
+    stats.count("catalogs_moved", len(plan.catalogs_moved))
+    stats.lap("pass1_catalogs")
+
+    # -------------------------
+    # Pass 2: OBJECTS -> Assets (respect scope + exclusions)
+    # -------------------------
+    child_map = build_child_map(snap.objects)
+    if incremental:
+        dirty = sync.dirty_objects(snap.objects, iter_colls, child_map, snap.dirty)
+        all_objs = [o for o in snap.objects if o in dirty]
+    else:
+        all_objs = snap.objects
+    selected, obj_excluded = an.obj_selected, an.obj_excluded
+    iter_objs = [o for o in all_objs if selected[o.index]]
+    n_excluded = sum(1 for o in all_objs if obj_excluded[o.index])
+    stats.count("objects_total", len(snap.objects))
+    stats.count("objects_considered", len(all_objs))
+    stats.count("objects_excluded", n_excluded)
+    stats.count("objects_out_of_scope", len(all_objs) - n_excluded - len(iter_objs))
+
+    deepest = an.deepest
+
+    def catalog_of(obj):
+        # (uid, simple name) of the deepest mirrored collection holding 'obj'
+        i = deepest[obj.index]
+        return coll_to_catalog[colls[i]][:2] if i >= 0 else (None, None)
+
+    if prefs.dedup_shared_data:
+        iter_objs = _fold_shared(plan, snap, iter_objs, selected, deepest, child_map)
+        stats.count("objects_folded", sum(len(r[1]) for r in plan.folded))
+    if known_assets:
+        iter_objs = _skip_in_library(plan, iter_objs, known_assets, child_map)
+        stats.count("objects_in_library", len(plan.in_library))
+
+    rows = plan.objects
+    for obj in iter_objs:
+        uid, simple = catalog_of(obj)
+        if obj.is_asset and obj.asset_catalog == uid:
+            uid = simple = None  # already in its catalog (also after a catalog moved)
+        rows.append([obj.key, not obj.is_asset, uid, simple])
+    stats.lap("pass2_plan")
+
+    # -------------------------
+    # Pass 3: parent objects -> <name>_asset collections (respect scope + exclusions)
+    # -------------------------
+    parent_objs = [o for o in iter_objs if o in child_map]
+    # Every parent's descendants from one shared post-order traversal
+    subtrees = gather_descendants_map(parent_objs, child_map)
+    linked = {}
+    n_links = 0
+    for obj in parent_objs:
+        col_name = f"{obj.name}{asset_suffix}"
+        col = snap.collection_by_name.get(col_name)
+        already = set(col.objects) if col is not None else ()
+        links = [m for m in subtrees[obj] if m not in already]
+        for m in links:
+            linked[m] = None
+        n_links += len(links)
+        uid, simple = catalog_of(obj)
+        if col is not None and col.is_asset and col.asset_catalog == uid:
+            uid = simple = None
+        plan.asset_collections.append([
+            col_name, obj.key, col is None, [m.key for m in links],
+            not (col is not None and col.is_asset), uid, simple,
+        ])
+    stats.lap("pass3_plan")
+
+    # -------------------------
+    # Previews (targets as of the snapshot)
+    # -------------------------
+    plan.preview_mode = prefs.preview_refresh_mode
+    if plan.preview_mode != 'NONE':
+        missing = plan.preview_mode == 'MISSING'
+        plan.previews = [["objects", o.name] for o in iter_objs if not (missing and o.has_preview)]
+        for row, obj in zip(plan.asset_collections, parent_objs):
+            col = snap.collection_by_name.get(row[0])
+            if not (missing and col is not None and col.has_preview):
+                plan.previews.append(["collections", row[0]])
+
+    plan.counts = {
+        "objects": len(plan.objects),
+        "objects_to_mark": sum(1 for r in plan.objects if r[1]),
+        "asset_collections": len(plan.asset_collections),
+        "asset_collections_to_create": sum(1 for r in plan.asset_collections if r[2]),
+        "links": n_links,
+        "objects_folded": sum(len(r[1]) for r in plan.folded),
+        "objects_in_library": len(plan.in_library),
+        "catalogs_added": len(plan.catalogs_added),
+        "catalogs_moved": len(plan.catalogs_moved),
+        "catalogs_total": len(cdf_entries),
+        "previews": len(plan.previews),
+    }
+    plan.header = {
+        "version": PLAN_VERSION,
+        "file": snap.filepath,
+        "cdf": cdf_key,
+        "settings": {
+            "master_collection_name": master_name,
+            "catalog_root": catalog_root,
+            "asset_suffix": asset_suffix,
+            "excluded_roots": list(patterns),
+            "scope": None if scope_idx is None else sorted(colls[i].name for i in scope_idx),
+            "incremental": bool(incremental),
+            "dedup_shared_data": bool(prefs.dedup_shared_data),
+        },
+    }
+    plan.run_key = run_key
+    plan.incremental = incremental
+    plan.coll_to_catalog = coll_to_catalog
+    plan.parent_map = parent_map
+    plan.graph = graph
+    plan.analysis = an
+    plan.child_map = child_map
+    plan.seen_objects = (all_objs + list(linked)) if incremental else snap.objects
+    return plan
+
+
+def _fold_shared(plan, snap, iter_objs, selected, deepest, child_map):
+    """
+    dedup_shared_data: objects with the same shared-data key and deepest catalog are one
+    asset. The representative is the group's first existing asset, else its first object
+    (bpy.data order); the others are left unmarked and listed in plan.folded. Groups are
+    formed over every selected object (also clean ones in incremental runs), so the
+    representative stays the same from run to run. Parents are never folded: their
+    *_asset collection depends on their children, not on their data.
+    Returns 'iter_objs' without the folded objects.
+    """
+    groups = {}
+    for obj in snap.objects:
+        if obj.shared_key is not None and selected[obj.index] and obj not in child_map:
+            groups.setdefault((obj.shared_key, deepest[obj.index]), []).append(obj)
+    folded = set()
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        rep = next((m for m in members if m.is_asset), members[0])
+        # Existing assets stay assets (and keep being assigned); only new marks are folded
+        dupes = [m for m in members if m is not rep and not m.is_asset]
+        if dupes:
+            plan.folded.append([rep.key, [m.key for m in dupes]])
+            folded.update(dupes)
+    if not folded:
+        return iter_objs
+    return [o for o in iter_objs if o not in folded]
+
+
+def _skip_in_library(plan, iter_objs, known_assets, child_map):
+    """
+    Library index: objects whose content is already an asset in another file of the
+    library are left unmarked (listed in plan.in_library). Existing assets and parents
+    (their *_asset collections) are planned as usual. Returns the remaining objects.
+    """
+    out = []
+    for obj in iter_objs:
+        where = None if obj.is_asset or obj in child_map else known_assets.get(obj.content_key)
+        if where is None:
+            out.append(obj)
+        else:
+            plan.in_library.append([obj.key, where])
+    return out
+
+
+# ---------- planning off the main thread ----------
+_executor = None
+
+def plain_prefs(prefs):
+    """The preferences build_plan() reads, copied out of RNA (safe to hand to another thread)."""
+    return SimpleNamespace(
+        master_collection_name=prefs.master_collection_name,
+        catalog_root=prefs.catalog_root,
+        asset_suffix=prefs.asset_suffix,
+        excluded_roots=[SimpleNamespace(name=item.name) for item in getattr(prefs, "excluded_roots", [])],
+        incremental_sync=prefs.incremental_sync,
+        dedup_shared_data=prefs.dedup_shared_data,
+        preview_refresh_mode=prefs.preview_refresh_mode,
+    )
+
+def plan_async(snap, prefs, cdf_entries, scope_colls=None, cdf_key="", new_catalog_uid=None, stats=None,
+               known_assets=None):
+    """
+    build_plan() on a worker thread; returns a concurrent.futures.Future of the Plan.
+    Preferences and scope are copied on the calling (main) thread; 'snap', 'cdf_entries'
+    and 'stats' belong to the worker until the future is done.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aoia_plan")
+    scope = None if scope_colls is None else [c.session_uid for c in scope_colls]
+    return _executor.submit(build_plan, snap, plain_prefs(prefs), cdf_entries, scope,
+                            cdf_key, new_catalog_uid, stats, known_assets)
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+# ---------- apply ----------
+class PlanApply:
+    """
+    Executes a Plan against RNA in batches of 'batch_size' rows (objects, then asset
+    collections). step() runs one batch, or batches until a time budget is used; run()
+    runs all. Every row is applied completely, so cancel() between steps leaves whole
+    objects/collections done and the rest untouched. IDs are resolved per row through the
+    plan's snapshot (same session) and checked against their session_uid, falling back to
+    bpy.data lookups by name: IDs removed between steps are skipped (rows_skipped), not
+    touched. Undo/redo/load between steps free every reference: callers stepping across
+    UI ticks compare sync.id_epoch() and stop instead. With 'log' (an undo.ChangeLog), the
+    inverse of every change is recorded as it is made.
+    """
+
+    def __init__(self, plan: Plan, batch_size: int = 512, scene=None, log=None):
+        self.plan = plan
+        self.scene = scene
+        self.log = log
+        self.batch_size = max(1, int(batch_size))
+        self.total = len(plan.objects) + len(plan.asset_collections)
+        self.done = 0
+        self.cancelled = False
+        self.obj_assets = []
+        self.col_assets = []
+        self.created = {}           # new collection name -> session_uid
+        self.counters = {"asset_mark_calls": 0, "catalog_assignments": 0,
+                         "asset_collections_created": 0, "links_made": 0, "link_errors": 0,
+                         "rows_skipped": 0}
+        self._master = None
+        self._objects = None
+        self._collections = None
+        self._uids = {}             # ("objects" | "collections", key) -> expected session_uid
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or (self.done >= self.total and self._master is not None)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _resolve_maps(self):
+        snap = self.plan.snapshot
+        self._objects, self._collections = {}, {}
+        if snap is not None:
+            for n in snap.objects:
+                self._objects[n.key] = snap.rna[n]
+                self._uids["objects", n.key] = n.session_uid
+            for name, n in snap.collection_by_name.items():
+                self._collections[name] = snap.rna[n]
+                self._uids["collections", name] = n.session_uid
+
+    def _get(self, attr, key):
+        """The ID planned as 'key', None when it no longer exists."""
+        cache = self._objects if attr == "objects" else self._collections
+        uid = self._uids.get((attr, key))
+        idb = cache.get(key)
+        if idb is not None:
+            try:
+                if uid is None or idb.session_uid == uid:
+                    return idb
+            except ReferenceError:
+                pass
+        # Removed since the snapshot (or not in it): look it up again, same ID only
+        idb = getattr(bpy.data, attr).get(key)
+        if idb is None or (uid is not None and idb.session_uid != uid):
+            cache.pop(key, None)
+            return None
+        cache[key] = idb
+        return idb
+
+    def _ensure_master(self):
+        # Ensure master collection exists (container for *_asset collections)
+        name = self.plan.master["name"]
+        master = bpy.data.collections.get(name)
+        if not master:
+            master = bpy.data.collections.new(name)
+            if self.log is not None:
+                self.log.master = master.name
+            scene = self.scene if self.scene is not None and id_alive(self.scene) else bpy.context.scene
+            sync.own_updates(scene)
+            try:
+                scene.collection.children.link(master)
+            except Exception:
+                pass
+        sync.own_updates(master)
+        self._master = master
+
+    def _store_catalog_ids(self):
+        # Each mirrored collection remembers its catalog, so renames move it in place
+        log = self.log
+        for name, uid in self.plan.collection_ids:
+            col = self._get("collections", name)
+            if col is None:
+                continue
+            if log is not None:
+                prev = col.get(CATALOG_PROP)
+                log.properties.append((name, prev if isinstance(prev, str) else None))
+            sync.own_updates(col)
+            col[CATALOG_PROP] = uid
+
+    def step(self, budget: float | None = None) -> bool:
+        """
+        Apply the next batch; with 'budget' (seconds), keep applying batches until it is
+        used up. True once everything is applied (or the run was cancelled).
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        if self._objects is None:
+            self._resolve_maps()
+            self._ensure_master()
+            self._store_catalog_ids()
+        elif not id_alive(self._master):
+            self._ensure_master()   # removed between steps
+        n_obj = len(self.plan.objects)
+        while not self.finished:
+            end = min(self.total, self.done + self.batch_size)
+            if self.done < n_obj:
+                self._apply_objects(self.plan.objects[self.done:min(end, n_obj)])
+            if end > n_obj:
+                self._apply_collections(self.plan.asset_collections[max(self.done, n_obj) - n_obj:end - n_obj])
+            self.done = end
+            if deadline is None or time.perf_counter() >= deadline:
+                break
+        return self.finished
+
+    def run(self):
+        while not self.step():
+            pass
+
+    def _apply_objects(self, rows):
+        for row in rows:
+            try:
+                self._apply_object(*row)
+            except ReferenceError:
+                self.counters["rows_skipped"] += 1
+
+    def _apply_object(self, key, mark, uid, simple):
+        c, log = self.counters, self.log
+        obj = self._get("objects", key)
+        if obj is None:
+            c["rows_skipped"] += 1
+            return
+        sync.own_updates(obj)
+        # Mark object as asset (only for non-excluded)
+        try:
+            if not obj.asset_data:
+                obj.asset_mark()
+                c["asset_mark_calls"] += 1
+                if log is not None:
+                    log.marked.append(("objects", key))
+            elif uid and log is not None:
+                ad = obj.asset_data
+                log.catalogs.append(("objects", key, ad.catalog_id, ad.catalog_simple_name))
+        except Exception:
+            pass
+        # Assign deepest catalog among the object's mirrored collections
+        if uid and obj.asset_data:
+            try:
+                obj.asset_data.catalog_id = uid
+                obj.asset_data.catalog_simple_name = simple
+                c["catalog_assignments"] += 1
+            except Exception:
+                pass
+        self.obj_assets.append(obj)
+
+    def _apply_collections(self, rows):
+        for row in rows:
+            try:
+                self._apply_collection(*row)
+            except ReferenceError:
+                self.counters["rows_skipped"] += 1
+
+    def _apply_collection(self, name, _parent, _create, links, _mark, uid, simple):
+        c = self.counters
+        col = self._get("collections", name)
+        # Removing a collection this run created undoes all of its changes at once
+        log = self.log
+        if not col:
+            col = bpy.data.collections.new(name)
+            self._collections[name] = col
+            self._uids["collections", name] = self.created[name] = col.session_uid
+            c["asset_collections_created"] += 1
+            if log is not None:
+                log.created.append(col.name)
+                log = None
+            sync.own_updates(col)
+            try:
+                self._master.children.link(col)
+            except Exception:
+                pass
+        sync.own_updates(col)
+
+        # Link descendants into this asset collection (planned without duplicates)
+        for key in links:
+            m = self._get("objects", key)
+            if m is None:
+                continue
+            sync.own_updates(m)
+            try:
+                col.objects.link(m)
+                c["links_made"] += 1
+                if log is not None:
+                    log.links.append((col.name, key))
+            except RuntimeError:
+                c["link_errors"] += 1
+
+        # Mark collection as asset
+        if not col.asset_data:
+            try:
+                col.asset_mark()
+                c["asset_mark_calls"] += 1
+                if log is not None:
+                    log.marked.append(("collections", col.name))
+            except Exception:
+                pass
+        elif uid and log is not None:
+            ad = col.asset_data
+            log.catalogs.append(("collections", col.name, ad.catalog_id, ad.catalog_simple_name))
+
+        # Assign collection asset to deepest catalog of the parent object
+        if uid and col.asset_data:
+            try:
+                col.asset_data.catalog_id = uid
+                col.asset_data.catalog_simple_name = simple
+                c["catalog_assignments"] += 1
+            except Exception:
+                pass
+        self.col_assets.append(col)
@@ -0,0 +1,206 @@
+import json
+import os
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from .content import content_key
+from .previews import JobProgress, preview_targets, _has_preview, _resolve
+
+CACHE_DIRNAME = ".aoia_preview_cache"
+_INDEX = "index.json"
+
+
+class PreviewCache:
+    """
+    On-disk preview cache keyed by content hash, with size-bounded LRU eviction.
+      <dir>/<key>.px  zlib-compressed packed RGBA ints ('image_pixels')
+      <dir>/index.json {key: [width, height, bytes on disk, last used]}
+    """
+
+    def __init__(self, directory, max_bytes: int):
+        self.dir = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self.entries = {}
+        self._dirty = False
+        try:
+            with (self.dir / _INDEX).open("r", encoding="utf-8") as f:
+                self.entries = {k: list(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @classmethod
+    def for_library(cls, lib_path, max_mb: int):
+        return cls(Path(lib_path) / CACHE_DIRNAME, max_mb * 1024 * 1024)
+
+    def apply(self, idb, key) -> bool:
+        """Copy cached pixels into 'idb.preview'; False on miss."""
+        ent = self.entries.get(key)
+        if not ent:
+            return False
+        w, h = ent[0], ent[1]
+        try:
+            raw = zlib.decompress((self.dir / f"{key}.px").read_bytes())
+        except (OSError, zlib.error):
+            self.entries.pop(key, None)
+            self._dirty = True
+            return False
+        pix = array('i')
+        pix.frombytes(raw)
+        if len(pix) != w * h:
+            return False
+        p = idb.preview_ensure()
+        p.image_size = (w, h)
+        p.image_pixels.foreach_set(pix)
+        ent[3] = time.time()
+        self._dirty = True
+        return True
+
+    def store(self, idb, key) -> bool:
+        """Add 'idb's current preview under 'key'."""
+        p = getattr(idb, "preview", None)
+        if p is None:
+            return False
+        w, h = p.image_size
+        if w <= 0 or h <= 0:
+            return False
+        pix = array('i', bytes(4 * w * h))
+        p.image_pixels.foreach_get(pix)
+        data = zlib.compress(pix.tobytes(), 1)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f"{key}.px.tmp{os.getpid()}"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.dir / f"{key}.px")
+        self.entries[key] = [w, h, len(data), time.time()]
+        self._dirty = True
+        return True
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits 'max_bytes'."""
+        total = sum(e[2] for e in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, ent in sorted(self.entries.items(), key=lambda kv: kv[1][3]):
+            try:
+                (self.dir / f"{key}.px").unlink()
+            except OSError:
+                pass
+            del self.entries[key]
+            total -= ent[2]
+            self._dirty = True
+            if total <= self.max_bytes:
+                break
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.evict()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f"{_INDEX}.tmp{os.getpid()}"
+        tmp.write_text(json.dumps(self.entries), encoding="utf-8")
+        os.replace(tmp, self.dir / _INDEX)
+        self._dirty = False
+
+
+class CachedPreviewJob(JobProgress):
+    """
+    Wraps a preview job: cache hits are copied into previews without rendering, only misses
+    go to the inner job (created by 'make_job(ids, mode)'), and freshly rendered misses are added
+    to the cache when it finishes. Linked duplicates share one content key, so a miss is
+    rendered once and every duplicate is filled from it.
+    """
+
+    def __init__(self, ids, mode: str, cache: PreviewCache, make_job, chunk: int = 64):
+        self.cache = cache
+        self.make_job = make_job
+        self.chunk = chunk
+        self.keys = preview_targets(ids, mode)
+        self.mode = mode
+        self.total = len(self.keys)
+        self.hits = 0
+        self.cancelled = False
+        self.started = time.time()
+        self._memo = {}
+        self._probe_pos = 0
+        self._misses = {}       # content key -> [ID keys]
+        self._inner = None
+        self._closed = False
+        self._copied = 0        # duplicates filled from their representative
+        self._dup_failed = 0    # duplicates whose representative failed to render
+
+    @property
+    def done(self) -> int:
+        return self.hits + (self._inner.done if self._inner else 0) + self._copied
+
+    @property
+    def failed(self) -> int:
+        return (self._inner.failed if self._inner else 0) + self._dup_failed
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or self._closed
+
+    def counters(self) -> dict:
+        out = super().counters()
+        out.update({"cache_hits": self.hits, "cache_copies": self._copied})
+        if self._inner is not None:
+            out.update({f"render_{k}": v for k, v in self._inner.counters().items()})
+        return out
+
+    def _probe(self, limit):
+        end = len(self.keys) if limit is None else min(len(self.keys), self._probe_pos + limit)
+        for key in self.keys[self._probe_pos:end]:
+            idb = _resolve(key)
+            ckey = content_key(idb, self._memo) if idb is not None else None
+            if ckey is not None and self.cache.apply(idb, ckey):
+                self.hits += 1
+            else:
+                self._misses.setdefault(ckey, []).append(key)
+        self._probe_pos = end
+        if self._probe_pos >= len(self.keys):
+            # Render one representative per content key; duplicates are copied afterwards
+            reps = []
+            for ckey, keys in self._misses.items():
+                reps.extend(keys if ckey is None else keys[:1])
+            self._inner = self.make_job([i for i in map(_resolve, reps) if i is not None], 'ALL')
+
+    def _close(self):
+        for ckey, keys in self._misses.items():
+            if ckey is None:
+                continue
+            rep = _resolve(keys[0])
+            if rep is None or not _has_preview(rep) or not self.cache.store(rep, ckey):
+                self._dup_failed += len(keys) - 1
+                continue
+            for key in keys[1:]:
+                idb = _resolve(key)
+                if idb is not None and self.cache.apply(idb, ckey):
+                    self._copied += 1
+                else:
+                    self._dup_failed += 1
+        self.cache.save()
+        self._closed = True
+
+    def step(self, force: bool = False) -> bool:
+        if self.finished:
+            return True
+        if self._inner is None:
+            self._probe(self.chunk)
+            return False
+        if self._inner.step(force):
+            self._close()
+        return self.finished
+
+    def run(self):
+        if self._inner is None:
+            self._probe(None)
+        self._inner.run()
+        if not self.finished:
+            self._close()
+
+    def cancel(self):
+        if self._inner is not None:
+            self._inner.cancel()
+        self.cancelled = True
+        self.cache.save()
@@ -0,0 +1,115 @@
+"""
+Headless preview renderer, run by 'helpers/preview_workers.py' as:
+
+    blender -b --factory-startup snapshot.blend --python preview_worker.py -- job.json
+
+job.json: {"items": [[data_attr, name, out_png], ...], "size": 256,
+           "engine": "BLENDER_WORKBENCH", "results": "shard_N.jsonl"}
+
+Every item is rendered to 'out_png'; one JSON line per item is appended to 'results'
+as soon as it is done, so the main session can apply previews while the shard runs.
+Standalone on purpose: it must not import the add-on package.
+"""
+import json
+import math
+import sys
+
+import bpy
+from mathutils import Euler, Vector
+
+# Same 3/4 view Blender uses for object previews
+_VIEW = Euler((math.radians(60.0), 0.0, math.radians(45.0)), 'XYZ')
+
+
+def _setup_scene(size, engine):
+    scene = bpy.data.scenes.new("AOIA_Preview")
+    scene.render.engine = engine
+    scene.render.resolution_x = size
+    scene.render.resolution_y = size
+    scene.render.resolution_percentage = 100
+    scene.render.film_transparent = True
+    scene.render.image_settings.file_format = 'PNG'
+    scene.render.image_settings.color_mode = 'RGBA'
+
+    cam = bpy.data.objects.new("AOIA_PreviewCam", bpy.data.cameras.new("AOIA_PreviewCam"))
+    cam.rotation_euler = _VIEW
+    scene.collection.objects.link(cam)
+    scene.camera = cam
+
+    sun = bpy.data.objects.new("AOIA_PreviewSun", bpy.data.lights.new("AOIA_PreviewSun", 'SUN'))
+    sun.rotation_euler = Euler((math.radians(40.0), 0.0, math.radians(20.0)), 'XYZ')
+    scene.collection.objects.link(sun)
+    return scene, cam
+
+
+def _world_corners(objs, offset=None):
+    pts = []
+    for o in objs:
+        if o.type not in {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT', 'CURVES', 'POINTCLOUD', 'VOLUME', 'GPENCIL', 'GREASEPENCIL'}:
+            continue
+        mw = o.matrix_world
+        for c in o.bound_box:
+            p = mw @ Vector(c)
+            pts.append(p - offset if offset is not None else p)
+    return pts
+
+
+def _frame(cam, pts):
+    if not pts:
+        pts = [Vector((0.0, 0.0, 0.0))]
+    lo = Vector((min(p.x for p in pts), min(p.y for p in pts), min(p.z for p in pts)))
+    hi = Vector((max(p.x for p in pts), max(p.y for p in pts), max(p.z for p in pts)))
+    center = (lo + hi) * 0.5
+    radius = max((hi - lo).length * 0.5, 1e-3)
+    half_fov = cam.data.angle * 0.5
+    dist = radius / math.sin(half_fov) * 1.05
+    forward = _VIEW.to_matrix() @ Vector((0.0, 0.0, -1.0))
+    cam.location = center - forward * dist
+    cam.data.clip_start = max(dist - radius * 2.0, 1e-3)
+    cam.data.clip_end = dist + radius * 2.0
+
+
+def _render_one(scene, cam, attr, name, out_png):
+    idb = getattr(bpy.data, attr).get(name)
+    if idb is None:
+        raise LookupError(f"{attr}['{name}'] not found")
+    if attr == "objects":
+        scene.collection.objects.link(idb)
+        cleanup = lambda: scene.collection.objects.unlink(idb)
+        pts = _world_corners([idb])
+    elif attr == "collections":
+        inst = bpy.data.objects.new("AOIA_PreviewInstance", None)
+        inst.instance_type = 'COLLECTION'
+        inst.instance_collection = idb
+        scene.collection.objects.link(inst)
+        cleanup = lambda: bpy.data.objects.remove(inst)
+        pts = _world_corners(idb.all_objects, offset=Vector(idb.instance_offset))
+    else:
+        raise TypeError(f"unsupported ID type '{attr}'")
+    try:
+        _frame(cam, pts)
+        scene.render.filepath = out_png
+        bpy.ops.render.render(write_still=True, scene=scene.name)
+    finally:
+        cleanup()
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    with open(argv[0], "r", encoding="utf-8") as f:
+        job = json.load(f)
+    scene, cam = _setup_scene(int(job.get("size", 256)), job.get("engine", "BLENDER_WORKBENCH"))
+    with open(job["results"], "a", encoding="utf-8") as out:
+        for attr, name, out_png in job["items"]:
+            rec = {"key": [attr, name]}
+            try:
+                _render_one(scene, cam, attr, name, out_png)
+                rec["png"] = out_png
+            except Exception as e:
+                rec["error"] = str(e)
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import json
+import shutil
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+import bpy
+
+from .previews import JobProgress, PreviewJob, preview_targets, _resolve
+from .workers import ProcessPool, background_command
+
+_WORKER_SCRIPT = Path(__file__).with_name("preview_worker.py")
+# A worker gets WORKER_TIMEOUT seconds to start and load the snapshot, plus ITEM_TIMEOUT per preview
+WORKER_TIMEOUT = 120.0
+ITEM_TIMEOUT = 10.0
+
+
+def apply_preview_image(idb, png_path) -> bool:
+    """Copy a rendered image into 'idb.preview' as a custom preview."""
+    img = bpy.data.images.load(str(png_path), check_existing=False)
+    try:
+        w, h = img.size
+        if w <= 0 or h <= 0:
+            return False
+        buf = array('f', bytes(4 * w * h * 4))  # preallocated, filled by foreach_get
+        img.pixels.foreach_get(buf)
+        p = idb.preview_ensure()
+        p.image_size = (w, h)
+        p.image_pixels_float.foreach_set(buf)
+        return True
+    finally:
+        bpy.data.images.remove(img)
+
+
+class WorkerPreviewJob(JobProgress):
+    """
+    Same interface as PreviewJob, but rendering happens in 'workers' headless Blender
+    processes working on a snapshot of the current file. Each worker streams one JSON line
+    per finished item; step() applies those previews on the main thread as they arrive.
+    A worker still running after 'timeout' seconds plus ITEM_TIMEOUT per item of its share
+    is killed, and the items it did not report are rendered in-process (PreviewJob) instead.
+    """
+
+    def __init__(self, ids, mode: str, workers: int, size: int = 256,
+                 engine: str = 'BLENDER_WORKBENCH', timeout: float = WORKER_TIMEOUT):
+        self.keys = preview_targets(ids, mode)
+        self.total = len(self.keys)
+        self.mode = mode
+        self.workers = max(1, int(workers))
+        self.size = size
+        self.engine = engine
+        self.timeout = timeout
+        self.done = 0
+        self.failed = 0
+        self.cancelled = False
+        self.started = time.time()
+        self._pool = None
+        self._tmp = None
+        self._closed = False
+        self._results = []  # [jsonl path, bytes consumed]
+        self._shares = []   # keys per worker
+        self._reported = set()
+        self._fallback = None   # PreviewJob for what timed-out workers left
+        self._counters = {"workers": 0, "worker_errors": 0, "worker_timeouts": 0, "fallback_items": 0}
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or self._closed or not self.total
+
+    def _start(self):
+        self._tmp = Path(tempfile.mkdtemp(prefix="aoia_previews_"))
+        snapshot = self._tmp / "snapshot.blend"
+        bpy.ops.wm.save_as_mainfile(filepath=str(snapshot), copy=True, check_existing=False)
+        n = min(self.workers, self.total)
+        self._counters["workers"] = n
+        commands = []
+        for i in range(n):
+            self._shares.append(self.keys[i::n])
+            items = [
+                [attr, name, str(self._tmp / f"{i}_{j}.png")]
+                for j, (attr, name) in enumerate(self._shares[i])
+            ]
+            results = self._tmp / f"shard_{i}.jsonl"
+            job_path = self._tmp / f"shard_{i}.json"
+            job_path.write_text(json.dumps({
+                "items": items, "size": self.size, "engine": self.engine, "results": str(results),
+            }), encoding="utf-8")
+            self._results.append([results, 0])
+            commands.append(background_command(_WORKER_SCRIPT, snapshot, [job_path]))
+        timeout = self.timeout + ITEM_TIMEOUT * len(self._shares[0])
+        self._pool = ProcessPool(commands, n, self._tmp / "logs", timeout)
+
+    def _drain(self):
+        for entry in self._results:
+            path, offset = entry
+            if not path.exists():
+                continue
+            with path.open("rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+            end = chunk.rfind(b"\n") + 1
+            entry[1] = offset + end
+            for line in chunk[:end].splitlines():
+                rec = json.loads(line)
+                self._reported.add(tuple(rec["key"]))
+                idb = _resolve(tuple(rec["key"]))
+                ok = False
+                if idb is not None and "png" in rec:
+                    try:
+                        ok = apply_preview_image(idb, rec["png"])
+                    except Exception:
+                        ok = False
+                if ok:
+                    self.done += 1
+                else:
+                    self.failed += 1
+
+    def step(self, force: bool = False) -> bool:
+        """Start workers on first call, then apply whatever they finished; never blocks on them."""
+        if self.finished:
+            return True
+        if self._fallback is not None:
+            if self._fallback.step(force):
+                self.done += self._fallback.done
+                self.failed += self._fallback.failed
+                self._close()
+            return self.finished
+        if self._pool is None:
+            self._start()
+        self._pool.poll()
+        self._drain()
+        if self._pool.finished:
+            self._drain()
+            codes = self._pool.returncodes
+            self._counters["worker_errors"] = sum(1 for c in codes.values() if c != 0)
+            self._counters["worker_timeouts"] = sum(1 for c in codes.values() if c is None)
+            # Killed on timeout: render what it left here; items a crashed worker never reported fail
+            hung = [key for i, code in codes.items() if code is None
+                    for key in self._shares[i] if key not in self._reported]
+            ids = [idb for idb in map(_resolve, hung) if idb is not None]
+            fallback = PreviewJob(ids, self.mode) if ids else None
+            left = fallback.total if fallback is not None else 0
+            self.failed += self.total - self.processed - left
+            if left:
+                self._fallback = fallback
+                self._counters["fallback_items"] = left
+            else:
+                self._close()
+        return self.finished
+
+    def run(self, step: float = 0.1):
+        while not self.step():
+            time.sleep(step)
+
+    def cancel(self):
+        if self._pool is not None:
+            self._pool.terminate()
+        if self._fallback is not None:
+            self._fallback.cancel()
+        self.cancelled = True
+        self._close()
+
+    def _close(self):
+        self._closed = True
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
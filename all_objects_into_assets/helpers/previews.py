@@ -1,23 +1,32 @@
 import bpy
 import time
-from contextlib import contextmanager
+from collections import deque
+from contextlib import contextmanager, nullcontext
 
 
 # ---------- strict detector ----------
-def _has_preview(idb) -> bool:
+def _has_preview(idb, known=None) -> bool:
+    """
+    True when 'idb' has a rendered thumbnail.
+    Reads only 'image_size': RNA sizes the pixel arrays from it (len == w*h*4), so touching
+    'image_pixels_float' would copy the whole buffer without telling us anything more.
+    'known' is an optional per-run set of session_uids already confirmed to have a preview.
+    """
+    key = getattr(idb, "session_uid", None)
+    if known is not None and key in known:
+        return True
     p = getattr(idb, "preview", None)
     if not p:
         return False
     try:
-        w, h = getattr(p, "image_size", (0, 0))
-        w = int(w or 0)
-        h = int(h or 0)
-        if w <= 0 or h <= 0:
+        w, h = p.image_size
+        if int(w or 0) <= 0 or int(h or 0) <= 0:
             return False
-        pix = getattr(p, "image_pixels_float", None)
-        return bool(pix and len(pix) >= (w * h * 4))
     except Exception:
         return False
+    if known is not None and key is not None:
+        known.add(key)
+    return True
 
 
 # ---------- asset browser ctx for ops ----------
@@ -125,9 +134,204 @@ def _wait_for_preview_jobs(timeout_sec=5.0, step=0.06):
         time.sleep(step)
 
 
+# ---------- ID references that survive across timer ticks ----------
+_DATA_ATTR = {
+    'OBJECT': "objects",
+    'COLLECTION': "collections",
+    'MATERIAL': "materials",
+    'WORLD': "worlds",
+    'NODETREE': "node_groups",
+    'ACTION': "actions",
+}
+
+def _id_key(idb):
+    attr = _DATA_ATTR.get(getattr(idb, "id_type", None))
+    return (attr, idb.name) if attr else None
+
+def _resolve(key):
+    return getattr(bpy.data, key[0]).get(key[1])
+
+def preview_targets(ids, mode: str, known=None):
+    """Unique keys of asset-bearing IDs to (re)generate; 'MISSING' skips IDs that have a preview."""
+    keys = []
+    seen = set()
+    for idb in ids:
+        if not getattr(idb, "asset_data", None):
+            continue
+        key = _id_key(idb)
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        if mode == 'MISSING' and _has_preview(idb, known):
+            continue
+        keys.append(key)
+    return keys
+
+
+# ---------- incremental job (shared by blocking + modal paths) ----------
+_STAGE_ID, _STAGE_OPS = 0, 1
+_MAX_ROUNDS = 4
+
+class JobProgress:
+    """Progress/ETA helpers shared by the preview jobs (needs total/done/failed/started)."""
+
+    def counters(self) -> dict:
+        """Totals for run instrumentation (plus job-specific '_counters')."""
+        out = {"total": self.total, "done": self.done, "failed": self.failed,
+               "cancelled": int(self.cancelled)}
+        out.update(getattr(self, "_counters", {}))
+        return out
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+    def rate(self) -> float:
+        elapsed = time.time() - self.started
+        return (self.processed / elapsed) if elapsed > 0 else 0.0
+
+    def eta(self) -> float:
+        r = self.rate()
+        return ((self.total - self.processed) / r) if r > 0 else 0.0
+
+    def status_text(self) -> str:
+        return (f"Asset previews: {self.processed}/{self.total} "
+                f"({self.rate():.1f}/s, ETA {self.eta():.0f}s) | Esc to cancel")
+
+
+class PreviewJob(JobProgress):
+    """
+    Preview refresh split into batches that never block the caller.
+    Every item carries its own retry state, mirroring the old round loop:
+      round N: ID API → (still missing) → ops fallback → (still missing) → round N+1
+    An item fails after 4 rounds, or when neither path could even submit it in a round.
+    """
+
+    def __init__(self, ids, mode: str, batch_size: int = 0, job_timeout: float = 5.0, settle: float = 0.1):
+        self.mode = mode
+        self.batch_size = batch_size      # 0 → submit everything pending at once
+        self.job_timeout = job_timeout    # max wait for RENDER_PREVIEW jobs per batch
+        self.settle = settle              # min delay before checking a batch (modal path)
+        self.pending = deque()            # [key, stage, round, submitted_this_round]
+        self.inflight = []
+        self.done = 0
+        self.failed = 0
+        self.cancelled = False
+        self.started = time.time()
+        self._submitted_at = 0.0
+        self._known = set()               # session_uids confirmed to have a preview
+        self._counters = {"batches": 0, "remove_calls": 0, "id_api_calls": 0,
+                          "ops_calls": 0, "retry_rounds": 0}
+
+        for key in preview_targets(ids, mode, self._known):
+            self.pending.append([key, _STAGE_ID, 0, False])
+        self.total = len(self.pending)
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or not (self.pending or self.inflight)
+
+    def cancel(self):
+        """Stop submitting; previews already rendering finish on their own."""
+        self.cancelled = True
+        self.pending.clear()
+        self.inflight = []
+
+    # ---- stepping ----
+    def step(self, force: bool = False) -> bool:
+        """
+        Advance without sleeping: check the in-flight batch once its render jobs are done
+        (or timed out), then submit the next batch. Returns True once finished.
+        'force' checks the in-flight batch immediately (caller already waited).
+        """
+        if self.finished:
+            return True
+        if self.inflight:
+            waited = time.time() - self._submitted_at
+            if not force:
+                if waited < self.settle:
+                    return False
+                if bpy.app.is_job_running("RENDER_PREVIEW") and waited < self.job_timeout:
+                    return False
+            self._collect()
+        if self.pending:
+            self._submit()
+        return self.finished
+
+    def run(self):
+        """Blocking: step until finished, waiting for preview jobs between batches."""
+        while not self.step(force=True):
+            _wait_for_preview_jobs(timeout_sec=self.job_timeout, step=0.06)
+
+    def _collect(self):
+        for item in self.inflight:
+            idb = _resolve(item[0])
+            if idb is None:
+                self.failed += 1
+                continue
+            if _has_preview(idb, self._known):
+                self.done += 1
+                continue
+            if item[1] == _STAGE_ID:
+                item[1] = _STAGE_OPS
+            else:
+                if not item[3]:
+                    # Neither path could submit it this round: no progress possible
+                    self.failed += 1
+                    continue
+                item[1], item[2], item[3] = _STAGE_ID, item[2] + 1, False
+                self._counters["retry_rounds"] += 1
+                if item[2] >= _MAX_ROUNDS:
+                    self.failed += 1
+                    continue
+            self.pending.append(item)
+        self.inflight = []
+
+    def _submit(self):
+        n = self.batch_size if self.batch_size > 0 else len(self.pending)
+        batch = [self.pending.popleft() for _ in range(min(n, len(self.pending)))]
+        c = self._counters
+        c["batches"] += 1
+        # Only switch an area to the Asset Browser when a remove/ops call needs it
+        needs_ctx = any(item[1] == _STAGE_OPS or item[2] == 0 for item in batch)
+        with (_asset_browser_ctx() if needs_ctx else nullcontext((None, None, None, None))) as ab_ctx:
+            for item in batch:
+                idb = _resolve(item[0])
+                if idb is None:
+                    self.failed += 1
+                    continue
+                if item[1] == _STAGE_ID:
+                    if item[2] == 0:
+                        # Force-remove first to clear any stale state (this fixes “deleted but won’t regen”)
+                        _op_remove(idb, ab_ctx)
+                        c["remove_calls"] += 1
+                    ok = _id_generate(idb)
+                    c["id_api_calls"] += 1
+                else:
+                    ok = _op_generate(idb, ab_ctx)
+                    c["ops_calls"] += 1
+                item[3] = item[3] or ok
+                self.inflight.append(item)
+        self._submitted_at = time.time()
+
+
+# ---------- hand-off to the modal operator ----------
+_queued = []
+
+def queue_previews(ids):
+    """Remember IDs for the next 'aoia.refresh_previews' invocation."""
+    _queued[:] = list(ids)
+
+def take_queued_previews():
+    ids = list(_queued)
+    _queued.clear()
+    return ids
+
+
 # ---------- public API ----------
 def refresh_previews(ids, mode: str) -> bool:
     """
+    Blocking refresh (background mode / scripts); the UI uses the modal 'aoia.refresh_previews'.
     mode:
       - 'NONE'     → do nothing
       - 'MISSING'  → for assets without a real thumbnail: FORCE remove → generate (ID API + ops fallback)
@@ -135,63 +339,5 @@ def refresh_previews(ids, mode: str) -> bool:
     """
     if mode == 'NONE':
         return True
-
-    # Unique, asset-bearing IDs
-    todo = []
-    seen = set()
-    for idb in ids:
-        if not getattr(idb, "asset_data", None):
-            continue
-        k = id(idb)
-        if k in seen:
-            continue
-        seen.add(k)
-        todo.append(idb)
-    if not todo:
-        return True
-
-    with _asset_browser_ctx() as ab_ctx:
-        if mode == 'ALL':
-            # Hard reset all
-            for idb in todo:
-                _op_remove(idb, ab_ctx)
-            targets = list(todo)
-        else:
-            # Build strict missing list
-            targets = [idb for idb in todo if not _has_preview(idb)]
-            if not targets:
-                return True
-            # Force-remove first to clear any stale state (this fixes “deleted but won’t regen”)
-            for idb in targets:
-                _op_remove(idb, ab_ctx)
-
-        # Up to 4 rounds: ID API → wait → check → ops → wait → check (repeat)
-        remaining = list(targets)
-        for _ in range(4):
-            if not remaining:
-                break
-
-            progressed = False
-
-            # A) ID API
-            for idb in list(remaining):
-                if _id_generate(idb):
-                    progressed = True
-
-            _wait_for_preview_jobs(timeout_sec=5.0, step=0.06)
-            remaining = [idb for idb in remaining if not _has_preview(idb)]
-            if not remaining:
-                break
-
-            # B) Ops fallback
-            for idb in list(remaining):
-                if _op_generate(idb, ab_ctx):
-                    progressed = True
-
-            _wait_for_preview_jobs(timeout_sec=5.0, step=0.06)
-            remaining = [idb for idb in remaining if not _has_preview(idb)]
-
-            if not progressed:
-                break
-
+    PreviewJob(ids, mode).run()
     return True
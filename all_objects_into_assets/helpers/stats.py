@@ -0,0 +1,118 @@
+import cProfile
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+
+
+class RunStats:
+    """
+    Per-pass wall time and counters for one run.
+      lap(name)        time since the previous lap (or start) is added to pass 'name'
+      count(name, n)   counters (RNA calls, links, skipped objects, preview retries, ...)
+    With profile=True a cProfile.Profile is kept; wrap work in 'with stats.profiling():'.
+    """
+
+    def __init__(self, label: str, profile: bool = False):
+        self.label = label
+        self.started = time.time()
+        self.passes = {}
+        self.counters = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self._t0 = self._last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.passes[name] = self.passes.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+    def skip(self):
+        """Restart the lap clock without recording (e.g. time spent waiting for events)."""
+        self._last = time.perf_counter()
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def update(self, counters: dict, prefix: str = ""):
+        for k, v in counters.items():
+            self.counters[prefix + k] = v
+
+    def profiling(self):
+        """Context manager enabling the profiler (no-op without profile=True)."""
+        return _Profiling(self.profiler)
+
+    def as_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "seconds": round(sum(self.passes.values()), 6),
+            "wall_seconds": round(time.perf_counter() - self._t0, 6),
+            "passes": {k: round(v, 6) for k, v in self.passes.items()},
+            "counters": dict(self.counters),
+        }
+
+    def summary(self, top: int = 3) -> str:
+        """Slowest passes, for the operator's report line."""
+        slow = sorted(self.passes.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return ", ".join(f"{k} {v:.2f}s" for k, v in slow)
+
+    def write(self, path) -> Path:
+        """
+        Append this run to a report file: '.csv' → rows (started, label, kind, name, value),
+        anything else → JSON list of runs. Returns the resolved path.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rec = self.as_dict()
+        if path.suffix.lower() == ".csv":
+            new = not path.exists()
+            with path.open("a", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(["started", "label", "kind", "name", "value"])
+                for k, v in rec["passes"].items():
+                    w.writerow([rec["started"], self.label, "seconds", k, v])
+                for k, v in rec["counters"].items():
+                    w.writerow([rec["started"], self.label, "count", k, v])
+        else:
+            runs = []
+            try:
+                runs = json.loads(path.read_text(encoding="utf-8"))
+                if not isinstance(runs, list):
+                    runs = [runs]
+            except (OSError, ValueError):
+                pass
+            runs.append(rec)
+            path.write_text(json.dumps(runs, indent=2), encoding="utf-8")
+        return path
+
+    def dump_profile(self, report_path=None) -> Path | None:
+        """Write the cProfile capture as '<report stem>-<label>-<time>.prof' (temp dir without a report)."""
+        if self.profiler is None:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        stamp += f"-{int(self.started * 1000) % 1000:03d}"
+        if report_path:
+            base = Path(report_path)
+            out = base.with_name(f"{base.stem}-{self.label}-{stamp}.prof")
+        else:
+            out = Path(tempfile.gettempdir()) / f"aoia-{self.label}-{stamp}.prof"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        self.profiler.dump_stats(str(out))
+        return out
+
+
+class _Profiling:
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def __enter__(self):
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.disable()
+        return False
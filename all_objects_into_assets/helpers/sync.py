@@ -0,0 +1,245 @@
+import bpy
+from bpy.app.handlers import persistent
+
+from .utils import walk_child_collections
+
+# session_uid of every Object/Collection the depsgraph reported since the last run ->
+# sequence number of its latest report (a run only consumes reports its snapshot saw)
+_dirty = {}
+_dirty_seq = 0
+
+# Bumped whenever the collection graph may have changed (collection/scene updates, undo, load)
+_graph_gen = 0
+
+# Bumped on undo, redo and file load: Python references to IDs are invalid after them
+_id_epoch = 0
+
+# IDs a run changes itself: their updates are neither graph changes nor edits to revisit.
+# Kept until the depsgraph update after clear_own() (the one reporting the run's last changes)
+_own = set()
+_own_expired = False
+
+# Fingerprints recorded by the last completed run (keyed by session_uid)
+_last_run = {
+    "key": None,        # settings + scope signature; a mismatch forces a full run
+    "graph": -1,        # graph generation when it was recorded
+    "objects": {},      # uid -> (name, parent uid, users_collection uids, children uids, asset state)
+    "collections": {},  # uid -> ((name, parent uid), (catalog uid, simple name, catalog path, depth))
+}
+
+
+# ---------- fingerprints ----------
+def _uid(idb) -> int:
+    return idb.session_uid if idb is not None else 0
+
+def object_fingerprint(obj, child_map):
+    """Of a SnapObject: what planning reads of it, its asset mark and catalog included."""
+    return (
+        obj.name,
+        _uid(obj.parent),
+        tuple(sorted(c.session_uid for c in obj.users_collection)),
+        tuple(sorted(ch.session_uid for ch in child_map.get(obj, ()))),
+        (obj.is_asset, obj.asset_catalog),
+    )
+
+def collection_fingerprint(coll, parent_map):
+    return (coll.name, _uid(parent_map.get(coll)))
+
+
+# ---------- incremental planning ----------
+def has_previous_run(key) -> bool:
+    return _last_run["key"] == key
+
+def dirty_state():
+    """
+    (reported session_uids, sequence number) as of now. Taken with the scene snapshot:
+    planning reads the copy, and record_run() only consumes reports up to the number.
+    """
+    return frozenset(_dirty), _dirty_seq
+
+def dirty_collections(colls, parent_map, cdf_entries, reported=frozenset()):
+    """
+    Split 'colls' into (dirty, cached) where 'cached' maps clean collections to the
+    catalog tuple recorded by the last run. A collection is dirty when it or any of its
+    ancestors was renamed/moved or reported ('reported': dirty_state() uids), or its
+    catalog no longer exists in the CDF.
+    """
+    colls = list(colls)
+    known = _last_run["collections"]
+    changed = set()
+    for coll in colls:
+        prev = known.get(coll.session_uid)
+        if prev is None or prev[0] != collection_fingerprint(coll, parent_map) or coll.session_uid in reported:
+            changed.add(coll)
+    # A renamed/moved collection changes the catalog path of its whole subtree
+    for coll in list(changed):
+        changed.update(walk_child_collections(coll))
+
+    dirty, cached = [], {}
+    for coll in colls:
+        prev = known.get(coll.session_uid)
+        if coll in changed or prev[1][2] not in cdf_entries:
+            dirty.append(coll)
+        else:
+            cached[coll] = prev[1]
+    return dirty, cached
+
+def dirty_objects(objects, dirty_colls, child_map, reported=frozenset()):
+    """
+    Return the objects passes 2–3 must revisit: objects reported by the tracker, renamed or
+    unseen since the last run (filtered by fingerprint), objects living in dirty
+    collections, and every ancestor of those (their *_asset collection links change).
+    """
+    known = _last_run["objects"]
+    picked = set()
+    for obj in objects:
+        uid = obj.session_uid
+        prev = known.get(uid)
+        if prev is None or prev[0] != obj.name or uid in reported:
+            if prev != object_fingerprint(obj, child_map):
+                picked.add(obj)
+    for coll in dirty_colls:
+        picked.update(coll.objects)
+
+    for obj in list(picked):
+        par = obj.parent
+        while par is not None and par not in picked:
+            picked.add(par)
+            par = par.parent
+    return picked
+
+
+# ---------- bookkeeping ----------
+def record_run(key, coll_to_catalog, parent_map, objects, child_map, full: bool, dirty_seq: int):
+    """
+    Store fingerprints of what was just processed; a full run replaces the whole state.
+    Reports up to 'dirty_seq' (dirty_state() of the run's snapshot) are consumed; later
+    ones (edits made while the run was planned/applied) stay for the next run.
+    """
+    if full or _last_run["key"] != key:
+        _last_run["objects"] = {}
+        _last_run["collections"] = {}
+    _last_run["key"] = key
+    cols = _last_run["collections"]
+    for coll, cat in coll_to_catalog.items():
+        cols[coll.session_uid] = (collection_fingerprint(coll, parent_map), cat)
+    objs = _last_run["objects"]
+    for obj in objects:
+        objs[obj.session_uid] = object_fingerprint(obj, child_map)
+    for uid in [u for u, seq in _dirty.items() if seq <= dirty_seq]:
+        del _dirty[uid]
+    _last_run["graph"] = _graph_gen
+
+def graph_generation() -> int:
+    return _graph_gen
+
+def change_stamp() -> tuple:
+    """Changes this module kept so far: two different stamps mean something was reported in between."""
+    return _dirty_seq, _graph_gen
+
+def objects_only() -> bool:
+    """
+    True when a run was recorded and, since then, no collection or scene changed (no graph
+    generation bump): the reported IDs are objects whose collections are as recorded.
+    """
+    return _last_run["key"] is not None and _last_run["graph"] == _graph_gen
+
+def id_epoch() -> int:
+    return _id_epoch
+
+def own_updates(*ids):
+    """Updates of these Objects/Collections/Scenes come from the run in progress (see clear_own())."""
+    global _own_expired
+    _own_expired = False
+    _own.update(idb.session_uid for idb in ids if idb is not None)
+
+def clear_own():
+    """The run is done: forget its IDs once the depsgraph has reported its last changes."""
+    global _own_expired
+    _own_expired = True
+
+def _bump_graph():
+    global _graph_gen
+    _graph_gen += 1
+
+def reset():
+    _dirty.clear()
+    _bump_graph()
+    _last_run["key"] = None
+    _last_run["graph"] = -1
+    _last_run["objects"] = {}
+    _last_run["collections"] = {}
+
+
+# ---------- handlers ----------
+def _transform_only(upd) -> bool:
+    return (getattr(upd, "is_updated_transform", False) and not getattr(upd, "is_updated_geometry", False)
+            and not getattr(upd, "is_updated_shading", False))
+
+def _same_place(obj) -> bool:
+    """Name, parent, asset state and collections as the last run recorded them (see object_fingerprint())."""
+    prev = _last_run["objects"].get(obj.session_uid)
+    if prev is None or prev[0] != obj.name or prev[1] != _uid(obj.parent):
+        return False
+    ad = obj.asset_data
+    if prev[4] != (ad is not None, ad.catalog_id if ad is not None else None):
+        return False
+    # Scene collections are embedded in their scene, not in bpy.data.collections
+    return prev[2] == tuple(sorted(c.session_uid for c in obj.users_collection if not c.is_embedded_data))
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    global _dirty_seq, _own_expired
+    for upd in depsgraph.updates:
+        idb = getattr(upd.id, "original", upd.id)
+        uid = idb.session_uid
+        if isinstance(idb, bpy.types.Object):
+            # Moving objects around, or the run's own marks/links, change nothing a run reads
+            if (uid in _own or _transform_only(upd)) and _same_place(idb):
+                continue
+        elif not isinstance(idb, (bpy.types.Collection, bpy.types.Scene)) or uid in _own:
+            continue
+        else:
+            _bump_graph()
+            if isinstance(idb, bpy.types.Scene):
+                continue
+        _dirty_seq += 1
+        _dirty[uid] = _dirty_seq
+    if _own_expired:
+        _own.clear()
+        _own_expired = False
+
+def _bump_epoch():
+    global _id_epoch, _own_expired
+    _id_epoch += 1
+    _own.clear()
+    _own_expired = False
+
+@persistent
+def _on_undo_redo(*_args):
+    _bump_epoch()
+    _bump_graph()
+
+@persistent
+def _on_load_post(*_args):
+    # session_uid values are only meaningful within one loaded file
+    _bump_epoch()
+    reset()
+
+def _handlers():
+    h = bpy.app.handlers
+    return ((h.depsgraph_update_post, _on_depsgraph_update), (h.load_post, _on_load_post),
+            (h.undo_post, _on_undo_redo), (h.redo_post, _on_undo_redo))
+
+def register():
+    for lst, fn in _handlers():
+        if fn not in lst:
+            lst.append(fn)
+
+def unregister():
+    for lst, fn in _handlers():
+        try:
+            lst.remove(fn)
+        except ValueError:
+            pass
+    reset()
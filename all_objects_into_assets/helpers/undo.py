@@ -0,0 +1,121 @@
+import bpy
+from bpy.app.handlers import persistent
+
+from .catalogs import CATALOG_PROP
+
+# Inverse of the last applied run in this session (None = nothing to revert)
+_last = None
+
+
+class ChangeLog:
+    """
+    Everything one applied run changed, recorded by PlanApply so it can be reverted
+    without a global undo snapshot. IDs are kept by name (objects by name_full): Python
+    references to IDs do not survive undo.
+      marked        [(bpy.data attribute, name)]   asset_mark() calls -> asset_clear()
+      catalogs      [(attribute, name, catalog_id, simple name)]  previous catalog of
+                    assets that already existed
+      links         [(collection name, object name_full)]  links into existing collections
+      properties    [(collection name, previous catalog UUID | None)]  catalog ID properties
+      created       new *_asset collection names (removed with their links)
+      master        master collection name when the run created it, else None
+    Catalogs added to (or moved in) the library's CDF are left as they are (they may be shared).
+    """
+
+    def __init__(self):
+        self.marked = []
+        self.catalogs = []
+        self.links = []
+        self.properties = []
+        self.created = []
+        self.master = None
+
+    def __len__(self):
+        return (len(self.marked) + len(self.catalogs) + len(self.links) + len(self.properties)
+                + len(self.created) + bool(self.master))
+
+    def counts(self) -> dict:
+        return {"marked": len(self.marked), "catalogs": len(self.catalogs), "links": len(self.links),
+                "properties": len(self.properties), "created": len(self.created),
+                "master": int(self.master is not None)}
+
+    def revert(self) -> dict:
+        """Replay the inverse, newest changes first; returns how many of each were undone."""
+        done = {"links": 0, "catalogs": 0, "marked": 0, "properties": 0, "created": 0, "master": 0}
+        objects = {getattr(o, "name_full", o.name): o for o in bpy.data.objects}
+        collections = bpy.data.collections
+        lookup = {"objects": objects.get, "collections": collections.get}
+
+        for col_name, key in reversed(self.links):
+            col, obj = collections.get(col_name), objects.get(key)
+            if col is not None and obj is not None:
+                try:
+                    col.objects.unlink(obj)
+                    done["links"] += 1
+                except RuntimeError:
+                    pass
+        for attr, name, uid, simple in reversed(self.catalogs):
+            idb = lookup[attr](name)
+            if idb is not None and idb.asset_data:
+                idb.asset_data.catalog_id = uid
+                idb.asset_data.catalog_simple_name = simple
+                done["catalogs"] += 1
+        for attr, name in reversed(self.marked):
+            idb = lookup[attr](name)
+            if idb is not None and idb.asset_data:
+                idb.asset_clear()
+                done["marked"] += 1
+        for name, prev in reversed(self.properties):
+            col = collections.get(name)
+            if col is not None:
+                if prev is None:
+                    if CATALOG_PROP in col:
+                        del col[CATALOG_PROP]
+                else:
+                    col[CATALOG_PROP] = prev
+                done["properties"] += 1
+        for name in reversed(self.created):
+            col = collections.get(name)
+            if col is not None:
+                collections.remove(col)
+                done["created"] += 1
+        if self.master:
+            col = collections.get(self.master)
+            if col is not None and not col.children and not col.objects:
+                collections.remove(col)
+                done["master"] = 1
+        return done
+
+
+def store(log):
+    """Keep 'log' as the run to revert; a run that changed nothing keeps the previous one."""
+    global _last
+    if log:
+        _last = log
+
+def last():
+    return _last
+
+def take_last():
+    global _last
+    log, _last = _last, None
+    return log
+
+
+@persistent
+def _on_load_post(*_args):
+    # Names in the log refer to the file that was open when it was recorded
+    global _last
+    _last = None
+
+def register():
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    global _last
+    try:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    except ValueError:
+        pass
+    _last = None
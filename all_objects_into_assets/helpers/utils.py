@@ -1,41 +1,63 @@
 import bpy
 from pathlib import Path
 
-def gather_descendants(obj):
-    out = [obj]
-    for c in obj.children:
-        out.extend(gather_descendants(c))
-    return out
+def id_alive(idb) -> bool:
+    """False for a Python reference to an ID that was removed (or freed by undo/load)."""
+    try:
+        idb.session_uid
+        return True
+    except ReferenceError:
+        return False
 
-def build_parent_map_from_scene(scene):
-    parent_map = {}
-    def walk(parent):
-        for ch in parent.children:
-            parent_map[ch] = parent
-            walk(ch)
-    walk(scene.collection)
-    return parent_map
+# bpy.data collections of the ID types that can be assets
+ASSET_ID_TYPES = ("actions", "brushes", "collections", "materials", "node_groups", "objects", "worlds")
 
-def collection_path(coll, parent_map):
-    path = [coll.name]
-    cur = coll
-    visited = set()
-    while cur in parent_map and cur not in visited:
-        visited.add(cur)
-        par = parent_map[cur]
-        if par is None or par == bpy.context.scene.collection:
-            break
-        path.append(par.name)
-        cur = par
-    path.reverse()
-    return path
+def asset_catalog_ids(attrs=ASSET_ID_TYPES) -> set:
+    """Catalog UUIDs the assets of this file use, over every asset ID type."""
+    out = set()
+    for attr in attrs:
+        for idb in getattr(bpy.data, attr, ()):
+            if idb.asset_data:
+                out.add(idb.asset_data.catalog_id)
+    return out
 
-def normalize_catalog_path(path_parts, root_prefix):
-    parts = []
-    if root_prefix:
-        parts.append(root_prefix.strip("/"))
-    parts.extend([p.strip("/") for p in path_parts if p])
-    return "/".join([p for p in parts if p])
+def build_child_map(objects):
+    """
+    Object -> list of direct children, from a single scan of 'Object.parent'.
+    (Object.children costs O(len(bpy.data.objects)) per access.)
+    """
+    child_map = {}
+    for o in objects:
+        par = o.parent
+        if par is not None:
+            child_map.setdefault(par, []).append(o)
+    return child_map
+
+def gather_descendants_map(roots, child_map):
+    """
+    Return {root: [root, *descendants]} for every object in 'roots' (depth-first, children
+    in 'child_map' order). One iterative post-order traversal: each subtree list is built
+    once and reused by every ancestor instead of re-walking it per parent.
+    """
+    memo = {}
+    for root in roots:
+        if root in memo:
+            continue
+        stack = [(root, False)]
+        while stack:
+            obj, expanded = stack.pop()
+            if obj in memo:
+                continue
+            kids = child_map.get(obj, ())
+            if expanded:
+                out = [obj]
+                for ch in kids:
+                    out.extend(memo[ch])
+                memo[obj] = out
+            else:
+                stack.append((obj, True))
+                stack.extend((ch, False) for ch in kids if ch not in memo)
+    return {r: memo[r] for r in roots}
 
 def resolve_library_path(name: str) -> Path | None:
     if name == "LOCAL":
@@ -48,10 +70,12 @@ def resolve_library_path(name: str) -> Path | None:
     return None
 
 def walk_child_collections(col):
-    """Yield 'col' and all nested child collections (depth-first)."""
-    yield col
-    for ch in col.children:
-        yield from walk_child_collections(ch)
+    """Yield 'col' and all nested child collections (depth-first, pre-order; iterative)."""
+    stack = [col]
+    while stack:
+        c = stack.pop()
+        yield c
+        stack.extend(reversed(c.children))
 
 def outliner_selected_collections(context):
     """
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import time
+from pathlib import Path
+
+# No module-level 'bpy' import: the batch CLI driver uses this module outside Blender.
+
+
+def default_worker_count() -> int:
+    return max(1, (os.cpu_count() or 2) // 2)
+
+def background_command(script, blend_path=None, args=(), binary=None):
+    """
+    Command line for a headless Blender running 'script' (optionally on 'blend_path').
+    Arguments after '--' are left for the script (sys.argv[sys.argv.index("--") + 1:]).
+    """
+    if binary is None:
+        import bpy
+        binary = bpy.app.binary_path
+    cmd = [binary, "-b", "--factory-startup"]
+    if blend_path:
+        cmd.append(str(blend_path))
+    cmd += ["--python-exit-code", "1", "--python", str(script), "--"]
+    cmd += [str(a) for a in args]
+    return cmd
+
+
+class ProcessPool:
+    """
+    Run command lines with at most 'size' processes alive at once.
+    poll() never blocks, so it can be driven from a modal timer; wait() blocks.
+    Each process writes stdout/stderr to '<log_dir>/<index>.log'.
+    """
+
+    def __init__(self, commands, size: int, log_dir, timeout: float | None = None):
+        self.commands = list(commands)
+        self.size = max(1, int(size))
+        self.log_dir = Path(log_dir)
+        self.timeout = timeout
+        self.returncodes = {}       # index -> return code (None = killed on timeout/cancel)
+        self.durations = {}         # index -> wall seconds
+        self._queue = list(range(len(self.commands)))
+        self._running = {}          # index -> (Popen, log file, start time)
+
+    @property
+    def finished(self) -> bool:
+        return not (self._queue or self._running)
+
+    def poll(self):
+        """Reap finished processes, start queued ones; return indices finished by this call."""
+        done = []
+        now = time.time()
+        for idx, (proc, log, started) in list(self._running.items()):
+            code = proc.poll()
+            if code is None and self.timeout and (now - started) > self.timeout:
+                proc.kill()
+                proc.wait()
+                code = None
+            elif code is None:
+                continue
+            log.close()
+            del self._running[idx]
+            self.returncodes[idx] = code
+            self.durations[idx] = now - started
+            done.append(idx)
+        while self._queue and len(self._running) < self.size:
+            idx = self._queue.pop(0)
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            log = open(self.log_dir / f"{idx}.log", "wb")
+            proc = subprocess.Popen(self.commands[idx], stdout=log, stderr=subprocess.STDOUT)
+            self._running[idx] = (proc, log, time.time())
+        return done
+
+    def wait(self, step: float = 0.1):
+        while not self.finished:
+            self.poll()
+            if not self.finished:
+                time.sleep(step)
+        return dict(self.returncodes)
+
+    def terminate(self):
+        self._queue.clear()
+        for idx, (proc, log, _) in list(self._running.items()):
+            try:
+                proc.terminate()
+                proc.wait(timeout=5)
+            except Exception:
+                proc.kill()
+            log.close()
+            self.returncodes[idx] = None
+        self._running.clear()
@@ -1,51 +1,316 @@
 import bpy
+import tempfile
 from pathlib import Path
-from fnmatch import fnmatchcase
 
 from .helpers.utils import (
-    gather_descendants,
-    build_parent_map_from_scene,
-    collection_path,
-    normalize_catalog_path,
+    asset_catalog_ids,
+    build_child_map,
+    id_alive,
     resolve_library_path,
     collections_scope_from_context,
-    walk_child_collections,  # for exclusions
 )
-from .helpers.catalogs import read_cdf, write_cdf, ensure_catalog
-from .helpers.previews import refresh_previews
+from .helpers.plan import Snapshot, build_plan, plan_async, PlanApply
+from .helpers.catalogs import CATALOG_PROP, read_cdf, read_history, record_history, cdf_lock, merge_cdf
+from .helpers.previews import PreviewJob, queue_previews, take_queued_previews
+from .helpers.preview_workers import WorkerPreviewJob
+from .helpers.preview_cache import PreviewCache, CachedPreviewJob
+from .helpers.export import ExportJob, catalog_shards, live_folders, own_shards
+from .helpers.library_index import LibraryIndex, last_refresh, refresh_async
+from .helpers.cleanup import ARCHIVE_ROOT, build_cleanup_plan, apply_cleanup
+from .helpers.stats import RunStats
+from .helpers.undo import ChangeLog
+from .helpers import sync, undo
+
+
+def _make_preview_job(prefs, ids, mode: str, lib_path=None):
+    """
+    In-process batched job, or a pool of headless Blender workers (per preferences),
+    optionally behind the content-hash preview cache stored in the target library.
+    """
+    def make(job_ids, job_mode):
+        if prefs.preview_backend == 'WORKERS':
+            return WorkerPreviewJob(job_ids, job_mode, prefs.preview_workers, size=prefs.preview_resolution)
+        return PreviewJob(job_ids, job_mode, batch_size=prefs.preview_batch_size)
 
+    if prefs.preview_cache and lib_path is not None:
+        cache = PreviewCache.for_library(lib_path, prefs.preview_cache_mb)
+        return CachedPreviewJob(ids, mode, cache, make)
+    return make(ids, mode)
 
-def _resolve_collections_by_name(pattern: str):
+
+def _remap_catalog_ids(assets, remap: dict):
+    for idb in assets:
+        try:
+            ad = idb.asset_data
+            if ad and ad.catalog_id in remap:
+                ad.catalog_id = remap[ad.catalog_id]
+        except Exception:
+            pass
+
+
+def run_all_objects_into_assets(context, prefs, lib_path, scope_colls, report,
+                                write_catalogs=True, new_catalog_uid=None, stats=None, dry_run=False,
+                                change_log=None):
+    """
+    Passes 1–3, catalog persistence and preview refresh for 'scope_colls' (None => all).
+    'prefs' is the add-on preferences or any object with the same attributes (batch CLI).
+    'report(levels, message)' receives errors. With write_catalogs=False the CDF is only
+    read; new catalogs are returned for the caller to merge. 'new_catalog_uid(path)' mints
+    UUIDs for new catalogs (default: random). Per-pass times and counters go to 'stats'
+    (a RunStats; a fresh one when None), returned as summary["stats"].
+    The run is planned on a snapshot first (summary["plan"]); dry_run=True stops there
+    without touching the file or the catalogs. 'change_log' (an undo.ChangeLog) records
+    the inverse of every applied change.
+    Returns a summary dict, or None when the run failed.
+    """
+    if stats is None:
+        stats = RunStats("run")
+    run = _begin_run(context, prefs, lib_path, stats, report)
+    plan = build_plan(run["snapshot"], prefs, run["cdf_entries"], scope_colls, str(run["cdf_path"]),
+                      new_catalog_uid, stats, run["known_assets"])
+    summary = _plan_summary(plan, run, stats)
+    if dry_run:
+        return summary
+    return _apply_run(context, prefs, run, summary, report, write_catalogs, change_log=change_log)
+
+
+def _own_files(index) -> set:
+    """Files of the indexed library that are this file's: itself and the shards it exported."""
+    own = own_shards(index.root)
+    rel = index.relative(bpy.data.filepath) if bpy.data.filepath else None
+    if rel:
+        own.add(rel)
+    return own
+
+
+def _begin_run(context, prefs, lib_path, stats, report, objects=None) -> dict:
+    """
+    Main-thread part before planning: scene snapshot ('objects': a partial one, see
+    Snapshot.capture()), the current library catalogs and, with the library index on, the
+    content already stored in the library's other files.
+    In the UI the index is refreshed in the background (the run uses it as last saved);
+    headless runs refresh it first.
+    """
+    lib_path = Path(lib_path)
+    cdf_path = lib_path / "blender_assets.cats.txt"
+    known_assets = None
+    if prefs.library_index:
+        try:
+            if bpy.app.background:
+                stats.update(LibraryIndex(lib_path).refresh(prefs.library_index_workers), "library_index_")
+            else:
+                previous = last_refresh(lib_path)
+                if previous is not None and previous.done():
+                    stats.update(previous.result(), "library_index_")
+                refresh_async(lib_path, prefs.library_index_workers)
+        except Exception as e:
+            report({'WARNING'}, f"Library index not refreshed: {e}")
+        index = LibraryIndex(lib_path)
+        # This file's own assets (also as exported shards) are not duplicates of themselves
+        known_assets = index.content_keys(exclude=_own_files(index))
+        stats.lap("library_index")
+    # Scene graph -> plain data, then everything is computed on that copy
+    snap = Snapshot.capture(context.scene, previews=(prefs.preview_refresh_mode == 'MISSING'),
+                            dedup=prefs.dedup_shared_data, content=bool(known_assets), objects=objects)
+    stats.lap("snapshot")
+    cdf_entries = read_cdf(cdf_path)
+    stats.lap("read_cdf")
+    return {
+        "lib_path": lib_path,
+        "cdf_path": cdf_path,
+        "snapshot": snap,
+        "cdf_entries": cdf_entries,
+        "base_entries": dict(cdf_entries),  # merge base if another writer updates the CDF meanwhile
+        "graph_generation": sync.graph_generation(),
+        "id_epoch": sync.id_epoch(),
+        "known_assets": known_assets,
+    }
+
+
+def _plan_summary(plan, run, stats) -> dict:
+    return {
+        "objects": plan.counts["objects"],
+        "collections": plan.counts["asset_collections"],
+        "catalogs": len(run["cdf_entries"]),
+        "catalogs_added": {p: (uid, simple) for p, uid, simple in plan.catalogs_added},
+        "catalogs_moved": [tuple(row) for row in plan.catalogs_moved],
+        "folded": plan.counts["objects_folded"],
+        "in_library": plan.counts["objects_in_library"],
+        "incremental": plan.incremental,
+        "previews": 'NONE',
+        "exported": 0,
+        "cancelled": False,
+        "plan": plan,
+        "stats": stats,
+    }
+
+
+def _apply_run(context, prefs, run, summary, report, write_catalogs=True, applier=None, change_log=None):
+    """
+    Main-thread part after planning: apply the plan, persist catalogs, refresh previews,
+    export the library files.
+    'applier' is a PlanApply already stepped by the caller (modal operator); when it was
+    cancelled, catalogs are still persisted for the rows applied so far, previews are
+    skipped and the incremental-sync state is dropped (the next run is a full one).
     """
-    Resolve collections by name pattern:
-      - Exact case-insensitive match (most common)
-      - If the pattern contains '*' or '?', use glob-style matching (case-insensitive)
-    Returns a list (can be multiple when names are duplicated).
+    plan, stats = summary["plan"], summary["stats"]
+    lib_path, cdf_path = run["lib_path"], run["cdf_path"]
+    base_entries, cdf_entries = run["base_entries"], run["cdf_entries"]
+    refresh_mode = plan.preview_mode
+
+    # -------------------------
+    # Apply the plan to the file
+    # -------------------------
+    if applier is None:
+        applier = PlanApply(plan, scene=context.scene, log=change_log)
+        applier.run()
+        stats.lap("apply")
+    sync.clear_own()
+    stats.update(applier.counters)
+    if applier.log is not None:
+        stats.count("undo_log_entries", len(applier.log))
+    # Applied over several UI ticks: some of the IDs may have been removed since
+    obj_assets = [idb for idb in applier.obj_assets if id_alive(idb)]
+    col_assets = [idb for idb in applier.col_assets if id_alive(idb)]
+    summary["cancelled"] = applier.cancelled
+    if applier.cancelled:
+        summary["objects"] = len(obj_assets)
+        summary["collections"] = len(col_assets)
+
+    # -------------------------
+    # Persist catalogs to disk
+    # -------------------------
+    catalogs_added = summary["catalogs_added"]
+    if write_catalogs:
+        try:
+            lib_path.mkdir(parents=True, exist_ok=True)
+            # Other sessions/farm jobs may write the same library: lock, re-read, merge, write
+            with cdf_lock(cdf_path):
+                cdf_entries, remap, written = merge_cdf(cdf_path, base_entries, cdf_entries)
+                stats.count("cdf_written", int(written))
+                # What cleanup may prune later: only catalogs runs mirrored
+                record_history(cdf_path, {remap.get(cat[0], cat[0]) for cat in plan.coll_to_catalog.values()})
+                # Unchanged catalogs: no write, no catalog reload in sessions watching the library
+                if written:
+                    try:
+                        bpy.ops.asset.catalogs_save()
+                    except Exception:
+                        pass
+        except Exception as e:
+            report({'ERROR'}, f"Catalog write failed: {e}")
+            return None
+        stats.count("catalog_uid_remaps", len(remap))
+        if remap:
+            # Another writer created some of our new paths first: adopt its UUIDs
+            _remap_catalog_ids(obj_assets + col_assets, remap)
+            for name, uid in plan.collection_ids:
+                col = bpy.data.collections.get(name)
+                if col is not None and uid in remap:
+                    col[CATALOG_PROP] = remap[uid]
+            coll_to_catalog = plan.coll_to_catalog
+            for coll, cat in coll_to_catalog.items():
+                if cat[0] in remap:
+                    coll_to_catalog[coll] = (remap[cat[0]],) + cat[1:]
+        catalogs_added = {p: cdf_entries[p] for p in catalogs_added if p in cdf_entries}
+    stats.lap("cdf_write")
+
+    # Remember what this run saw so the next incremental run can diff against it
+    if applier.cancelled:
+        sync.reset()
+    elif prefs.incremental_sync:
+        plan.reflect(applier.created)
+        sync.record_run(plan.run_key, plan.coll_to_catalog, plan.parent_map, plan.seen_objects,
+                        build_child_map(plan.snapshot.objects), full=not plan.incremental,
+                        dirty_seq=plan.snapshot.dirty_seq)
+        stats.lap("sync_record")
+
+    # -------------------------
+    # Preview refresh (optional)
+    # -------------------------
+    previews = 'NONE'
+    if refresh_mode != 'NONE' and not applier.cancelled:
+        # Exported files carry the previews: render them before exporting
+        if prefs.preview_async and not bpy.app.background and not prefs.export_library_files:
+            # Hand off to the modal, batched preview operator so the UI stays responsive
+            queue_previews(list(obj_assets) + list(col_assets))
+            started = bpy.ops.aoia.refresh_previews('INVOKE_DEFAULT', mode=refresh_mode) == {'RUNNING_MODAL'}
+            previews = 'QUEUED' if started else 'DONE'
+        else:
+            job = _make_preview_job(prefs, list(obj_assets) + list(col_assets), refresh_mode, lib_path)
+            job.run()
+            stats.update(job.counters(), "preview_")
+            previews = 'DONE'
+        stats.lap("previews")
+
+    # -------------------------
+    # Export catalogs to library files (optional)
+    # -------------------------
+    exported = 0
+    if prefs.export_library_files and not applier.cancelled:
+        # Catalogs of this run's assets are rewritten whole (shards of other catalogs are kept)
+        touched = {idb.asset_data.catalog_id for idb in list(obj_assets) + list(col_assets) if idb.asset_data}
+        job = ExportJob(catalog_shards(lib_path, cdf_entries, prefs.export_shard_size, touched),
+                        prefs.export_workers, root=lib_path, live=live_folders(lib_path, cdf_entries))
+        job.run()
+        stats.update(job.counters(), "export_")
+        if job.failed:
+            report({'WARNING'}, f"{job.failed} library files could not be exported"
+                                + (f" ({job.errors[0]})" if job.errors else ""))
+        exported = job.done
+        stats.lap("export")
+
+    summary.update({
+        "catalogs": len(cdf_entries),
+        "catalogs_added": catalogs_added,
+        "previews": previews,
+        "exported": exported,
+    })
+    return summary
+
+
+def _stats_for(prefs, label: str) -> RunStats:
+    return RunStats(label, profile=getattr(prefs, "stats_profile", False))
+
+def _save_stats(prefs, stats: RunStats, report):
+    """Write the JSON/CSV report and .prof capture when enabled in preferences."""
+    path = bpy.path.abspath(getattr(prefs, "stats_report_path", "") or "")
+    out = []
+    try:
+        if path:
+            out.append(str(stats.write(path)))
+        prof = stats.dump_profile(path or None)
+        if prof:
+            out.append(str(prof))
+    except Exception as e:
+        report({'WARNING'}, f"Could not write run statistics: {e}")
+    return out
+
+def _save_plan(prefs, plan, report, dry_run: bool, kind: str = ""):
+    """
+    Write the change plan JSON when a plan path is set (dry runs fall back to the temp
+    folder). Other kinds of plans ('kind', e.g. "cleanup") go next to it as <name>.<kind>.json.
     """
-    pat = (pattern or "").strip()
-    if not pat:
-        return []
-    wildcard = ("*" in pat) or ("?" in pat)
-    if wildcard:
-        pat_l = pat.casefold()
-        return [c for c in bpy.data.collections if fnmatchcase(c.name.casefold(), pat_l)]
-    else:
-        nm_l = pat.casefold()
-        return [c for c in bpy.data.collections if c.name.casefold() == nm_l]
-
-
-def _object_in_excluded(obj, excluded_cols: set) -> bool:
+    path = bpy.path.abspath(getattr(prefs, "plan_report_path", "") or "")
+    if path and kind:
+        p = Path(path)
+        path = str(p.with_name(f"{p.stem}.{kind}{p.suffix or '.json'}"))
+    if not path:
+        if not dry_run:
+            return None
+        path = str(Path(tempfile.gettempdir()) / (f"aoia_{kind}.json" if kind else "aoia_plan.json"))
     try:
-        return any((c in excluded_cols) for c in obj.users_collection)
-    except Exception:
-        return False
+        return plan.write(path)
+    except Exception as e:
+        report({'WARNING'}, f"Could not write change plan: {e}")
+        return None
 
 
 class OUTLINER_OT_all_objects_into_assets(bpy.types.Operator):
     """Create per-parent collection assets, mark objects as assets, and mirror Collections into Catalogs."""
     bl_idname = "outliner.all_objects_into_assets"
     bl_label = "All Objects into Assets (Hierarchy)"
-    bl_options = {'REGISTER', 'UNDO'}
+    # Undo is pushed by the run itself, per the 'Undo' preference (see _finish_report)
+    bl_options = {'REGISTER'}
 
     force_scope: bpy.props.EnumProperty(
         name="Scope",
@@ -56,6 +321,10 @@ class OUTLINER_OT_all_objects_into_assets(bpy.types.Operator):
         ],
         default="AUTO",
     )
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run", default=False,
+        description="Only compute the change plan (written as JSON); the file and catalogs are left untouched",
+    )
 
     @classmethod
     def poll(cls, context):
@@ -73,195 +342,405 @@ class OUTLINER_OT_all_objects_into_assets(bpy.types.Operator):
         else:
             return collections_scope_from_context(context)
 
-    def execute(self, context):
-        # Preferences
+    _run = None
+    _future = None
+    _applier = None
+    _summary = None
+    _timer = None
+    _stats = None
+    _scope = None
+    _log = None
+
+    def _prepare(self, context):
+        """Preferences, library path and scope; None when the run cannot start."""
         prefs = bpy.context.preferences.addons[__package__].preferences
-        master_name = prefs.master_collection_name.strip() or "Assets"
         library_name = prefs.asset_library
-        catalog_root = prefs.catalog_root.strip()
-        asset_suffix = prefs.asset_suffix
-        refresh_mode = prefs.preview_refresh_mode
 
         # Resolve asset library + CDF path
         lib_path = resolve_library_path(library_name)
         if lib_path is None:
             self.report({'ERROR'}, f"Asset library '{library_name}' not available (LOCAL requires saved .blend).")
-            return {'CANCELLED'}
-        cdf_path = Path(lib_path) / "blender_assets.cats.txt"
-
-        # Ensure master collection exists (container for *_asset collections)
-        master_col = bpy.data.collections.get(master_name)
-        if not master_col:
-            master_col = bpy.data.collections.new(master_name)
-            try:
-                context.scene.collection.children.link(master_col)
-            except Exception:
-                pass
-
-        # ---------- Build exclusion set by identity ----------
-        excluded_cols = set(walk_child_collections(master_col))  # always exclude master subtree
-        # Read names from multi-line list in preferences (case-insensitive, supports wildcards)
-        for item in getattr(prefs, "excluded_roots", []):
-            pat = (item.name or "").strip()
-            if not pat:
-                continue
-            for col in _resolve_collections_by_name(pat):
-                for c in walk_child_collections(col):
-                    excluded_cols.add(c)
-        # ----------------------------------------------------
+            return None
 
         # Decide scope (None => all)
         scope_colls = self._compute_scope(context)
         if scope_colls == "CANCEL":
-            return {'CANCELLED'}
-
-        # Build scene collection hierarchy map
-        parent_map = build_parent_map_from_scene(context.scene)
-
-        # Load existing catalogs, and build mapping for collections we mirror
-        cdf_entries = read_cdf(cdf_path)
-        coll_to_catalog = {}
+            return None
+        return prefs, lib_path, scope_colls
 
-        # -------------------------
-        # Pass 1: mirror Collections -> Catalogs (respect scope)
-        # -------------------------
-        iter_colls = (scope_colls if scope_colls is not None else bpy.data.collections)
-        for coll in iter_colls:
-            # Skip excluded (master + user-defined roots) and *_asset buckets
-            if (coll in excluded_cols) or coll.name.endswith(asset_suffix):
-                continue
-            path_parts = collection_path(coll, parent_map) if coll in parent_map else [coll.name]
-            cat_path = normalize_catalog_path(path_parts, catalog_root)
-            uid = ensure_catalog(cdf_entries, cat_path, path_parts[-1] if path_parts else coll.name)
-            coll_to_catalog[coll] = (uid, path_parts[-1], cat_path)
-
-        obj_assets, col_assets = [], []
+    def execute(self, context):
+        setup = self._prepare(context)
+        if setup is None:
+            return {'CANCELLED'}
+        prefs, lib_path, scope_colls = setup
+
+        stats = _stats_for(prefs, "all_objects_into_assets")
+        self._log = ChangeLog() if prefs.undo_mode == 'LIGHT' else None
+        with stats.profiling():
+            summary = run_all_objects_into_assets(context, prefs, lib_path, scope_colls, self.report,
+                                                  stats=stats, dry_run=self.dry_run, change_log=self._log)
+        return self._finish_report(prefs, summary, scope_colls, stats)
+
+    def invoke(self, context, event):
+        # Plan on a worker thread while the UI keeps running, then apply on the main
+        # thread in time-budgeted chunks from a modal timer (Esc cancels)
+        if bpy.app.background or context.window is None:
+            return self.execute(context)
+        setup = self._prepare(context)
+        if setup is None:
+            return {'CANCELLED'}
+        prefs, lib_path, self._scope = setup
+
+        self._stats = stats = _stats_for(prefs, "all_objects_into_assets")
+        with stats.profiling():
+            self._run = _begin_run(context, prefs, lib_path, stats, self.report)
+        run = self._run
+        self._future = plan_async(run["snapshot"], prefs, run["cdf_entries"], self._scope,
+                                  str(run["cdf_path"]), stats=stats, known_assets=run["known_assets"])
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.02, window=context.window)
+        wm.modal_handler_add(self)
+        self._status(context, "planning…")
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            if self._applier is None:
+                self._future.cancel()
+                self._end_modal(context)
+                self.report({'INFO'}, "All Objects into Assets cancelled (nothing was changed)")
+                return {'CANCELLED'}
+            # Rows already applied stay applied; catalogs are still written for them
+            self._applier.cancel()
+            return self._finish_apply(context)
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        if self._applier is None:
+            return self._poll_plan(context)
+        # Between ticks the user may undo, load a file or edit collections
+        if sync.id_epoch() != self._run["id_epoch"]:
+            return self._abort_apply(context)
+        if sync.graph_generation() != self._run["graph_generation"]:
+            self._applier.cancel()
+            self.report({'WARNING'}, "The collections changed while applying; stopped (applied assets are kept).")
+            return self._finish_apply(context)
+
+        stats = self._stats
+        stats.skip()  # time between ticks belongs to the UI, not to us
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        with stats.profiling():
+            finished = self._applier.step(prefs.apply_time_budget_ms / 1000.0)
+        stats.lap("apply")
+        stats.count("apply_ticks")
+        if finished:
+            return self._finish_apply(context)
+        context.window_manager.progress_update(self._applier.done)
+        self._status(context, f"{self._applier.done:,} / {self._applier.total:,} assets")
+        return {'PASS_THROUGH'}
+
+    def _poll_plan(self, context):
+        if not self._future.done():
+            return {'PASS_THROUGH'}
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        stats, run = self._stats, self._run
+        try:
+            plan = self._future.result()
+        except Exception as e:
+            self._end_modal(context)
+            self.report({'ERROR'}, f"Planning failed: {e}")
+            return {'CANCELLED'}
+        # Planned IDs are only valid while the collection graph is the one that was captured
+        if sync.graph_generation() != run["graph_generation"] or sync.id_epoch() != run["id_epoch"]:
+            self._end_modal(context)
+            self.report({'WARNING'}, "The scene changed while planning; run the operator again.")
+            return {'CANCELLED'}
+        stats.skip()  # waiting for the next timer tick is not part of any pass
+        self._summary = _plan_summary(plan, run, stats)
+        if self.dry_run:
+            self._end_modal(context)
+            return self._finish_report(prefs, self._summary, self._scope, stats)
+        # Small batches so one batch never overshoots the per-tick budget by much
+        self._log = ChangeLog() if prefs.undo_mode == 'LIGHT' else None
+        self._applier = PlanApply(plan, batch_size=64, scene=context.scene, log=self._log)
+        context.window_manager.progress_begin(0, max(1, self._applier.total))
+        return {'PASS_THROUGH'}
+
+    def _finish_apply(self, context):
+        self._end_modal(context)
+        context.window_manager.progress_end()
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        stats = self._stats
+        with stats.profiling():
+            summary = _apply_run(context, prefs, self._run, self._summary, self.report,
+                                 applier=self._applier)
+        return self._finish_report(prefs, summary, self._scope, stats)
+
+    def _abort_apply(self, context):
+        # Undo/redo/load freed the IDs being applied and discarded the partial changes:
+        # nothing is left to persist or to revert
+        self._end_modal(context)
+        context.window_manager.progress_end()
+        sync.clear_own()
+        sync.reset()
+        self._log = None
+        self.report({'WARNING'}, "Undo or file load while applying: run stopped, run the operator again.")
+        return {'CANCELLED'}
+
+    def _status(self, context, text):
+        if context.workspace:
+            context.workspace.status_text_set(f"All Objects into Assets: {text} (Esc to cancel)")
+
+    def _end_modal(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        if context.workspace:
+            context.workspace.status_text_set(None)
+
+    def _finish_report(self, prefs, summary, scope_colls, stats):
+        if not self.dry_run and self._log is not None and (summary is not None or self._log):
+            # Also after a failed catalog write: the file was changed all the same
+            undo.store(self._log)
+        if summary is None:
+            return {'CANCELLED'}
+        if not self.dry_run and prefs.undo_mode == 'FULL' and not bpy.app.background:
+            # One step per run: Ctrl+Z then undoes exactly this run. LIGHT has the change list instead
+            bpy.ops.ed.undo_push(message=self.bl_label)
+        written = _save_stats(prefs, stats, self.report)
+        plan_path = _save_plan(prefs, summary["plan"], self.report, self.dry_run)
 
         # -------------------------
-        # Pass 2: mark OBJECTS -> Assets (respect scope + exclusions)
+        # Report
         # -------------------------
-        if scope_colls is None:
-            base_objs = list(bpy.data.objects)
+        if self.force_scope == 'ALL' or (self.force_scope == 'AUTO' and scope_colls is None):
+            scope_msg = "All Collections"
         else:
-            base_objs = [o for o in bpy.data.objects if any((c in scope_colls) for c in o.users_collection)]
-        # Exclude any object that belongs to excluded collections
-        iter_objs = [o for o in base_objs if not _object_in_excluded(o, excluded_cols)]
-
-        for obj in iter_objs:
-            # Choose deepest catalog among the object's collections that we mirrored
-            candidates = []
-            for col in obj.users_collection:
-                if col in coll_to_catalog:
-                    uid, simple, cat_path = coll_to_catalog[col]
-                    depth = cat_path.count("/") + 1
-                    candidates.append((depth, uid, simple))
-
-            # Mark object as asset (only for non-excluded)
-            try:
-                if not obj.asset_data:
-                    obj.asset_mark()
-            except Exception:
-                pass
-
-            # Assign catalog
-            if candidates and obj.asset_data:
-                candidates.sort(key=lambda t: t[0], reverse=True)
-                _, uid, simple = candidates[0]
-                try:
-                    obj.asset_data.catalog_id = uid
-                    obj.asset_data.catalog_simple_name = simple
-                except Exception:
-                    pass
+            scope_msg = "Selected Collections"
+        if summary["incremental"]:
+            scope_msg += " (incremental)"
+        if summary["cancelled"]:
+            scope_msg += " (cancelled: partial run)"
+        if self.dry_run:
+            counts = summary["plan"].counts
+            self.report({'INFO'}, f"{scope_msg} (dry run) | Would mark {counts['objects_to_mark']} objects, "
+                                  f"create {counts['asset_collections_to_create']} collections, "
+                                  f"{counts['links']} links, {counts['catalogs_added']} catalogs"
+                                  + (f" | Fold {counts['objects_folded']} duplicates" if counts['objects_folded'] else "")
+                                  + (f" | Skip {counts['objects_in_library']} already in the library"
+                                     if counts['objects_in_library'] else "")
+                                  + (f" | Plan: {plan_path}" if plan_path else ""))
+            return {'CANCELLED'}
+        msg = (f"{scope_msg} | Assets: {summary['objects']} objects, {summary['collections']} collections"
+               f" | Catalogs: {summary['catalogs']}")
+        if summary["folded"]:
+            msg += f" | Folded {summary['folded']} duplicates into {len(summary['plan'].folded)} assets"
+        if summary["in_library"]:
+            msg += f" | {summary['in_library']} already in the library"
+        if summary["previews"] == 'QUEUED':
+            msg += " | Previews generating in background"
+        elif summary["previews"] == 'DONE':
+            msg += " | Previews refreshed"
+        if summary["exported"]:
+            msg += f" | Exported {summary['exported']} library files"
+        if plan_path:
+            msg += f" | Plan: {plan_path}"
+        if written:
+            msg += f" | Slowest: {stats.summary()} (report: {', '.join(written)})"
+        self.report({'INFO'}, msg)
 
-            obj_assets.append(obj)
+        return {'FINISHED'}
 
-        # -------------------------
-        # Pass 3: parent objects -> <name>_asset collection assets (respect scope + exclusions)
-        # -------------------------
-        if scope_colls is None:
-            base_parents = [o for o in bpy.data.objects if o.children]
-        else:
-            base_parents = [
-                o for o in bpy.data.objects
-                if o.children and any((c in scope_colls) for c in o.users_collection)
-            ]
-        parent_objs = [o for o in base_parents if not _object_in_excluded(o, excluded_cols)]
-
-        for obj in parent_objs:
-            col_name = f"{obj.name}{asset_suffix}"
-            col = bpy.data.collections.get(col_name)
-            if not col:
-                col = bpy.data.collections.new(col_name)
-                try:
-                    master_col.children.link(col)
-                except Exception:
-                    pass
-
-            # Link descendants into this asset collection (without duplicating links)
-            members = gather_descendants(obj)
-            for m in members:
-                if isinstance(m, bpy.types.Object) and (col not in m.users_collection):
-                    try:
-                        col.objects.link(m)
-                    except RuntimeError:
-                        pass
 
-            # Mark collection as asset
-            if not col.asset_data:
-                try:
-                    col.asset_mark()
-                except Exception:
-                    pass
-
-            # Assign collection asset to deepest catalog of the parent object
-            candidates = []
-            for col_of_obj in obj.users_collection:
-                if col_of_obj in coll_to_catalog:
-                    uid, simple, cat_path = coll_to_catalog[col_of_obj]
-                    depth = cat_path.count("/") + 1
-                    candidates.append((depth, uid, simple))
-            if candidates and col.asset_data:
-                candidates.sort(key=lambda t: t[0], reverse=True)
-                _, uid, simple = candidates[0]
-                try:
-                    col.asset_data.catalog_id = uid
-                    col.asset_data.catalog_simple_name = simple
-                except Exception:
-                    pass
+class AOIA_OT_revert_last_run(bpy.types.Operator):
+    """Undo the last All Objects into Assets run of this session from its recorded change list"""
+    bl_idname = "aoia.revert_last_run"
+    bl_label = "Revert Last Assets Run"
+    bl_options = {'REGISTER'}
 
-            col_assets.append(col)
+    @classmethod
+    def poll(cls, context):
+        return undo.last() is not None
 
-        # -------------------------
-        # Persist catalogs to disk
-        # -------------------------
-        try:
-            lib_path.mkdir(parents=True, exist_ok=True)
-            write_cdf(cdf_path, cdf_entries)
-            try:
-                bpy.ops.asset.catalogs_save()
-            except Exception:
-                pass
-        except Exception as e:
-            self.report({'ERROR'}, f"Catalog write failed: {e}")
-            return {'CANCELLED'}
+    def execute(self, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        done = undo.take_last().revert()
+        # The file no longer matches what incremental sync recorded
+        sync.reset()
+        if prefs.undo_mode == 'FULL':
+            bpy.ops.ed.undo_push(message=self.bl_label)
+        self.report({'INFO'}, f"Reverted: {done['marked']} assets cleared, {done['links']} links removed, "
+                              f"{done['created'] + done['master']} collections removed, "
+                              f"{done['catalogs']} catalog assignments restored")
+        return {'FINISHED'}
 
-        # -------------------------
-        # Preview refresh (optional)
-        # -------------------------
-        ran = True
-        if refresh_mode != 'NONE':
-            ran = refresh_previews(list(obj_assets) + list(col_assets), refresh_mode)
 
-        # -------------------------
-        # Report
-        # -------------------------
-        if self.force_scope == 'ALL' or (self.force_scope == 'AUTO' and scope_colls is None):
-            scope_msg = "All Collections"
+class AOIA_OT_cleanup(bpy.types.Operator):
+    """Remove or archive dead catalogs and *_asset collections, and unlink stale links from asset collections"""
+    bl_idname = "aoia.cleanup"
+    bl_label = "Clean Up Assets"
+    # Undo is pushed per the 'Undo' preference (the CDF is never part of undo)
+    bl_options = {'REGISTER'}
+
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=[
+            ("ARCHIVE", "Archive", f"Move dead catalogs under '{ARCHIVE_ROOT}/' (same UUIDs) and dead asset "
+                                   "collections into the master's archive collection"),
+            ("REMOVE", "Remove", "Delete dead catalogs and dead asset collections"),
+        ],
+        default="ARCHIVE",
+    )
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run", default=False,
+        description="Only write the cleanup report (JSON); the file and catalogs are left untouched",
+    )
+
+    def execute(self, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        lib_path = resolve_library_path(prefs.asset_library)
+        if lib_path is None:
+            self.report({'ERROR'}, f"Asset library '{prefs.asset_library}' not available (LOCAL requires saved .blend).")
+            return {'CANCELLED'}
+        cdf_path = Path(lib_path) / "blender_assets.cats.txt"
+        stats = _stats_for(prefs, "cleanup")
+        with stats.profiling():
+            # Catalogs other files of the library use are only known from the library index
+            used_elsewhere = None
+            if not prefs.library_index:
+                self.report({'INFO'}, "Library Index is off: catalogs are left as they are")
+            else:
+                try:
+                    # Deciding what is dead needs the index up to date: wait for a background
+                    # refresh still running, then catch up on what changed since
+                    running = last_refresh(lib_path)
+                    if running is not None:
+                        running.exception()
+                    index = LibraryIndex(lib_path)
+                    stats.update(index.refresh(prefs.library_index_workers), "library_index_")
+                    own = _own_files(index)
+                    used_elsewhere = {uid for rel, ent in index.files.items() if rel not in own
+                                      for _attr, _name, uid, _key in ent["assets"]}
+                except Exception as e:
+                    self.report({'WARNING'}, f"Library not indexed, catalogs are left as they are: {e}")
+                stats.lap("library_index")
+            snap = Snapshot.capture(context.scene)
+            plan = build_cleanup_plan(snap, prefs, read_cdf(cdf_path), used_elsewhere,
+                                      archive=self.action == 'ARCHIVE', used_here=asset_catalog_ids(),
+                                      history=read_history(cdf_path))
+            if used_elsewhere is not None and plan.catalogs_skipped:
+                self.report({'WARNING'}, "No Catalog Root Prefix set: catalogs are left as they are "
+                                         "(they cannot be told apart from catalogs made by hand)")
+            stats.lap("plan")
+            stats.update(plan.counts)
+            done = None
+            if not self.dry_run:
+                done = apply_cleanup(plan, prefs.master_collection_name.strip() or "Assets", cdf_path)
+                stats.update(done)
+                # The file no longer matches what incremental sync recorded
+                sync.reset()
+                stats.lap("apply")
+        _save_stats(prefs, stats, self.report)
+        path = _save_plan(prefs, plan, self.report, self.dry_run, kind="cleanup")
+        c = plan.counts
+        if self.dry_run:
+            msg = (f"Clean up (dry run) | Would {self.action.lower()} {c['catalogs_dead']} catalogs, "
+                   f"{c['collections_dead']} asset collections, unlink {c['links_stale']} stale links")
         else:
-            scope_msg = "Selected Collections"
-        msg = f"{scope_msg} | Assets: {len(obj_assets)} objects, {len(col_assets)} collections | Catalogs: {len(cdf_entries)}"
-        if refresh_mode != 'NONE':
-            msg += " | Previews refreshed" if ran else " | Preview refresh skipped"
+            if prefs.undo_mode == 'FULL':
+                bpy.ops.ed.undo_push(message=self.bl_label)
+            msg = (f"Clean up | Catalogs: {done['catalogs_removed']} removed, {done['catalogs_archived']} archived"
+                   f" | Collections: {done['collections_removed']} removed, {done['collections_archived']} archived"
+                   f" | {done['links_unlinked']} stale links unlinked")
+        if c["collections_kept"] or c["links_kept"]:
+            msg += f" | Kept {c['collections_kept']} collections, {c['links_kept']} links (contents linked nowhere else)"
+        if path:
+            msg += f" | Report: {path}"
         self.report({'INFO'}, msg)
+        return {'FINISHED'} if not self.dry_run else {'CANCELLED'}
+
+
+class AOIA_OT_refresh_previews(bpy.types.Operator):
+    """Generate asset previews in batches without blocking the UI (Esc to cancel)"""
+    bl_idname = "aoia.refresh_previews"
+    bl_label = "Refresh Asset Previews"
+    bl_options = {'REGISTER'}
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[("MISSING", "Missing only", ""), ("ALL", "All", "")],
+        default="MISSING",
+    )
+
+    _job = None
+    _timer = None
+    _stats = None
 
+    @staticmethod
+    def _target_ids():
+        # Queued by the main operator; otherwise every asset in the file
+        ids = take_queued_previews()
+        if not ids:
+            ids = [o for o in bpy.data.objects if o.asset_data]
+            ids += [c for c in bpy.data.collections if c.asset_data]
+        return ids
+
+    def execute(self, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        stats = _stats_for(prefs, "refresh_previews")
+        with stats.profiling():
+            job = _make_preview_job(prefs, self._target_ids(), self.mode,
+                                    resolve_library_path(prefs.asset_library))
+            stats.lap("setup")
+            job.run()
+            stats.lap("render")
+        stats.update(job.counters())
+        _save_stats(prefs, stats, self.report)
         return {'FINISHED'}
+
+    def invoke(self, context, event):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        self._stats = _stats_for(prefs, "refresh_previews")
+        with self._stats.profiling():
+            self._job = _make_preview_job(prefs, self._target_ids(), self.mode,
+                                          resolve_library_path(prefs.asset_library))
+        self._stats.lap("setup")
+        if self._job.finished:
+            self.report({'INFO'}, "Asset previews: nothing to refresh")
+            return {'FINISHED'}
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.05, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, self._job.total)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        job = self._job
+        if event.type == 'ESC':
+            job.cancel()
+            return self._finish(context)
+        if event.type == 'TIMER':
+            stats = self._stats
+            stats.skip()  # time between ticks belongs to the UI, not to us
+            with stats.profiling():
+                finished = job.step()
+            stats.lap("steps")
+            stats.count("ticks")
+            if finished:
+                return self._finish(context)
+            context.window_manager.progress_update(job.processed)
+            if context.workspace:
+                context.workspace.status_text_set(job.status_text())
+        return {'PASS_THROUGH'}
+
+    def _finish(self, context):
+        job = self._job
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        if context.workspace:
+            context.workspace.status_text_set(None)
+        self._stats.update(job.counters())
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        _save_stats(prefs, self._stats, self.report)
+        state = "cancelled" if job.cancelled else "done"
+        self.report({'INFO'}, f"Asset previews {state}: {job.done} generated, {job.failed} failed, "
+                              f"{job.total - job.processed} skipped")
+        return {'CANCELLED'} if job.cancelled else {'FINISHED'}
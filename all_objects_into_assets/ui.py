@@ -1,5 +1,7 @@
 import bpy
 
+from .helpers.workers import default_worker_count
+
 class AOIA_ExcludedRoot(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(
         name="Collection Name",
@@ -56,6 +58,90 @@ class AddonPrefs(bpy.types.AddonPreferences):
         items=[("NONE","Do not refresh",""),("MISSING","Refresh missing only",""),("ALL","Refresh all","")],
         default="NONE",
     )
+    preview_async: bpy.props.BoolProperty(
+        name="Generate Previews in Background", default=True,
+        description="Refresh previews in batches from a modal timer instead of blocking the UI")
+    preview_batch_size: bpy.props.IntProperty(
+        name="Preview Batch Size", default=16, min=1, soft_max=256,
+        description="Previews submitted per batch when generating in background")
+    preview_backend: bpy.props.EnumProperty(
+        name="Preview Renderer",
+        items=[
+            ("IN_PROCESS", "This Session", "Render previews in the running Blender session"),
+            ("WORKERS", "Background Processes", "Render previews in a pool of headless Blender processes"),
+        ],
+        default="IN_PROCESS",
+    )
+    preview_workers: bpy.props.IntProperty(
+        name="Workers", default=default_worker_count(), min=1, soft_max=64,
+        description="Headless Blender processes rendering previews in parallel")
+    preview_resolution: bpy.props.IntProperty(
+        name="Resolution", default=256, min=32, max=1024,
+        description="Preview size rendered by background processes")
+    preview_cache: bpy.props.BoolProperty(
+        name="Preview Cache", default=False,
+        description="Reuse previews of identical content (data, materials, modifiers) from a cache stored in the target library")
+    preview_cache_mb: bpy.props.IntProperty(
+        name="Cache Size (MB)", default=512, min=16,
+        description="Least-recently-used previews are evicted beyond this size")
+    incremental_sync: bpy.props.BoolProperty(
+        name="Incremental Sync", default=False,
+        description="Only re-process Objects and Collections changed since the previous run in this session")
+    auto_sync: bpy.props.BoolProperty(
+        name="Auto Sync", default=False,
+        description="Re-run incrementally on the edited Objects and Collections shortly after edits stop and "
+                    "before saving (all collections; no previews, export or library index)")
+    auto_sync_delay: bpy.props.FloatProperty(
+        name="Delay (s)", default=2.0, min=0.1, soft_max=30.0,
+        description="Seconds without edits before an automatic sync starts")
+    auto_sync_budget_ms: bpy.props.IntProperty(
+        name="Time per Sync Step (ms)", default=50, min=1, soft_max=1000,
+        description="How long one automatic sync step (also the one before saving) may apply changes; "
+                    "the rest continues in later steps")
+    dedup_shared_data: bpy.props.BoolProperty(
+        name="One Asset per Shared Data", default=False,
+        description="Objects sharing data, materials and modifiers in the same catalog become one asset; "
+                    "the other duplicates are listed in the change plan instead of marked")
+    library_index: bpy.props.BoolProperty(
+        name="Library Index", default=False,
+        description="Index the target library's other .blend files (cached next to its catalogs, rescanned "
+                    "when they change) and leave objects unmarked whose content is already an asset there")
+    library_index_workers: bpy.props.IntProperty(
+        name="Scan Processes", default=default_worker_count(), min=1, soft_max=64,
+        description="Headless Blender processes scanning changed library files in parallel")
+    export_library_files: bpy.props.BoolProperty(
+        name="Export Library Files", default=False,
+        description="After each run, write every catalog's assets to its own .blend file in the target library "
+                    "(folders follow the catalog tree)")
+    export_shard_size: bpy.props.IntProperty(
+        name="Assets per File", default=0, min=0, soft_max=10000,
+        description="Split catalogs into files of at most this many assets (0 = one file per catalog); "
+                    "smaller files load faster in the Asset Browser")
+    export_workers: bpy.props.IntProperty(
+        name="Export Processes", default=default_worker_count(), min=1, soft_max=64,
+        description="Headless Blender processes writing library files in parallel from a saved copy of this file")
+    undo_mode: bpy.props.EnumProperty(
+        name="Undo",
+        items=[
+            ("FULL", "Undo Step", "Push a global undo step after each run (Ctrl+Z)"),
+            ("LIGHT", "Change List", "No global undo step: record what each run changed and undo it with "
+                                     "'Revert Last Assets Run' (Ctrl+Z does not stop at the run)"),
+            ("OFF", "Off", "No undo at all (batch use)"),
+        ],
+        default="FULL",
+    )
+    apply_time_budget_ms: bpy.props.IntProperty(
+        name="Time per UI Update (ms)", default=16, min=1, soft_max=200,
+        description="How long each step of a run started from the UI may block Blender before it redraws")
+    stats_report_path: bpy.props.StringProperty(
+        name="Run Report", default="", subtype='FILE_PATH',
+        description="Append per-pass timings and counters of every run to this file (.json or .csv; empty = off)")
+    stats_profile: bpy.props.BoolProperty(
+        name="Profile Runs", default=False,
+        description="Capture a cProfile .prof file per run (next to the run report, or in the temp folder)")
+    plan_report_path: bpy.props.StringProperty(
+        name="Change Plan", default="", subtype='FILE_PATH',
+        description="Write the change plan of every run (catalogs, assets, links, previews) to this .json file (empty = off)")
     excluded_roots: bpy.props.CollectionProperty(type=AOIA_ExcludedRoot)
     excluded_roots_index: bpy.props.IntProperty(default=0)
 
@@ -67,6 +153,44 @@ class AddonPrefs(bpy.types.AddonPreferences):
         col.prop(self, "catalog_root")
         col.prop(self, "asset_suffix")
         col.prop(self, "preview_refresh_mode")
+        row = col.row(align=True)
+        row.prop(self, "preview_async")
+        sub = row.row(align=True)
+        sub.active = self.preview_async
+        sub.prop(self, "preview_batch_size")
+        col.prop(self, "preview_backend")
+        if self.preview_backend == 'WORKERS':
+            row = col.row(align=True)
+            row.prop(self, "preview_workers")
+            row.prop(self, "preview_resolution")
+        row = col.row(align=True)
+        row.prop(self, "preview_cache")
+        sub = row.row(align=True)
+        sub.active = self.preview_cache
+        sub.prop(self, "preview_cache_mb")
+        col.prop(self, "incremental_sync")
+        col.prop(self, "auto_sync")
+        row = col.row(align=True)
+        row.active = self.auto_sync
+        row.prop(self, "auto_sync_delay")
+        row.prop(self, "auto_sync_budget_ms")
+        col.prop(self, "dedup_shared_data")
+        row = col.row(align=True)
+        row.prop(self, "library_index")
+        sub = row.row(align=True)
+        sub.active = self.library_index
+        sub.prop(self, "library_index_workers")
+        col.prop(self, "export_library_files")
+        row = col.row(align=True)
+        row.active = self.export_library_files
+        row.prop(self, "export_shard_size")
+        row.prop(self, "export_workers")
+        col.prop(self, "apply_time_budget_ms")
+        col.prop(self, "undo_mode")
+        row = col.row(align=True)
+        row.prop(self, "stats_report_path")
+        row.prop(self, "stats_profile", text="", icon="TIME")
+        col.prop(self, "plan_report_path")
 
         col.separator()
         col.label(text="Also Exclude These Roots", icon="OUTLINER_COLLECTION")
@@ -94,6 +218,16 @@ def _draw_block(layout):
                       text="All Objects into Assets — All Collections",
                       icon='ASSET_MANAGER')
     op.force_scope = 'ALL'
+    op = col.operator("outliner.all_objects_into_assets",
+                      text="All Objects into Assets — Dry Run (Plan Only)",
+                      icon='TEXT')
+    op.force_scope = 'AUTO'
+    op.dry_run = True
+    col.operator("aoia.revert_last_run", text="All Objects into Assets — Revert Last Run", icon='LOOP_BACK')
+    op = col.operator("aoia.cleanup", text="All Objects into Assets — Clean Up (Dry Run)", icon='TEXT')
+    op.dry_run = True
+    op = col.operator("aoia.cleanup", text="All Objects into Assets — Clean Up", icon='TRASH')
+    op.dry_run = False
 
 def outliner_object_menu(self, context): _draw_block(self.layout)
 def outliner_collection_menu(self, context): _draw_block(self.layout)
@@ -0,0 +1,116 @@
+"""
+Resolve 'excluded_roots' patterns on a large collection graph, without Blender.
+
+    python benchmarks/bench_exclusions.py --collections 20000 --patterns 40
+
+Compares the former per-pattern scan (casefold + fnmatch over every collection, recursive
+subtree walk per pattern) with what planning runs: graph.excluded_mask() on the run's
+SceneGraph, with a freshly compiled matcher (cold) and with the matcher of the previous
+run (warm: names already matched are memoized).
+"""
+import argparse
+import random
+import sys
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(_HERE))
+sys.path.insert(0, str(_HERE.parent))
+
+import fake_bpy  # noqa: E402
+
+bpy = fake_bpy.install()
+
+from all_objects_into_assets.helpers import exclusions  # noqa: E402
+from all_objects_into_assets.helpers.graph import SceneGraph, excluded_mask  # noqa: E402
+from all_objects_into_assets.helpers.plan import Snapshot  # noqa: E402
+
+
+def _per_pattern(patterns):
+    """The pre-matcher algorithm, kept here as the reference."""
+    def walk(col):
+        yield col
+        for ch in col.children:
+            yield from walk(ch)
+
+    out = set()
+    for pat in patterns:
+        pat = pat.strip()
+        if not pat:
+            continue
+        pl = pat.casefold()
+        if "*" in pat or "?" in pat:
+            roots = [c for c in bpy.data.collections if fnmatchcase(c.name.casefold(), pl)]
+        else:
+            roots = [c for c in bpy.data.collections if c.name.casefold() == pl]
+        for r in roots:
+            out.update(walk(r))
+    return out
+
+
+def _graph(n, fanout, seed):
+    rng = random.Random(seed)
+    data = bpy.data
+    data.reset()
+    scene = data.scenes.new("Scene")
+    colls = [scene.collection]
+    for i in range(n):
+        c = data.collections.new(f"{rng.choice(('Props', 'Set', 'FX', 'Char'))}_{i:06d}")
+        colls[max(0, (len(colls) - 1) // fanout)].children.link(c)
+        colls.append(c)
+
+
+def _timed(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--collections", type=int, default=20000)
+    ap.add_argument("--patterns", type=int, default=40, help="half exact names, half wildcards")
+    ap.add_argument("--fanout", type=int, default=8)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    _graph(args.collections, args.fanout, args.seed)
+    rng = random.Random(args.seed)
+    patterns = []
+    for i in range(args.patterns):
+        k = rng.randrange(args.collections)
+        patterns.append(f"*_{k:06d}" if i % 2 else f"props_{k:06d}")
+
+    old_t, old = _timed(lambda: _per_pattern(patterns), args.repeat)
+    old = {c.name for c in old}
+
+    # Built once per run by planning anyway (not part of the exclusion cost)
+    graph = SceneGraph.from_snapshot(Snapshot.capture(bpy.context.scene))
+
+    def cold():
+        exclusions.compile_patterns.cache_clear()
+        return excluded_mask(graph, -1, patterns)
+
+    cold_t, mask = _timed(cold, args.repeat)
+    warm_t, _ = _timed(lambda: excluded_mask(graph, -1, patterns), args.repeat)
+    new = {graph.coll_names[i] for i, hit in enumerate(mask) if hit}
+
+    print(f"{args.collections:,} collections, {args.patterns} patterns, {len(new):,} excluded")
+    print(f"  per-pattern scan   {old_t * 1000:9.1f} ms")
+    print(f"  compiled (cold)    {cold_t * 1000:9.1f} ms  {old_t / cold_t:6.1f}x")
+    print(f"  compiled (warm)    {warm_t * 1000:9.1f} ms  {old_t / warm_t:6.1f}x")
+    if new != old:
+        print("FAIL: compiled matcher resolved a different set")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Compare in-process preview generation with the pool of headless Blender workers.
+
+    blender -b library.blend --python benchmarks/bench_previews.py -- --workers 1 2 4 8 --limit 200
+
+Every backend regenerates previews ('ALL' mode) for the same asset IDs of the opened file;
+the table lists wall time, throughput and speed-up relative to the first row.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import bpy  # noqa: E402
+
+from all_objects_into_assets.helpers.previews import PreviewJob  # noqa: E402
+from all_objects_into_assets.helpers.preview_workers import WorkerPreviewJob  # noqa: E402
+
+
+def _timed(job):
+    t0 = time.perf_counter()
+    job.run()
+    return job, time.perf_counter() - t0
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--limit", type=int, default=0, help="only the first N assets (0 = all)")
+    ap.add_argument("--size", type=int, default=256, help="worker render resolution")
+    ap.add_argument("--skip-in-process", action="store_true")
+    args = ap.parse_args(argv)
+
+    ids = [o for o in bpy.data.objects if o.asset_data] + [c for c in bpy.data.collections if c.asset_data]
+    if args.limit:
+        ids = ids[:args.limit]
+    if not ids:
+        sys.exit("No assets in this file; run the add-on on it first.")
+
+    runs = []
+    if not args.skip_in_process:
+        runs.append(("in-process",) + _timed(PreviewJob(ids, 'ALL')))
+    for n in args.workers:
+        runs.append((f"workers={n}",) + _timed(WorkerPreviewJob(ids, 'ALL', n, size=args.size)))
+
+    base = runs[0][2] if runs else 0.0
+    print(f"{'backend':<14}{'items':>8}{'done':>8}{'failed':>8}{'seconds':>10}{'items/s':>10}{'speedup':>9}")
+    for label, job, secs in runs:
+        rate = job.processed / secs if secs else 0.0
+        speedup = base / secs if secs else 0.0
+        print(f"{label:<14}{job.total:>8}{job.done:>8}{job.failed:>8}{secs:>10.2f}{rate:>10.1f}{speedup:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
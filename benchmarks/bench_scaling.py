@@ -0,0 +1,189 @@
+"""
+Scaling benchmark of the operator pipeline on synthetic scenes, without Blender.
+
+    python benchmarks/bench_scaling.py --sizes 1000 10000 100000
+    python benchmarks/bench_scaling.py --sizes 1000000 --no-memory --json big.json
+    python benchmarks/bench_scaling.py --sizes 10000 100000 --max-exponent 1.3   # CI gate
+
+Runs 'run_all_objects_into_assets' (operators.py + helpers/utils.py + helpers/catalogs.py)
+against the in-process bpy stand-in in benchmarks/fake_bpy.py. Scenes are parametric:
+N objects, collection depth D and fan-out F, parent-chain depth, shared-mesh ratio and
+number of exclusion patterns. Per size it reports the time of every pass and, in a second
+traced run, the peak memory allocated by every pass (tracemalloc, scene excluded).
+
+--max-exponent fails when a pass grows faster than N**exponent between consecutive
+sizes: a machine-independent way to catch accidental O(n²) hot paths.
+--compare fails when total time or peak memory exceed a previous --json by --tolerance.
+"""
+import argparse
+import gc
+import json
+import math
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(_HERE))
+sys.path.insert(0, str(_HERE.parent))
+
+import fake_bpy  # noqa: E402
+
+bpy = fake_bpy.install()
+
+from all_objects_into_assets import operators, ui  # noqa: E402
+from all_objects_into_assets.helpers import sync  # noqa: E402
+from all_objects_into_assets.helpers.stats import RunStats  # noqa: E402
+from all_objects_into_assets.helpers.utils import walk_child_collections  # noqa: E402
+
+MIN_SECONDS = 0.002  # passes faster than this at either size are too noisy for --max-exponent
+
+
+class TracedStats(RunStats):
+    """RunStats that also records the tracemalloc peak of every pass (bytes above the start)."""
+
+    def __init__(self, label):
+        super().__init__(label)
+        self.peaks = {}
+        self._base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def lap(self, name):
+        super().lap(name)
+        peak = tracemalloc.get_traced_memory()[1] - self._base
+        self.peaks[name] = max(self.peaks.get(name, 0), peak)
+        tracemalloc.reset_peak()
+
+
+def _scene(args, n):
+    fake_bpy.make_scene(bpy, n_objects=n, depth=args.depth, fanout=args.fanout,
+                        parent_depth=args.parent_depth, shared_ratio=args.shared,
+                        n_excluded=args.exclusions, seed=args.seed)
+    sync.reset()  # a new scene is a file load: drop session-scoped caches (load_post in Blender)
+    prefs = fake_bpy.install_prefs(bpy, ui.AddonPrefs, preview_refresh_mode='NONE')
+    for i in range(args.exclusions):
+        prefs.excluded_roots.add().name = f"EXCL_{i}"
+    scope = None
+    if args.scope == 'SELECTED':
+        top = next(c for c in bpy.context.scene.collection.children if not c.name.startswith("EXCL_"))
+        scope = list(walk_child_collections(top))
+    return prefs, scope
+
+
+def _run(args, n, traced):
+    prefs, scope = _scene(args, n)
+    messages = []
+    with tempfile.TemporaryDirectory(prefix="aoia_bench_") as lib:
+        # Scene data lives in C in Blender; keep the stand-in's objects out of GC passes
+        gc.collect()
+        gc.freeze()
+        if traced:
+            tracemalloc.start()
+            stats = TracedStats(f"n={n}")
+        else:
+            stats = RunStats(f"n={n}")
+        summary = operators.run_all_objects_into_assets(
+            bpy.context, prefs, lib, scope, lambda lv, msg: messages.append(msg), stats=stats,
+            dry_run=args.dry_run)
+        if traced:
+            tracemalloc.stop()
+        gc.unfreeze()
+    if summary is None:
+        sys.exit(f"pipeline failed at n={n}: {messages}")
+    return summary, stats
+
+
+def _exponents(results):
+    """Per-pass growth exponent between consecutive sizes (only passes above MIN_SECONDS)."""
+    out = []
+    for a, b in zip(results, results[1:]):
+        ratio_n = b["objects"] / a["objects"]
+        for name, tb in b["passes"].items():
+            ta = a["passes"].get(name, 0.0)
+            if ta >= MIN_SECONDS and tb >= MIN_SECONDS:
+                out.append((a["objects"], b["objects"], name, math.log(tb / ta) / math.log(ratio_n)))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--depth", type=int, default=4, help="collection tree depth")
+    ap.add_argument("--fanout", type=int, default=4, help="child collections per collection")
+    ap.add_argument("--parent-depth", type=int, default=2, help="length of object parent chains")
+    ap.add_argument("--shared", type=float, default=0.5, help="share of objects using a shared mesh")
+    ap.add_argument("--exclusions", type=int, default=1, help="excluded root collections / patterns")
+    ap.add_argument("--scope", choices=("ALL", "SELECTED"), default="ALL")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dry-run", action="store_true", help="time snapshot + planning only (no apply)")
+    ap.add_argument("--repeat", type=int, default=1, help="timed runs per size (best is kept)")
+    ap.add_argument("--no-memory", action="store_true", help="skip the traced (memory) run")
+    ap.add_argument("--json", help="write the results here")
+    ap.add_argument("--compare", help="previous --json to compare totals against")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="allowed ratio for --compare")
+    ap.add_argument("--max-exponent", type=float, default=0.0, help="fail above this growth exponent")
+    args = ap.parse_args(argv)
+
+    results = []
+    for n in sorted(args.sizes):
+        runs = [_run(args, n, traced=False) for _ in range(max(1, args.repeat))]
+        summary, stats = min(runs, key=lambda r: sum(r[1].passes.values()))
+        rec = {
+            "objects": n,
+            "assets": summary["objects"] + summary["collections"],
+            "seconds": sum(stats.passes.values()),
+            "passes": dict(stats.passes),
+            "counters": dict(stats.counters),
+        }
+        if not args.no_memory:
+            _, traced = _run(args, n, traced=True)
+            rec["peak_bytes"] = max(traced.peaks.values(), default=0)
+            rec["pass_peak_bytes"] = traced.peaks
+        results.append(rec)
+
+        print(f"\nN={n:,}  assets={rec['assets']:,}  total {rec['seconds']:.3f}s "
+              f"({n / rec['seconds']:,.0f} objects/s)"
+              + (f"  peak {rec['peak_bytes'] / 2**20:.1f} MB" if "peak_bytes" in rec else ""))
+        print(f"  {'pass':<18}{'ms':>10}{'share':>8}" + (f"{'peak MB':>10}" if "peak_bytes" in rec else ""))
+        for name, secs in rec["passes"].items():
+            peak = rec.get("pass_peak_bytes", {}).get(name)
+            print(f"  {name:<18}{secs * 1000:>10.1f}{secs / rec['seconds']:>8.0%}"
+                  + (f"{peak / 2**20:>10.1f}" if peak is not None else ""))
+
+    failures = []
+    exps = _exponents(results)
+    if exps:
+        print("\nGrowth exponents (time ∝ N**k):")
+        for na, nb, name, k in exps:
+            flag = "  <-- superlinear" if args.max_exponent and k > args.max_exponent else ""
+            print(f"  {na:>9,} -> {nb:<9,} {name:<18} k={k:.2f}{flag}")
+            if flag:
+                failures.append(f"{name} grows as N**{k:.2f} between {na} and {nb} objects")
+
+    if args.compare:
+        base = {r["objects"]: r for r in json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]}
+        for rec in results:
+            old = base.get(rec["objects"])
+            if not old:
+                continue
+            for key in ("seconds", "peak_bytes"):
+                if key in rec and key in old and old[key] and rec[key] > old[key] * args.tolerance:
+                    failures.append(f"N={rec['objects']}: {key} {rec[key]:.4g} > {args.tolerance} x {old[key]:.4g}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "params": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+            "python": sys.version.split()[0],
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }, indent=2), encoding="utf-8")
+
+    for f in failures:
+        print("FAIL:", f)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Peak memory and time of one run per undo strategy, on a real (large) scene.
+
+    blender -b big_scene.blend --python benchmarks/bench_undo.py -- --modes FULL LIGHT OFF
+    python benchmarks/bench_undo.py --stand-in 100000
+
+Each mode runs in its own 'blender -b' process on a fresh copy of the opened file (peak
+RSS only grows within a process), with the same pipeline as the operator and previews
+off. FULL pushes a global undo step after the run, LIGHT records the inverse change list
+instead, OFF does neither. The table lists peak RSS, its growth over the loaded file and
+run time.
+
+--stand-in N runs on a synthetic scene of N objects in the bpy stand-in
+(benchmarks/fake_bpy.py) and measures Python allocations (tracemalloc peak above the
+scene) instead of RSS: the change list is measured, a global undo step costs nothing
+there (it is Blender's memfile, only measured in Blender).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(_HERE.parent))
+
+try:
+    import bpy  # noqa: E402
+    fake_bpy = None
+except ImportError:     # plain Python: only --stand-in works
+    sys.path.insert(0, str(_HERE))
+    import fake_bpy  # noqa: E402
+    bpy = fake_bpy.install()
+
+from all_objects_into_assets import cli, operators, ui  # noqa: E402
+from all_objects_into_assets.helpers.undo import ChangeLog  # noqa: E402
+from all_objects_into_assets.helpers.workers import background_command  # noqa: E402
+
+
+def _rss_bytes(peak: bool) -> int:
+    """Current (or peak) resident set size; peak only where /proc is missing."""
+    try:
+        key = "VmHWM:" if peak else "VmRSS:"
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(key):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource  # POSIX only
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _worker(mode: str, library: str, result: str):
+    prefs = cli._prefs_from_overrides(ui, {"preview_refresh_mode": 'NONE', "undo_mode": mode})
+    if mode == 'FULL':
+        # In the UI the loaded file is already on the undo stack; the run's step is a diff to it
+        bpy.ops.ed.undo_push(message="Original")
+    base = _rss_bytes(peak=False)
+    log = ChangeLog() if mode == 'LIGHT' else None
+    t0 = time.perf_counter()
+    summary = operators.run_all_objects_into_assets(
+        bpy.context, prefs, library, None, lambda lv, msg: print(msg), change_log=log)
+    if mode == 'FULL':
+        bpy.ops.ed.undo_push(message="All Objects into Assets")
+    secs = time.perf_counter() - t0
+    with open(result, "w", encoding="utf-8") as f:
+        json.dump({
+            "mode": mode, "seconds": secs, "base": base, "peak": _rss_bytes(peak=True),
+            "assets": (summary["objects"] + summary["collections"]) if summary else 0,
+            "log_entries": len(log) if log is not None else 0,
+        }, f)
+
+
+def _stand_in(modes, n_objects):
+    """One run per mode on a fresh synthetic scene; tracemalloc peak above the scene."""
+    rows = []
+    for mode in modes:
+        fake_bpy.make_scene(bpy, n_objects=n_objects, seed=0)
+        operators.sync.reset()
+        prefs = cli._prefs_from_overrides(ui, {"preview_refresh_mode": 'NONE', "undo_mode": mode})
+        with tempfile.TemporaryDirectory(prefix="aoia_undo_") as tmp:
+            tracemalloc.start()     # the scene was built untraced: everything counted is the run's
+            log = ChangeLog() if mode == 'LIGHT' else None
+            t0 = time.perf_counter()
+            summary = operators.run_all_objects_into_assets(
+                bpy.context, prefs, Path(tmp), None, lambda lv, msg: print(msg), change_log=log)
+            if mode == 'FULL':
+                bpy.ops.ed.undo_push(message="All Objects into Assets")
+            secs = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        rows.append({"mode": mode, "seconds": secs, "base": 0, "peak": peak,
+                     "assets": summary["objects"] + summary["collections"],
+                     "log_entries": len(log) if log is not None else 0})
+    return rows
+
+
+def main():
+    if fake_bpy is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    else:
+        argv = sys.argv[1:]
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", nargs="+", default=["FULL", "LIGHT", "OFF"], choices=("FULL", "LIGHT", "OFF"))
+    ap.add_argument("--stand-in", type=int, metavar="N", help="synthetic scene of N objects, no Blender")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    ap.add_argument("--library", help=argparse.SUPPRESS)
+    ap.add_argument("--result", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.worker:
+        return _worker(args.worker, args.library, args.result)
+    if (fake_bpy is None) == bool(args.stand_in):
+        sys.exit("--stand-in N runs in plain Python; in Blender leave it out")
+    if args.stand_in:
+        _print(_stand_in(args.modes, args.stand_in), "alloc MB")
+        return
+
+    if not bpy.data.filepath:
+        sys.exit("Open a saved .blend file: blender -b file.blend --python bench_undo.py")
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="aoia_undo_") as tmp:
+        for mode in args.modes:
+            blend = Path(tmp) / f"{mode}.blend"
+            shutil.copy2(bpy.data.filepath, blend)
+            lib = Path(tmp) / f"lib_{mode}"
+            result = Path(tmp) / f"{mode}.json"
+            cmd = background_command(Path(__file__).resolve(), blend,
+                                     ["--worker", mode, "--library", lib, "--result", result])
+            subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, env=os.environ.copy())
+            try:
+                rows.append(json.loads(result.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                print(f"{mode}: worker failed (run the command by hand to see its output):\n  {' '.join(map(str, cmd))}")
+    _print(rows, "peak MB")
+
+
+def _print(rows, peak_label):
+    mb = 2 ** 20
+    print(f"{'mode':<8}{'assets':>9}{'log':>9}{'seconds':>10}{peak_label:>10}{'+MB':>9}")
+    for r in rows:
+        print(f"{r['mode']:<8}{r['assets']:>9}{r['log_entries']:>9}{r['seconds']:>10.2f}"
+              f"{r['peak'] / mb:>10.1f}{(r['peak'] - r['base']) / mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
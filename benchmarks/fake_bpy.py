@@ -0,0 +1,768 @@
+"""
+Lightweight in-process stand-in for the parts of ``bpy`` the add-on touches.
+
+Only the data model (Collections, Objects, Scenes, asset data, previews) is
+emulated; operators that would need a real Blender session are no-ops.
+Call ``install()`` before importing the add-on, then ``make_scene(...)`` to
+populate ``bpy.data`` with a parametric synthetic scene.
+
+Timings measured against it are only meaningful relative to each other (scaling,
+before/after a change); RNA access in real Blender has very different constants.
+"""
+import itertools
+import os
+import random
+import sys
+import types
+
+_uid = itertools.count(1)
+
+
+# ---------- RNA-ish property stand-ins ----------
+class _Prop:
+    def __init__(self, kind, **kw):
+        self.kind = kind
+        self.kw = kw
+        self.keywords = kw
+
+    def default(self):
+        if self.kind == "COLLECTION":
+            return _PropCollection(self.kw.get("type"))
+        if self.kind == "POINTER":
+            return self.kw.get("type")()
+        if "default" in self.kw:
+            return self.kw["default"]
+        if self.kind == "ENUM":
+            items = self.kw.get("items") or []
+            if callable(items):
+                items = items(None, None)
+            return items[0][0] if items else ""
+        return {"BOOL": False, "INT": 0, "FLOAT": 0.0, "STRING": ""}.get(self.kind)
+
+
+def _prop_factory(kind):
+    return lambda **kw: _Prop(kind, **kw)
+
+
+class _PropCollection(list):
+    def __init__(self, item_type=None):
+        super().__init__()
+        self._item_type = item_type
+
+    def add(self):
+        item = self._item_type()
+        self.append(item)
+        return item
+
+    def remove(self, idx):
+        del self[idx]
+
+
+class _Struct:
+    _prop_cache = {}
+
+    def __init__(self, **kw):
+        cls = type(self)
+        props = _Struct._prop_cache.get(cls)
+        if props is None:
+            props = _Struct._prop_cache[cls] = [
+                (name, ann)
+                for klass in reversed(cls.__mro__)
+                for name, ann in vars(klass).get("__annotations__", {}).items()
+                if isinstance(ann, _Prop)
+            ]
+        for name, ann in props:
+            setattr(self, name, ann.default())
+        for k, v in kw.items():
+            setattr(self, k, v)
+
+
+class Operator(_Struct):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.reports = []
+
+    def report(self, level, msg):
+        self.reports.append((set(level), msg))
+
+
+class PropertyGroup(_Struct):
+    pass
+
+
+class AddonPreferences(_Struct):
+    pass
+
+
+class UIList(_Struct):
+    pass
+
+
+class Panel(_Struct):
+    pass
+
+
+class Menu(_Struct):
+    pass
+
+
+# ---------- data model ----------
+class AssetData:
+    def __init__(self):
+        self.catalog_id = "00000000-0000-0000-0000-000000000000"
+        self.catalog_simple_name = ""
+        self.tags = []
+        self.description = ""
+
+
+class ImagePreview:
+    def __init__(self):
+        self.image_size = (0, 0)
+        self.image_pixels_float = _FloatBuffer(0)
+        self.image_pixels = _FloatBuffer(0)
+        self.is_image_custom = False
+
+    def _render(self, size=128):
+        self.image_size = (size, size)
+        self.image_pixels_float = _FloatBuffer(size * size * 4)
+        self.image_pixels = _FloatBuffer(size * size)
+
+
+class _FloatBuffer:
+    """Sequence with ``foreach_get``/``foreach_set`` like an RNA float array."""
+
+    def __init__(self, n):
+        self._n = n
+        self._data = None
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if self._data is not None:
+            return self._data[i]
+        return 0
+
+    def foreach_get(self, buf):
+        for i in range(min(len(buf), self._n)):
+            buf[i] = self[i]
+
+    def foreach_set(self, buf):
+        self._n = len(buf)
+        self._data = list(buf)
+
+
+class ID(_Struct):
+    def __init__(self, name=""):
+        super().__init__()
+        self.name = name
+        self.session_uid = next(_uid)
+        self.asset_data = None
+        self.preview = None
+        self.library = None
+        self.use_fake_user = False
+        self.is_embedded_data = False
+        self._props = {}
+
+    @property
+    def users(self):
+        return 1
+
+    @property
+    def original(self):
+        return self
+
+    def asset_mark(self):
+        if self.asset_data is None:
+            self.asset_data = AssetData()
+
+    def asset_clear(self):
+        self.asset_data = None
+
+    def preview_ensure(self):
+        if self.preview is None:
+            self.preview = ImagePreview()
+        return self.preview
+
+    def asset_generate_preview(self):
+        self.preview_ensure()._render()
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def __delitem__(self, key):
+        del self._props[key]
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r}>"
+
+
+class _Elements:
+    """Mesh element collection: only len() and foreach_get() are emulated."""
+
+    def __init__(self, n, seed):
+        self._n = n
+        self._seed = seed
+
+    def __len__(self):
+        return self._n
+
+    def foreach_get(self, attr, buf):
+        for i in range(len(buf)):
+            buf[i] = (self._seed + i) % 97
+
+
+class Mesh(ID):
+    id_type = "MESH"
+
+    def __init__(self, name=""):
+        super().__init__(name)
+        seed = sum(map(ord, name))
+        self.vertices = _Elements(8, seed)
+        self.loops = _Elements(24, seed)
+        self.polygons = _Elements(6, seed)
+        self.materials = []
+
+
+class Material(ID):
+    id_type = "MATERIAL"
+
+
+class NodeTree(ID):
+    id_type = "NODETREE"
+
+    def __init__(self, name="", bl_idname="GeometryNodeTree"):
+        super().__init__(name)
+        self.bl_idname = bl_idname
+        self.nodes = []
+        self.links = []
+
+
+class Image(ID):
+    id_type = "IMAGE"
+
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.source = 'FILE'
+        self.filepath = ""
+        self.size = (0, 0)
+
+
+class _ObjectLinks(list):
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+
+    def link(self, obj):
+        if self._owner in obj.users_collection:
+            raise RuntimeError(f"Object '{obj.name}' already in collection '{self._owner.name}'")
+        self.append(obj)
+        obj.users_collection.append(self._owner)
+
+    def unlink(self, obj):
+        self.remove(obj)
+        obj.users_collection.remove(self._owner)
+
+
+class _ChildLinks(list):
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+        self._members = set()  # keeps the duplicate check O(1) so the stub never dominates timings
+
+    def __contains__(self, coll):
+        return coll in self._members
+
+    def link(self, coll):
+        if coll in self._members:
+            raise RuntimeError(f"Collection '{coll.name}' already in collection '{self._owner.name}'")
+        self.append(coll)
+        self._members.add(coll)
+        coll._parents.append(self._owner)
+
+    def unlink(self, coll):
+        self.remove(coll)
+        self._members.discard(coll)
+        coll._parents.remove(self._owner)
+
+
+class Collection(ID):
+    id_type = "COLLECTION"
+
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.objects = _ObjectLinks(self)
+        self.children = _ChildLinks(self)
+        self._parents = []
+
+    @property
+    def all_objects(self):
+        seen, out = set(), []
+        stack = [self]
+        while stack:
+            c = stack.pop()
+            for o in c.objects:
+                if o not in seen:
+                    seen.add(o)
+                    out.append(o)
+            stack.extend(c.children)
+        return out
+
+    @property
+    def children_recursive(self):
+        out, stack = [], list(self.children)
+        while stack:
+            c = stack.pop()
+            if c not in out:
+                out.append(c)
+                stack.extend(c.children)
+        return out
+
+    @property
+    def users(self):
+        return len(self._parents) + (1 if self.use_fake_user else 0)
+
+
+class _Slot:
+    def __init__(self, material):
+        self.material = material
+        self.link = "OBJECT" if material else "DATA"
+
+
+class _RNAProperty:
+    def __init__(self, identifier, type_):
+        self.identifier = identifier
+        self.type = type_
+        self.array_length = 0
+
+
+class _RNA:
+    """bl_rna of a stand-in struct: its public attributes typed from their values."""
+
+    def __init__(self, struct):
+        kinds = ((bool, 'BOOLEAN'), (int, 'INT'), (float, 'FLOAT'), (str, 'STRING'))
+        self.properties = []
+        for k, v in vars(struct).items():
+            if k.startswith("_"):
+                continue
+            kind = 'POINTER' if v is None or isinstance(v, ID) else next(
+                (t for cls, t in kinds if isinstance(v, cls)), None)
+            if kind is not None:
+                self.properties.append(_RNAProperty(k, kind))
+
+
+class Node:
+    def __init__(self, bl_idname, **settings):
+        self.name = bl_idname
+        self.bl_idname = bl_idname
+        self.inputs = []
+        for k, v in settings.items():
+            setattr(self, k, v)
+
+    @property
+    def bl_rna(self):
+        return _RNA(self)
+
+
+class Modifier:
+    def __init__(self, name, type_, **settings):
+        self.name = name
+        self.type = type_
+        self.show_viewport = True
+        self.show_render = True
+        self._props = {}    # ID properties (Geometry Nodes inputs)
+        for k, v in settings.items():
+            setattr(self, k, v)
+
+    @property
+    def bl_rna(self):
+        return _RNA(self)
+
+    def keys(self):
+        return self._props.keys()
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+
+class Object(ID):
+    id_type = "OBJECT"
+
+    def __init__(self, name="", data=None):
+        super().__init__(name)
+        self.data = data
+        self.type = "MESH" if data is not None else "EMPTY"
+        self._parent = None
+        self._children = []
+        self.users_collection = []
+        self.material_slots = []
+        self.modifiers = []
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, par):
+        if self._parent is not None:
+            self._parent._children.remove(self)
+        self._parent = par
+        if par is not None:
+            par._children.append(self)
+
+    @property
+    def children(self):
+        return tuple(self._children)
+
+    @property
+    def children_recursive(self):
+        out, stack = [], list(reversed(self._children))
+        while stack:
+            o = stack.pop()
+            out.append(o)
+            stack.extend(reversed(o._children))
+        return out
+
+
+class Scene(ID):
+    id_type = "SCENE"
+
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+        self.collection.is_embedded_data = True
+
+
+class _RemovedID:
+    """What a Python reference to a removed ID turns into: every access raises, as in Blender."""
+
+    def __getattribute__(self, name):
+        if name.startswith("__"):
+            return object.__getattribute__(self, name)
+        raise ReferenceError(f"StructRNA of type {object.__getattribute__(self, '_rna_type')} has been removed")
+
+
+class _IDCollection:
+    def __init__(self, factory):
+        self._factory = factory
+        self._items = {}
+
+    def new(self, name, *args):
+        base, n = name, 0
+        while name in self._items:
+            n += 1
+            name = f"{base}.{n:03d}"
+        idb = self._factory(name, *args)
+        self._items[name] = idb
+        return idb
+
+    def get(self, name, default=None):
+        return self._items.get(name, default)
+
+    def remove(self, idb):
+        self._items.pop(idb.name, None)
+        if isinstance(idb, Object):
+            for c in list(idb.users_collection):
+                c.objects.unlink(idb)
+            idb.parent = None
+            for ch in list(idb._children):
+                ch.parent = None
+        elif isinstance(idb, Collection):
+            for p in list(idb._parents):
+                p.children.unlink(idb)
+            for ch in list(idb.children):
+                idb.children.unlink(ch)
+        idb._rna_type = type(idb).__name__
+        idb.__class__ = _RemovedID
+
+    def rename(self, idb, new_name):
+        self._items.pop(idb.name, None)
+        idb.name = new_name
+        self._items[new_name] = idb
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, idb):
+        return self._items.get(getattr(idb, "name", None)) is idb
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+
+class _Libraries(_IDCollection):
+    def __init__(self):
+        super().__init__(ID)
+        self.written = []
+
+    def write(self, filepath, datablocks, **kw):
+        self.written.append((filepath, set(datablocks), kw))
+        with open(filepath, "wb") as f:
+            f.write(b"BLENDER-fake")
+
+
+class _Data:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.filepath = ""
+        self.collections = _IDCollection(Collection)
+        self.objects = _IDCollection(Object)
+        self.meshes = _IDCollection(Mesh)
+        self.materials = _IDCollection(Material)
+        self.node_groups = _IDCollection(NodeTree)
+        self.images = _IDCollection(Image)
+        self.scenes = _IDCollection(Scene)
+        self.libraries = _Libraries()
+        self.is_dirty = False
+
+
+# ---------- context / prefs ----------
+class _AssetLibrary:
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+
+class _Addon:
+    def __init__(self, prefs):
+        self.preferences = prefs
+
+
+class _Preferences:
+    def __init__(self):
+        self.addons = {}
+        self.filepaths = types.SimpleNamespace(asset_libraries=[])
+
+
+class _WindowManager:
+    def __init__(self):
+        self.progress = None
+        self.windows = []
+
+    def progress_begin(self, lo, hi):
+        self.progress = lo
+
+    def progress_update(self, v):
+        self.progress = v
+
+    def progress_end(self):
+        self.progress = None
+
+    def event_timer_add(self, step, window=None):
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+    def modal_handler_add(self, op):
+        return True
+
+
+class _Context:
+    def __init__(self, data):
+        self._data = data
+        self.preferences = _Preferences()
+        self.window = None
+        self.screen = None
+        self.area = None
+        self.selected_ids = None
+        self.collection = None
+        self.window_manager = _WindowManager()
+        self.workspace = None
+
+    @property
+    def scene(self):
+        scenes = list(self._data.scenes)
+        return scenes[0] if scenes else None
+
+    def temp_override(self, **kw):
+        import contextlib
+        return contextlib.nullcontext()
+
+
+# ---------- ops / app ----------
+class _OpCall:
+    def __init__(self, path):
+        self._path = path
+
+    def __getattr__(self, name):
+        return _OpCall(f"{self._path}.{name}")
+
+    def __call__(self, *args, **kw):
+        hook = _op_hooks.get(self._path)
+        if hook is not None:
+            return hook(*args, **kw)
+        return {'FINISHED'}
+
+
+_op_hooks = {}
+
+
+def _persistent(fn):
+    fn._bpy_persistent = True
+    return fn
+
+
+class _Timers:
+    def __init__(self):
+        self.registered = {}
+
+    def register(self, fn, first_interval=0.0, persistent=False):
+        self.registered[fn] = first_interval
+
+    def unregister(self, fn):
+        self.registered.pop(fn, None)
+
+    def is_registered(self, fn):
+        return fn in self.registered
+
+    def run_all(self, max_ticks=100000):
+        """Drive registered timers until they all return None."""
+        ticks = 0
+        while self.registered and ticks < max_ticks:
+            for fn in list(self.registered):
+                nxt = fn()
+                if nxt is None:
+                    self.registered.pop(fn, None)
+                else:
+                    self.registered[fn] = nxt
+            ticks += 1
+        return ticks
+
+
+def install():
+    """Register the stand-in as ``bpy`` (and friends) in ``sys.modules``."""
+    if isinstance(sys.modules.get("bpy"), types.ModuleType) and getattr(sys.modules["bpy"], "_is_fake", False):
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+    bpy._is_fake = True
+    bpy.data = _Data()
+    bpy.context = _Context(bpy.data)
+
+    bpy.types = types.SimpleNamespace(
+        Operator=Operator, PropertyGroup=PropertyGroup, AddonPreferences=AddonPreferences,
+        UIList=UIList, Panel=Panel, Menu=Menu, ID=ID, Object=Object, Collection=Collection,
+        Scene=Scene, Mesh=Mesh, Material=Material, NodeTree=NodeTree, Image=Image,
+        ImagePreview=ImagePreview,
+        OUTLINER_MT_object=types.SimpleNamespace(append=lambda f: None, remove=lambda f: None),
+        OUTLINER_MT_collection=types.SimpleNamespace(append=lambda f: None, remove=lambda f: None),
+        OUTLINER_MT_context_menu=types.SimpleNamespace(append=lambda f: None, remove=lambda f: None),
+        OUTLINER_HT_header=types.SimpleNamespace(append=lambda f: None, remove=lambda f: None),
+        STATUSBAR_HT_header=types.SimpleNamespace(append=lambda f: None, remove=lambda f: None),
+    )
+    bpy.props = types.SimpleNamespace(
+        BoolProperty=_prop_factory("BOOL"), IntProperty=_prop_factory("INT"),
+        FloatProperty=_prop_factory("FLOAT"), StringProperty=_prop_factory("STRING"),
+        EnumProperty=_prop_factory("ENUM"), CollectionProperty=_prop_factory("COLLECTION"),
+        PointerProperty=_prop_factory("POINTER"),
+    )
+    bpy.ops = _OpCall("ops")
+    bpy.ops.__dict__["_hooks"] = _op_hooks
+
+    handlers = types.SimpleNamespace(
+        depsgraph_update_post=[], load_post=[], load_pre=[], save_pre=[], save_post=[],
+        undo_post=[], redo_post=[], persistent=_persistent,
+    )
+    bpy.app = types.SimpleNamespace(
+        version=(4, 5, 0), background=True, binary_path="", handlers=handlers,
+        timers=_Timers(), is_job_running=lambda name: False, driver_namespace={},
+    )
+
+    def _abspath(p, start=None, library=None):
+        if p.startswith("//"):
+            base = os.path.dirname(bpy.data.filepath) if bpy.data.filepath else ""
+            return os.path.join(base, p[2:]) if p[2:] else (base + os.sep if base else "")
+        return p
+
+    bpy.path = types.SimpleNamespace(abspath=_abspath, basename=os.path.basename)
+    bpy.utils = types.SimpleNamespace(register_class=lambda c: None, unregister_class=lambda c: None)
+
+    app_mod = types.ModuleType("bpy.app")
+    app_mod.__dict__.update(vars(bpy.app))
+    handlers_mod = types.ModuleType("bpy.app.handlers")
+    handlers_mod.__dict__.update(vars(handlers))
+    sys.modules["bpy"] = bpy
+    sys.modules["bpy.app"] = app_mod
+    sys.modules["bpy.app.handlers"] = handlers_mod
+    return bpy
+
+
+def install_prefs(bpy, prefs_cls, package_name="all_objects_into_assets", **overrides):
+    prefs = prefs_cls()
+    for k, v in overrides.items():
+        setattr(prefs, k, v)
+    bpy.context.preferences.addons[package_name] = _Addon(prefs)
+    return prefs
+
+
+# ---------- synthetic scenes ----------
+def make_scene(bpy, n_objects=1000, depth=3, fanout=4, parent_depth=2, shared_ratio=0.5,
+               n_excluded=0, seed=0):
+    """
+    Populate ``bpy.data`` with a deterministic synthetic scene.
+
+    - Collections form a tree of ``depth`` levels with ``fanout`` children each.
+    - Objects are spread over leaf and inner collections; every ``parent_depth + 1``
+      consecutive objects form one parent chain of that depth.
+    - ``shared_ratio`` of meshes are linked duplicates of a small pool of meshes.
+    - ``n_excluded`` top-level collections are named ``EXCL_<i>`` (match with ``EXCL_*``).
+    """
+    rng = random.Random(seed)
+    data = bpy.data
+    data.reset()
+    scene = data.scenes.new("Scene")
+
+    colls = []
+    frontier = [(scene.collection, 0)]
+    idx = 0
+    while frontier:
+        parent, lvl = frontier.pop(0)
+        if lvl >= depth:
+            continue
+        for _ in range(fanout):
+            prefix = "EXCL_" if (parent is scene.collection and idx < n_excluded) else "C_"
+            c = data.collections.new(f"{prefix}{idx}")
+            idx += 1
+            parent.children.link(c)
+            colls.append(c)
+            frontier.append((c, lvl + 1))
+    if not colls:
+        colls = [scene.collection]
+
+    pool = [data.meshes.new(f"SharedMesh_{i}") for i in range(max(1, n_objects // 100))]
+    mats = [data.materials.new(f"Mat_{i}") for i in range(8)]
+    chain = max(1, parent_depth + 1)
+    prev = None
+    for i in range(n_objects):
+        if rng.random() < shared_ratio:
+            mesh = pool[rng.randrange(len(pool))]
+        else:
+            mesh = data.meshes.new(f"Mesh_{i}")
+        obj = data.objects.new(f"Obj_{i}", mesh)
+        obj.material_slots.append(_Slot(None))
+        if not mesh.materials:
+            mesh.materials.append(mats[rng.randrange(len(mats))])
+        obj.material_slots[0].material = mesh.materials[0]
+        colls[rng.randrange(len(colls))].objects.link(obj)
+        if i % chain and prev is not None:
+            obj.parent = prev
+        prev = obj
+    return scene
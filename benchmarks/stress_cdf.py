@@ -0,0 +1,122 @@
+"""
+Stress concurrent catalog writers against one library folder (no Blender needed).
+
+    python benchmarks/stress_cdf.py --writers 16 --rounds 20 --dir /tmp/aoia_stress
+
+Every writer process repeatedly does what a run of the add-on does: read the CDF, add its
+own catalogs plus a set of catalog paths shared by all writers (with random UUIDs), spend a
+little time "processing", then lock + re-read + merge + write. Afterwards the file must
+contain every writer's catalogs, each shared path exactly once, and the UUID every writer
+ended up with for a shared path must be the one in the file.
+'--no-lock' runs a plain read-modify-write for comparison (expect lost catalogs).
+"""
+import argparse
+import importlib.util
+import multiprocessing as mp
+import random
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+_CATALOGS = Path(__file__).resolve().parents[1] / "all_objects_into_assets" / "helpers" / "catalogs.py"
+CDF_NAME = "blender_assets.cats.txt"
+
+
+def _catalogs():
+    spec = importlib.util.spec_from_file_location("_aoia_stress_catalogs", _CATALOGS)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _writer(args):
+    idx, directory, rounds, shared, use_lock, seed = args
+    cat = _catalogs()
+    rng = random.Random(seed)
+    cdf = Path(directory) / CDF_NAME
+    own, final_shared, waited = [], {}, 0.0
+    for r in range(rounds):
+        base = cat.read_cdf(cdf)
+        ours = dict(base)
+        path = f"Writers/W{idx:03d}/R{r:03d}"
+        cat.ensure_catalog(ours, path, f"R{r:03d}")
+        own.append(path)
+        mine = {}
+        for k in rng.sample(range(shared), min(shared, 3)):
+            sp = f"Shared/S{k:03d}"
+            mine[sp] = cat.ensure_catalog(ours, sp, f"S{k:03d}")
+        time.sleep(rng.uniform(0.0, 0.01))
+        if use_lock:
+            t0 = time.perf_counter()
+            with cat.cdf_lock(cdf, timeout=120.0):
+                waited += time.perf_counter() - t0
+                _, remap, _ = cat.merge_cdf(cdf, base, ours)
+        else:
+            cat.write_cdf(cdf, ours)
+            remap = {}
+        for sp, uid in mine.items():
+            final_shared[sp] = remap.get(uid, uid)
+    return idx, own, final_shared, waited
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--writers", type=int, default=16)
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--shared", type=int, default=10, help="catalog paths every writer may create")
+    ap.add_argument("--dir", default=None, help="library folder (default: a fresh temp folder)")
+    ap.add_argument("--no-lock", action="store_true")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    if args.dir:
+        directory = Path(args.dir)
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+    else:
+        import tempfile
+        directory = Path(tempfile.mkdtemp(prefix="aoia_stress_"))
+
+    jobs = [(i, str(directory), args.rounds, args.shared, not args.no_lock, args.seed * 1000 + i)
+            for i in range(args.writers)]
+    t0 = time.perf_counter()
+    with mp.Pool(args.writers) as pool:
+        results = pool.map(_writer, jobs)
+    secs = time.perf_counter() - t0
+
+    cat = _catalogs()
+    cdf = directory / CDF_NAME
+    entries = cat.read_cdf(cdf)
+    lines = [ln for ln in cdf.read_text(encoding="utf-8").splitlines() if cat._parse_entry(ln)]
+    errors = []
+    missing = [p for _, own, _, _ in results for p in own if p not in entries]
+    if missing:
+        errors.append(f"{len(missing)} writer catalogs lost (e.g. {missing[0]})")
+    if len(lines) != len(entries):
+        errors.append(f"{len(lines) - len(entries)} duplicate catalog paths in the file")
+    uids = [uid for uid, _ in entries.values()]
+    if len(set(uids)) != len(uids):
+        errors.append("the same UUID is used by several paths")
+    stale = sum(1 for _, _, shared, _ in results for sp, uid in shared.items()
+                if entries.get(sp, (None,))[0] != uid)
+    if stale:
+        errors.append(f"{stale} shared-path UUIDs held by writers differ from the file")
+    for leftover in directory.glob("*.lock"):
+        errors.append(f"lock file left behind: {leftover.name}")
+
+    writes = args.writers * args.rounds
+    waited = sum(w for *_, w in results)
+    print(f"{args.writers} writers x {args.rounds} rounds: {writes} merges in {secs:.2f}s "
+          f"({writes / secs:.0f}/s), mean lock wait {1000 * waited / writes:.1f} ms, "
+          f"{len(entries)} catalogs")
+    for e in errors:
+        print("FAIL:", e)
+    if not errors:
+        print("OK")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
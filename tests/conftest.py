@@ -0,0 +1,63 @@
+"""
+Unit tests run against the bpy stand-in in benchmarks/fake_bpy.py (no Blender needed):
+
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "benchmarks"))
+sys.path.insert(0, str(_ROOT))
+
+import fake_bpy  # noqa: E402
+
+bpy = fake_bpy.install()
+
+from all_objects_into_assets import ui  # noqa: E402
+from all_objects_into_assets.helpers import sync, undo  # noqa: E402
+
+
+@pytest.fixture
+def scene():
+    """A fresh synthetic scene per test; session-scoped add-on state is dropped as on file load."""
+    def make(**kw):
+        kw.setdefault("n_objects", 200)
+        kw.setdefault("seed", 1)
+        sc = fake_bpy.make_scene(bpy, **kw)
+        sync.reset()
+        undo.take_last()
+        return sc
+    return make
+
+
+@pytest.fixture
+def prefs():
+    def make(**overrides):
+        overrides.setdefault("preview_refresh_mode", 'NONE')
+        return fake_bpy.install_prefs(bpy, ui.AddonPrefs, **overrides)
+    return make
+
+
+@pytest.fixture
+def library(tmp_path):
+    """An asset library named "Lib" (use asset_library="Lib" in prefs)."""
+    path = tmp_path / "library"
+    path.mkdir()
+    bpy.context.preferences.filepaths.asset_libraries[:] = [fake_bpy._AssetLibrary("Lib", str(path))]
+    return path
+
+
+@pytest.fixture
+def interactive(monkeypatch):
+    """A UI session: not background, with a window (modal operators)."""
+    monkeypatch.setattr(bpy.app, "background", False)
+    monkeypatch.setattr(bpy.context, "window", object())
+
+
+def depsgraph_update(*ids):
+    """Report 'ids' as a depsgraph update would (to the incremental-sync tracker)."""
+    from types import SimpleNamespace
+    sync._on_depsgraph_update(bpy.context.scene, SimpleNamespace(updates=[SimpleNamespace(id=i) for i in ids]))
@@ -0,0 +1,86 @@
+"""The modal operator applies across UI ticks: the file may change between them."""
+import time
+from types import SimpleNamespace
+
+from conftest import bpy
+
+from all_objects_into_assets import operators
+from all_objects_into_assets.helpers import sync, undo
+
+TIMER = SimpleNamespace(type='TIMER')
+
+
+def _start(prefs, library):
+    p = prefs(asset_library="Lib", apply_time_budget_ms=0, undo_mode='LIGHT')
+    op = operators.OUTLINER_OT_all_objects_into_assets(force_scope='ALL')
+    assert op.invoke(bpy.context, None) == {'RUNNING_MODAL'}
+    deadline = time.monotonic() + 10
+    while op._applier is None:
+        assert op.modal(bpy.context, TIMER) == {'PASS_THROUGH'}
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    assert op.modal(bpy.context, TIMER) == {'PASS_THROUGH'}     # first batch
+    return p, op
+
+
+def _finish(op):
+    for _ in range(10000):
+        result = op.modal(bpy.context, TIMER)
+        if result != {'PASS_THROUGH'}:
+            return result
+    raise AssertionError("apply did not finish")
+
+
+def test_ids_removed_between_ticks_are_skipped(scene, prefs, library, interactive):
+    scene(n_objects=2000, parent_depth=0)
+    _p, op = _start(prefs, library)
+    gone = [o for o in bpy.data.objects if not o.asset_data][:50]
+    for o in gone:
+        bpy.data.objects.remove(o)
+    assert _finish(op) == {'FINISHED'}
+    assert op._applier.counters["rows_skipped"] == 50
+    assert all(o.asset_data for o in bpy.data.objects)
+
+
+def test_undo_between_ticks_stops_the_run(scene, prefs, library, interactive):
+    scene(n_objects=2000, parent_depth=0)
+    _p, op = _start(prefs, library)
+    sync._on_undo_redo()
+    assert op.modal(bpy.context, TIMER) == {'CANCELLED'}
+    assert undo.last() is None                  # nothing to revert: undo discarded it
+    assert not sync.has_previous_run(op._applier.plan.run_key)
+
+
+def test_own_changes_do_not_stop_the_run(scene, prefs, library, interactive):
+    scene(n_objects=2000, parent_depth=2)
+    _p, op = _start(prefs, library)
+    # What Blender reports for the collections the run creates and links into
+    sync._on_depsgraph_update(bpy.context.scene, SimpleNamespace(updates=[
+        SimpleNamespace(id=c) for c in bpy.data.collections]))
+    assert _finish(op) == {'FINISHED'}
+    assert not op._applier.cancelled
+
+
+def test_collection_edits_between_ticks_stop_the_run(scene, prefs, library, interactive):
+    scene(n_objects=2000, parent_depth=0)
+    _p, op = _start(prefs, library)
+    new = bpy.data.collections.new("Added")
+    bpy.context.scene.collection.children.link(new)
+    sync._on_depsgraph_update(bpy.context.scene, SimpleNamespace(updates=[SimpleNamespace(id=new)]))
+    assert op.modal(bpy.context, TIMER) == {'FINISHED'}
+    assert op._applier.cancelled
+    assert 0 < sum(1 for o in bpy.data.objects if o.asset_data) < 2000
+
+
+def test_one_undo_step_per_run(scene, prefs, library, interactive, monkeypatch):
+    import fake_bpy
+    pushes = []
+    monkeypatch.setitem(fake_bpy._op_hooks, "ops.ed.undo_push", lambda **kw: pushes.append(kw) or {'FINISHED'})
+    for mode, expected, revertible in (('FULL', 1, False), ('LIGHT', 0, True), ('OFF', 0, False)):
+        scene(n_objects=300, parent_depth=0)
+        pushes.clear()
+        prefs(asset_library="Lib", undo_mode=mode)
+        op = operators.OUTLINER_OT_all_objects_into_assets(force_scope='ALL')
+        assert op.execute(bpy.context) == {'FINISHED'}
+        assert len(pushes) == expected
+        assert (undo.last() is not None) is revertible
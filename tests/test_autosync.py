@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import bpy, depsgraph_update
+
+from all_objects_into_assets import autosync, operators
+from all_objects_into_assets.helpers import sync
+
+
+def _update(*ids, **flags):
+    """A depsgraph update as both handlers see it (sync's runs first)."""
+    upd = SimpleNamespace(updates=[SimpleNamespace(id=i, **flags) for i in ids])
+    sync._on_depsgraph_update(bpy.context.scene, upd)
+    autosync._on_depsgraph_update(bpy.context.scene, upd)
+
+
+@pytest.fixture
+def flushing(scene, prefs, library, interactive, monkeypatch):
+    """An auto-syncing session after its first (full) flush; yields the captured snapshots."""
+    # Loose objects: objects linked into *_asset collections are excluded from later runs
+    scene(n_objects=120, parent_depth=0)
+    prefs(asset_library="Lib", auto_sync=True)
+    snapshots = []
+    begin = operators._begin_run
+
+    def spy(*args, **kw):
+        run = begin(*args, **kw)
+        snapshots.append(run["snapshot"])
+        return run
+    monkeypatch.setattr(operators, "_begin_run", spy)
+    monkeypatch.setattr(autosync, "_active", None)
+    monkeypatch.setattr(autosync, "_pending", True)
+    assert autosync.flush(60.0)
+    sync.clear_own()
+    depsgraph_update()      # the flush's own changes, evaluated
+    monkeypatch.setattr(autosync, "_stamp", sync.change_stamp())
+    snapshots.clear()
+    yield snapshots
+
+
+def _state():
+    return {o.name: (bool(o.asset_data), o.asset_data.catalog_id if o.asset_data else None)
+            for o in bpy.data.objects}
+
+
+def test_object_edits_flush_from_a_partial_snapshot(flushing):
+    child, parent = list(bpy.data.objects)[:2]
+    child.parent = parent
+    _update(child)
+    assert autosync._pending
+    assert autosync.flush(60.0)
+    snap, = flushing
+    assert snap.partial and sorted(o.name for o in snap.objects) == sorted([child.name, parent.name])
+    assert child in bpy.data.collections[parent.name + "_asset"].objects
+
+    # Same result as a full run of the same settings
+    partial = _state()
+    assert operators.run_all_objects_into_assets(bpy.context, autosync._FlushPrefs(autosync._addon_prefs()),
+                                                  operators.resolve_library_path("Lib"), None, print)
+    assert _state() == partial
+
+
+def test_own_and_transform_only_updates_are_not_edits(flushing):
+    marked = [o for o in bpy.data.objects if o.asset_data][:5]
+    _update(*marked, is_updated_transform=True)
+    assert not autosync._pending
+    # The run's own collection and object changes
+    sync.own_updates(*marked, *bpy.data.collections)
+    _update(*marked, *bpy.data.collections)
+    assert not autosync._pending
+
+
+def test_updates_during_a_flush_are_ignored(flushing, monkeypatch):
+    obj = list(bpy.data.objects)[0]
+    monkeypatch.setattr(autosync, "_flushing", True)
+    _update(obj)
+    assert not autosync._pending
+
+
+def test_undo_between_ticks_drops_the_flush(flushing, monkeypatch):
+    for o in list(bpy.data.objects)[:100]:
+        bpy.data.objects.rename(o, o.name + "_x")
+        _update(o)
+    assert not autosync.flush(0.0)      # one batch, more left
+    sync._on_undo_redo()
+    assert autosync.flush(60.0)
+    assert autosync._active is None
+
+
+def test_save_never_plans(flushing):
+    child, parent = list(bpy.data.objects)[:2]
+    child.parent = parent
+    _update(child)
+    before = _state()
+    autosync._on_save_pre()
+    assert flushing == [] and autosync._active is None and autosync._pending
+    assert _state() == before   # the timer plans and applies it after the save
+
+
+def test_save_applies_one_budget_of_a_planned_flush(flushing, prefs):
+    prefs(asset_library="Lib", auto_sync=True, auto_sync_budget_ms=0)
+    for o in list(bpy.data.objects)[:100]:
+        bpy.data.objects.rename(o, o.name + "_x")
+        _update(o)
+    assert not autosync.flush(0.0)      # the timer planned it, one batch applied
+    applier = autosync._active[3]
+    done = applier.done
+    autosync._on_save_pre()
+    assert applier.done > done and len(flushing) == 1
+    while not applier.finished:
+        autosync._on_save_pre()
+    # Finishing (catalog write, sync bookkeeping) is left to the timer
+    assert autosync._active is not None
+    assert autosync.flush(0.0) and autosync._active is None
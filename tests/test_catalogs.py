@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+from all_objects_into_assets.helpers import catalogs
+from all_objects_into_assets.helpers.catalogs import cdf_lock, merge_cdf, merge_entries, read_cdf, write_cdf
+
+BASE = {"A": ("u-a", "A"), "A/B": ("u-b", "A-B")}
+
+
+def test_merge_keeps_both_sides_additions():
+    ours = {**BASE, "Ours": ("u-o", "Ours")}
+    theirs = {**BASE, "Theirs": ("u-t", "Theirs")}
+    merged, remap = merge_entries(BASE, ours, theirs)
+    assert merged == {**BASE, "Ours": ("u-o", "Ours"), "Theirs": ("u-t", "Theirs")}
+    assert remap == {}
+
+
+def test_merge_same_new_path_adopts_the_uuid_on_disk():
+    merged, remap = merge_entries(BASE, {**BASE, "New": ("u-ours", "New")}, {**BASE, "New": ("u-disk", "New")})
+    assert merged["New"] == ("u-disk", "New")
+    assert remap == {"u-ours": "u-disk"}
+
+
+def test_merge_the_side_that_changed_wins():
+    # We moved A/B; they left it alone and removed A
+    ours = {"A": ("u-a", "A"), "A/C": ("u-b", "A-C")}
+    theirs = {"A/B": ("u-b", "A-B")}
+    merged, _remap = merge_entries(BASE, ours, theirs)
+    assert merged == {"A/C": ("u-b", "A-C")}
+
+
+def test_merge_keeps_a_change_over_a_removal():
+    ours = {"A": ("u-a", "Renamed"), "A/B": ("u-b", "A-B")}
+    theirs = {"A/B": ("u-b", "A-B")}
+    merged, _remap = merge_entries(BASE, ours, theirs)
+    assert merged["A"] == ("u-a", "Renamed")
+
+
+def test_merge_one_uuid_moved_by_both_writers_is_listed_once():
+    ours = {"A": ("u-a", "A"), "Ours/B": ("u-b", "Ours-B")}
+    theirs = {"A": ("u-a", "A"), "Theirs/B": ("u-b", "Theirs-B")}
+    merged, remap = merge_entries(BASE, ours, theirs)
+    assert merged == {"A": ("u-a", "A"), "Ours/B": ("u-b", "Ours-B")}
+    assert remap == {}
+    # Whichever writer merges last, the result is the same
+    assert merge_entries(BASE, theirs, ours)[0] == merged
+
+
+def test_merge_a_move_onto_a_path_taken_on_disk_keeps_both_catalogs():
+    # We moved A/B to New; the other writer added another catalog at New
+    ours = {"A": ("u-a", "A"), "New": ("u-b", "New")}
+    theirs = {**BASE, "New": ("u-new", "New")}
+    merged, remap = merge_entries(BASE, ours, theirs)
+    assert merged == {**BASE, "New": ("u-new", "New")}
+    assert remap == {}
+
+
+def test_merge_cdf_writes_only_changes_and_keeps_comments(tmp_path):
+    cdf = tmp_path / "blender_assets.cats.txt"
+    write_cdf(cdf, BASE)
+    cdf.write_text(cdf.read_text(encoding="utf-8") + "\n# kept\n", encoding="utf-8")
+    merged, remap, written = merge_cdf(cdf, BASE, dict(BASE))
+    assert not written and merged == BASE and remap == {}
+
+    merged, _remap, written = merge_cdf(cdf, BASE, {**BASE, "A/D": ("u-d", "A-D")})
+    assert written
+    assert read_cdf(cdf) == merged == {**BASE, "A/D": ("u-d", "A-D")}
+    assert "# kept" in cdf.read_text(encoding="utf-8")
+
+
+def _stale_lock(cdf, age=1000):
+    lock = cdf.with_name(cdf.name + ".lock")
+    lock.write_text("crashed:1", encoding="utf-8")
+    os.utime(lock, (time.time() - age, time.time() - age))
+    return lock
+
+
+def test_stale_lock_is_broken(tmp_path):
+    cdf = tmp_path / "blender_assets.cats.txt"
+    lock = _stale_lock(cdf)
+    with cdf_lock(cdf, timeout=1.0):
+        assert lock.read_text(encoding="utf-8") != "crashed:1"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_lock_taken_meanwhile_is_put_back(tmp_path, monkeypatch):
+    cdf = tmp_path / "blender_assets.cats.txt"
+    lock = _stale_lock(cdf)
+    rename = os.rename
+
+    def racing_rename(src, dst):
+        # Another writer broke the stale lock and took it between our stat and rename
+        lock.unlink()
+        lock.write_text("other:2", encoding="utf-8")
+        monkeypatch.setattr(catalogs.os, "rename", rename)
+        rename(src, dst)
+    monkeypatch.setattr(catalogs.os, "rename", racing_rename)
+    with pytest.raises(TimeoutError, match="other:2"):
+        with cdf_lock(cdf, timeout=0.2):
+            pass
+    assert [p.name for p in tmp_path.iterdir()] == [lock.name]
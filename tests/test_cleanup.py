@@ -0,0 +1,56 @@
+from conftest import bpy
+
+from all_objects_into_assets import operators
+from all_objects_into_assets.helpers.catalogs import read_cdf, read_history
+from all_objects_into_assets.helpers.cleanup import build_cleanup_plan
+from all_objects_into_assets.helpers.plan import Snapshot
+
+ENTRIES = {
+    "Root": ("u-root", "Root"),
+    "Root/Gone": ("u-gone", "Root-Gone"),
+    "Root/Material": ("u-mat", "Root-Material"),
+    "Hand Made": ("u-hand", "Hand Made"),
+    "Old Root/Thing": ("u-old", "Old Root-Thing"),
+}
+
+
+def _dead(plan):
+    return sorted(path for path, _uid, _archived in plan.catalogs_dead)
+
+
+def test_only_catalogs_this_add_on_made_are_pruned(scene, prefs):
+    scene(n_objects=20)
+    p = prefs(catalog_root="Root")
+    plan = build_cleanup_plan(Snapshot.capture(bpy.context.scene), p, ENTRIES, used_elsewhere=set(),
+                              used_here={"u-mat"}, history={"u-old"})
+    # "Hand Made" is outside the root and unknown; "Root/Material" holds a material asset
+    assert plan.catalogs_checked
+    assert _dead(plan) == ["Old Root/Thing", "Root/Gone"]
+
+
+def test_catalogs_recorded_on_a_collection_are_ours(scene, prefs):
+    scene(n_objects=20)
+    bpy.data.collections.new("Moved")["aoia_catalog_id"] = "u-hand"
+    p = prefs(catalog_root="Root")
+    plan = build_cleanup_plan(Snapshot.capture(bpy.context.scene), p, ENTRIES, used_elsewhere={"u-mat"})
+    assert "Hand Made" in _dead(plan)
+
+
+def test_no_catalog_root_leaves_catalogs_alone(scene, prefs):
+    scene(n_objects=20)
+    p = prefs(catalog_root="")
+    plan = build_cleanup_plan(Snapshot.capture(bpy.context.scene), p, ENTRIES, used_elsewhere=set(),
+                              history={"u-old"})
+    assert not plan.catalogs_checked
+    assert plan.catalogs_skipped == "no catalog root"
+    assert plan.catalogs_dead == []
+
+
+def test_runs_record_the_catalogs_they_mirror(scene, prefs, tmp_path):
+    scene(n_objects=50)
+    p = prefs()
+    lib = tmp_path / "lib"
+    assert operators.run_all_objects_into_assets(bpy.context, p, lib, None, print) is not None
+    cdf_path = lib / "blender_assets.cats.txt"
+    uids = {uid for uid, _simple in read_cdf(cdf_path).values()}
+    assert uids and read_history(cdf_path) == uids
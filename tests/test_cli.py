@@ -0,0 +1,14 @@
+from all_objects_into_assets import cli
+from all_objects_into_assets.helpers import catalogs
+from all_objects_into_assets.helpers.catalogs import read_cdf, read_history, write_cdf
+
+
+def test_merge_records_the_history_workers_leave_out(tmp_path):
+    cdf = tmp_path / cli.CDF_NAME
+    write_cdf(cdf, {"Taken": ("u-other", "Taken")})
+    added = {"Props": ("u-props", "Props"), "Taken": ("u-ours", "Taken")}
+    new, conflicts = cli._merge_catalogs(catalogs, tmp_path, added, mirrored={"u-props", "u-ours"})
+    assert (new, conflicts) == (1, ["Taken"])
+    assert read_cdf(cdf)["Props"] == ("u-props", "Props")
+    # Only what made it into the CDF: 'u-ours' lost its path to another writer
+    assert read_history(cdf) == {"u-props"}
@@ -0,0 +1,73 @@
+"""Content keys (preview cache, library index) must see what modifiers point to."""
+import fake_bpy
+from conftest import bpy
+
+from all_objects_into_assets.helpers.content import object_content_key, shared_data_key
+
+
+def _object(name, mesh, *modifiers):
+    obj = bpy.data.objects.new(name, mesh)
+    obj.modifiers.extend(modifiers)
+    return obj
+
+
+def _keys(*objs):
+    memo = {}
+    return [object_content_key(o, memo) for o in objs]
+
+
+def test_geometry_nodes_group_and_inputs(scene):
+    scene(n_objects=0)
+    mesh = bpy.data.meshes.new("Mesh")
+    g1, g2 = bpy.data.node_groups.new("Scatter"), bpy.data.node_groups.new("Bevel")
+    g2.nodes.append(fake_bpy.Node("GeometryNodeSetPosition", offset=0.1))
+    a = _object("A", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g1))
+    b = _object("B", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g2))
+    c = _object("C", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g1))
+    c.modifiers[0]["Socket_2"] = 0.5
+    d = _object("D", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g1))
+    ka, kb, kc, kd = _keys(a, b, c, d)
+    assert ka != kb         # different node group
+    assert ka != kc         # same group, different input value
+    assert ka == kd
+
+
+def test_modifier_targets(scene):
+    scene(n_objects=0)
+    mesh = bpy.data.meshes.new("Mesh")
+    cube = bpy.data.objects.new("Cutter", bpy.data.meshes.new("Cube"))
+    other = bpy.data.objects.new("Cutter2", bpy.data.meshes.new("Sphere"))
+    other.data.vertices = fake_bpy._Elements(40, 7)
+    a = _object("A", mesh, fake_bpy.Modifier("Boolean", "BOOLEAN", object=cube))
+    b = _object("B", mesh, fake_bpy.Modifier("Boolean", "BOOLEAN", object=other))
+    c = _object("C", mesh, fake_bpy.Modifier("Boolean", "BOOLEAN", object=cube))
+    e = _object("E", mesh, fake_bpy.Modifier("Boolean", "BOOLEAN", object=None))
+    ka, kb, kc, ke = _keys(a, b, c, e)
+    assert ka != kb and ka != ke
+    assert ka == kc
+
+
+def test_reference_cycles_and_previews(scene):
+    scene(n_objects=0)
+    a = bpy.data.objects.new("A", bpy.data.meshes.new("MA"))
+    b = bpy.data.objects.new("B", bpy.data.meshes.new("MB"))
+    a.modifiers.append(fake_bpy.Modifier("Boolean", "BOOLEAN", object=b))
+    b.modifiers.append(fake_bpy.Modifier("Boolean", "BOOLEAN", object=a))
+    before = _keys(a, b)
+    a.asset_mark()
+    a.asset_generate_preview()
+    assert _keys(a, b) == before
+
+
+def test_shared_data_key_sees_modifier_pointers(scene):
+    scene(n_objects=0)
+    mesh = bpy.data.meshes.new("Mesh")
+    g1, g2 = bpy.data.node_groups.new("G1"), bpy.data.node_groups.new("G2")
+    a = _object("A", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g1))
+    b = _object("B", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g2))
+    c = _object("C", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g1))
+    d = _object("D", mesh, fake_bpy.Modifier("GN", "NODES", node_group=g1))
+    d.modifiers[0]["Socket_2"] = bpy.data.objects.new("Target", None)
+    ka, kb, kc, kd = (shared_data_key(o) for o in (a, b, c, d))
+    assert ka == kc
+    assert ka != kb and ka != kd
@@ -0,0 +1,38 @@
+import json
+
+from all_objects_into_assets.helpers import export
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"BLENDER")
+    return path
+
+
+def test_manifest_removes_shards_of_moved_catalogs(library):
+    old = _touch(library / "Props" / "scene.blend")
+    foreign = _touch(library / "Props" / "other.blend")
+    export._update_manifest(library, [old], {old.parent})
+
+    # The catalog moved: its assets now go to Props/Wood
+    new = _touch(library / "Props" / "Wood" / "scene.blend")
+    removed = export._update_manifest(library, [new], {new.parent})
+
+    assert removed == 1
+    assert not old.exists() and new.exists()
+    assert foreign.exists()   # never recorded by this source file
+    data = json.loads((library / export.MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert list(data["sources"].values()) == [["Props/Wood/scene.blend"]]
+
+
+def test_manifest_keeps_shards_of_live_catalogs(library):
+    a = _touch(library / "A" / "scene.blend")
+    b = _touch(library / "B" / "scene.blend")
+    export._update_manifest(library, [a, b], {a.parent, b.parent})
+
+    # Only catalog A was exported this time; B still has assets
+    assert export._update_manifest(library, [a], {a.parent, b.parent}) == 0
+    assert b.exists()
+    # B emptied
+    assert export._update_manifest(library, [a], {a.parent}) == 1
+    assert not b.exists()
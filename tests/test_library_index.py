@@ -0,0 +1,79 @@
+import threading
+
+from conftest import bpy
+
+from all_objects_into_assets import operators
+from all_objects_into_assets.helpers import library_index
+from all_objects_into_assets.helpers.library_index import LibraryIndex
+
+
+def _record_refreshes(monkeypatch):
+    threads = []
+
+    def refresh(self, workers=1, timeout=None, binary=None):
+        threads.append(threading.current_thread())
+        return {"files": 0, "scanned": 0, "failed": 0, "removed": 0}
+    monkeypatch.setattr(LibraryIndex, "refresh", refresh)
+    return threads
+
+
+def test_ui_runs_refresh_the_index_in_the_background(scene, prefs, library, interactive, monkeypatch):
+    threads = _record_refreshes(monkeypatch)
+    scene(n_objects=20)
+    p = prefs(asset_library="Lib", library_index=True)
+    stats = operators._stats_for(p, "test")
+    operators._begin_run(bpy.context, p, library, stats, print)
+    library_index.last_refresh(library).result(timeout=5)
+    assert threads and threads[0] is not threading.main_thread()
+    library_index.shutdown()
+
+
+def test_cleanup_leaves_catalogs_alone_without_the_index(scene, prefs, library, monkeypatch):
+    threads = _record_refreshes(monkeypatch)
+    scene(n_objects=20)
+    prefs(asset_library="Lib", library_index=False)
+    op = operators.AOIA_OT_cleanup()
+    op.action, op.dry_run = 'ARCHIVE', True
+    reports = []
+    op.report = lambda kind, msg: reports.append(msg)
+    op.execute(bpy.context)
+    assert threads == []
+    assert any("Library Index is off" in m for m in reports)
+
+
+def _indexed(library, files):
+    index = LibraryIndex(library)
+    index.files = {rel: {"mtime": 0.0, "size": 0, "assets": assets} for rel, assets in files.items()}
+    index._dirty = True
+    index.save()
+
+
+def test_shards_this_file_exported_are_its_own(scene, prefs, library, monkeypatch):
+    from all_objects_into_assets.helpers import export
+    _record_refreshes(monkeypatch)
+    scene(n_objects=20)
+    monkeypatch.setattr(bpy.data, "filepath", str(library / "scene.blend"))
+    shard = library / "Props" / "scene.blend"
+    shard.parent.mkdir()
+    shard.write_bytes(b"BLENDER")
+    export._update_manifest(library, [shard], {shard.parent})
+    _indexed(library, {"scene.blend": [["objects", "A", "u-a", "k-a"]],
+                       "Props/scene.blend": [["objects", "A", "u-props", "k-a"]],
+                       "other.blend": [["objects", "B", "u-other", "k-b"]]})
+    p = prefs(asset_library="Lib", library_index=True)
+
+    run = operators._begin_run(bpy.context, p, library, operators._stats_for(p, "test"), print)
+    assert run["known_assets"] == {"k-b": "other.blend"}
+
+    seen = []
+    build = operators.build_cleanup_plan
+
+    def spy(snap, prefs, entries, used_elsewhere, **kw):
+        seen.append(used_elsewhere)
+        return build(snap, prefs, entries, used_elsewhere, **kw)
+    monkeypatch.setattr(operators, "build_cleanup_plan", spy)
+    op = operators.AOIA_OT_cleanup()
+    op.action, op.dry_run = 'ARCHIVE', True
+    op.report = lambda kind, msg: None
+    op.execute(bpy.context)
+    assert seen == [{"u-other"}]
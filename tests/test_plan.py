@@ -0,0 +1,52 @@
+from conftest import bpy
+
+from all_objects_into_assets.helpers.plan import Snapshot, build_plan
+
+
+def _duplicates(n=3):
+    """'n' linked duplicates (same mesh and material) in one collection."""
+    col = next(c for c in bpy.data.collections if c.name.startswith("C_"))
+    mesh = bpy.data.meshes.new("Shared")
+    dupes = []
+    for i in range(n):
+        obj = bpy.data.objects.new(f"Dupe_{i}", mesh)
+        col.objects.link(obj)
+        dupes.append(obj)
+    return dupes
+
+
+def _plan(p):
+    snap = Snapshot.capture(bpy.context.scene, dedup=p.dedup_shared_data)
+    return build_plan(snap, p, {}, None, "")
+
+
+def test_linked_duplicates_fold_into_one_asset(scene, prefs):
+    scene(n_objects=20, parent_depth=0, shared_ratio=0.0)
+    dupes = _duplicates()
+    plan = _plan(prefs(dedup_shared_data=True))
+    assert plan.folded == [["Dupe_0", ["Dupe_1", "Dupe_2"]]]
+    planned = {row[0] for row in plan.objects}
+    assert "Dupe_0" in planned and not planned & {"Dupe_1", "Dupe_2"}
+
+    # Without dedup every duplicate is its own asset
+    plan = _plan(prefs(dedup_shared_data=False))
+    assert plan.folded == [] and {o.name for o in dupes} <= {row[0] for row in plan.objects}
+
+
+def test_an_existing_asset_stays_the_representative(scene, prefs):
+    scene(n_objects=20, parent_depth=0, shared_ratio=0.0)
+    dupes = _duplicates()
+    dupes[2].asset_mark()
+    plan = _plan(prefs(dedup_shared_data=True))
+    assert plan.folded == [["Dupe_2", ["Dupe_0", "Dupe_1"]]]
+
+
+def test_parents_are_never_folded(scene, prefs):
+    scene(n_objects=20, parent_depth=0, shared_ratio=0.0)
+    dupes = _duplicates()
+    child = bpy.data.objects.new("Child", None)
+    dupes[1].users_collection[0].objects.link(child)
+    child.parent = dupes[1]
+    plan = _plan(prefs(dedup_shared_data=True))
+    assert plan.folded == [["Dupe_0", ["Dupe_2"]]]
+    assert "Dupe_1" in {row[0] for row in plan.objects}
@@ -0,0 +1,22 @@
+import sys
+
+from conftest import bpy
+
+from all_objects_into_assets.helpers import preview_workers
+from all_objects_into_assets.helpers.preview_workers import WorkerPreviewJob
+
+
+def test_hung_workers_are_killed_and_their_items_rendered_here(scene, monkeypatch):
+    scene(n_objects=20)
+    objs = list(bpy.data.objects)[:6]
+    for o in objs:
+        o.asset_mark()
+    hang = [sys.executable, "-c", "import time; time.sleep(60)"]
+    monkeypatch.setattr(preview_workers, "background_command", lambda *a, **kw: hang)
+    monkeypatch.setattr(preview_workers, "ITEM_TIMEOUT", 0.0)
+    job = WorkerPreviewJob(objs, 'ALL', workers=2, timeout=0.2)
+    job.run(step=0.05)
+    c = job.counters()
+    assert c["worker_timeouts"] == 2 and c["fallback_items"] == 6
+    assert job.done == 6 and job.failed == 0
+    assert all(o.preview is not None for o in objs)
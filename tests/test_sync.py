@@ -0,0 +1,91 @@
+"""Incremental sync must end in the same file state as a full run."""
+from conftest import bpy, depsgraph_update
+
+from all_objects_into_assets import operators
+from all_objects_into_assets.helpers import sync
+from all_objects_into_assets.helpers.catalogs import CATALOG_PROP, read_cdf
+from all_objects_into_assets.helpers.plan import build_plan
+
+
+def _run(prefs, lib):
+    summary = operators.run_all_objects_into_assets(bpy.context, prefs, lib, None, print)
+    assert summary is not None
+    return summary
+
+
+def _state(lib):
+    """Assets, catalogs (by path: UUIDs differ between libraries) and *_asset links."""
+    paths = {uid: p for p, (uid, _s) in read_cdf(lib / "blender_assets.cats.txt").items()}
+
+    def cat(idb):
+        return paths.get(idb.asset_data.catalog_id) if idb.asset_data else None
+
+    objects = {o.name: (bool(o.asset_data), cat(o)) for o in bpy.data.objects}
+    collections = {c.name: (bool(c.asset_data), cat(c), paths.get(c.get(CATALOG_PROP)),
+                            sorted(o.name for o in c.objects))
+                   for c in bpy.data.collections}
+    return objects, collections, sorted(paths.values())
+
+
+def _edit():
+    """Rename, reparent (no rename), move between collections and add an object."""
+    # Loose objects: objects linked into *_asset collections are excluded from later runs
+    renamed, reparented, parent, moved = list(bpy.data.objects)[:4]
+    bpy.data.objects.rename(renamed, "Renamed")
+    reparented.parent = parent
+    src = moved.users_collection[0]
+    dst = next(c for c in bpy.data.collections if c is not src and c.name.startswith("C_"))
+    src.objects.unlink(moved)
+    dst.objects.link(moved)
+    new = bpy.data.objects.new("Added", bpy.data.meshes.new("AddedMesh"))
+    dst.objects.link(new)
+    return [renamed, reparented, parent, moved, new]
+
+
+def _incremental_and_full(scene, prefs, tmp_path, edit):
+    states = []
+    for name, incremental in (("inc", True), ("full", False)):
+        scene(parent_depth=0)
+        p = prefs(incremental_sync=incremental)
+        lib = tmp_path / name
+        _run(p, lib)
+        edit(p, lib)
+        summary = _run(p, lib)
+        assert summary["incremental"] is incremental
+        states.append(_state(lib))
+    return states
+
+
+def test_incremental_matches_full_run(scene, prefs, tmp_path):
+    def edit(p, lib):
+        depsgraph_update(*_edit())
+
+    inc, full = _incremental_and_full(scene, prefs, tmp_path, edit)
+    assert inc == full
+
+
+def test_edits_during_a_run_are_kept_for_the_next(scene, prefs, tmp_path):
+    # Reported after the snapshot was taken: the run in progress must not consume them
+    def edit(p, lib):
+        stats = operators._stats_for(p, "test")
+        run = operators._begin_run(bpy.context, p, lib, stats, print)
+        plan = build_plan(run["snapshot"], p, run["cdf_entries"], None, str(run["cdf_path"]), stats=stats)
+        depsgraph_update(*_edit())
+        assert operators._apply_run(bpy.context, p, run, operators._plan_summary(plan, run, stats), print)
+
+    inc, full = _incremental_and_full(scene, prefs, tmp_path, edit)
+    assert inc == full
+
+
+def test_asset_state_edits_match_a_full_run(scene, prefs, tmp_path):
+    # Unmarked by hand, and moved to another catalog by hand: a full run restores both
+    def edit(p, lib):
+        cleared, moved = list(bpy.data.objects)[:2]
+        cleared.asset_clear()
+        moved.asset_data.catalog_id = "00000000-0000-0000-0000-000000000000"
+        depsgraph_update(cleared, moved)
+
+    inc, full = _incremental_and_full(scene, prefs, tmp_path, edit)
+    assert inc == full
+    objects = inc[0]
+    assert all(marked and path for marked, path in objects.values())
@@ -0,0 +1,47 @@
+from conftest import bpy
+
+from all_objects_into_assets import operators
+from all_objects_into_assets.helpers.catalogs import CATALOG_PROP
+from all_objects_into_assets.helpers.undo import ChangeLog
+
+
+def _state():
+    objects = {o.name: (o.asset_data.catalog_id if o.asset_data else None) for o in bpy.data.objects}
+    collections = {c.name: (bool(c.asset_data), c.get(CATALOG_PROP), sorted(o.name for o in c.objects))
+                   for c in bpy.data.collections}
+    return objects, collections
+
+
+def _run(p, lib, log):
+    assert operators.run_all_objects_into_assets(bpy.context, p, lib, None, print, change_log=log) is not None
+
+
+def test_revert_restores_the_file_before_the_run(scene, prefs, tmp_path):
+    scene(n_objects=100, parent_depth=1)
+    before = _state()
+    log = ChangeLog()
+    _run(prefs(), tmp_path / "lib", log)
+    assert log.counts()["marked"] and log.counts()["created"] and log.master
+    assert _state() != before
+    log.revert()
+    assert _state() == before
+
+
+def test_revert_of_a_second_run_keeps_the_first(scene, prefs, tmp_path):
+    scene(n_objects=100, parent_depth=0)
+    p = prefs(incremental_sync=False)
+    lib = tmp_path / "lib"
+    _run(p, lib, ChangeLog())
+    after_first = _state()
+    # Assets that already exist get a new catalog: the log keeps their previous one
+    moved = list(bpy.data.objects)[:10]
+    for obj in moved:
+        obj.asset_data.catalog_id = "elsewhere"
+    bpy.data.objects.new("Late", None)
+    next(c for c in bpy.data.collections if c.name.startswith("C_")).objects.link(bpy.data.objects["Late"])
+    edited = _state()
+    log = ChangeLog()
+    _run(p, lib, log)
+    assert len(log.catalogs) == len(moved)
+    log.revert()
+    assert _state() == edited != after_first